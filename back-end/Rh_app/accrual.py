@@ -0,0 +1,131 @@
+"""
+Acquisition mensuelle des congés (commande `accrue_leave`) et recalcul des
+débits en jours ouvrés (commande `restate_leave_debits`).
+
+Le crédit d'un mois s'applique à toute l'entreprise en deux requêtes, quel
+que soit le nombre d'utilisateurs : INSERT ... SELECT des écritures
+`accrual` du registre, puis UPDATE des soldes d'après ces écritures. La
+contrainte ledger_single_accrual_per_month empêche de créditer deux fois le
+même mois : relancer la commande est sans effet, et deux exécutions
+concurrentes ne peuvent pas aboutir toutes les deux.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, Exists, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .archive import next_month, start_of_day
+from .decisions import change_balances
+from .models import User, Holiday, Leave, LeaveLedgerEntry
+
+
+def accrual_rate():
+    """Jours acquis par mois selon le rôle (LEAVE_ACCRUAL_DAYS_PER_MONTH)"""
+    return Case(
+        *(
+            When(user_type=user_type, then=Value(float(days)))
+            for user_type, days in settings.LEAVE_ACCRUAL_DAYS_PER_MONTH.items()
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def accrual_candidates(month):
+    """
+    Utilisateurs actifs, inscrits avant la fin de `month`, avec un taux non
+    nul et pas encore crédités pour ce mois ; annotés de leur taux (`rate`)
+    """
+    credited = LeaveLedgerEntry.objects.filter(user=OuterRef('pk'), kind='accrual', period=month)
+    return (
+        User.objects.filter(is_active=True, date_joined__lt=start_of_day(next_month(month)))
+        .exclude(Exists(credited))
+        .annotate(rate=accrual_rate())
+        .filter(rate__gt=0)
+    )
+
+
+def accrue_month(month):
+    """
+    Créditer le mois `month` (premier jour du mois) ; retourne le nombre
+    d'utilisateurs crédités
+    """
+    now = timezone.now()
+    ops = connection.ops
+    table = LeaveLedgerEntry._meta
+    columns = ', '.join(
+        ops.quote_name(table.get_field(name).column) for name in ('user', 'kind', 'days', 'period', 'created_at')
+    )
+    select_sql, select_params = accrual_candidates(month).values('id', 'rate').query.sql_with_params()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {ops.quote_name(table.db_table)} ({columns}) '
+                f'SELECT candidates.id, %s, candidates.rate, %s, %s FROM ({select_sql}) candidates',
+                ('accrual', ops.adapt_datefield_value(month), ops.adapt_datetimefield_value(now), *select_params),
+            )
+        # Écritures de cette exécution : même mois, même horodatage
+        entries = LeaveLedgerEntry.objects.filter(user=OuterRef('pk'), kind='accrual', period=month, created_at=now)
+        return User.objects.filter(Exists(entries)).update(
+            leave_balance=F('leave_balance') + Subquery(entries.values('days')[:1]),
+            updated_at=now,
+        )
+
+
+def months_between(first, last):
+    """Premiers jours des mois de `first` à `last` inclus"""
+    month = first.replace(day=1)
+    while month <= last:
+        yield month
+        month = next_month(month)
+
+
+def debit_corrections():
+    """
+    Congés approuvés dont le débit au registre (écriture `leave` et
+    ajustements liés) diffère de leur nombre de jours ouvrés :
+    [(id, user_id, débit enregistré, débit attendu)]. Les congés approuvés
+    sans écriture `leave` (antérieurs au registre) sont ignorés.
+    """
+    leaves = list(
+        Leave.objects.filter(status='approved')
+        .annotate(
+            debits=Count('ledger_entries', filter=Q(ledger_entries__kind='leave')),
+            debited=Coalesce(Sum('ledger_entries__days'), Value(0.0)),
+        )
+        .filter(debits__gt=0)
+        .order_by('id')
+        .values_list('id', 'user_id', 'start_date', 'end_date', 'debited')
+    )
+    if not leaves:
+        return []
+    calendar = Holiday.calendar(min(leave[2] for leave in leaves), max(leave[3] for leave in leaves))
+    corrections = []
+    for pk, user_id, start, end, debited in leaves:
+        expected = -calendar.count(start, end)
+        if debited != expected:
+            corrections.append((pk, user_id, debited, expected))
+    return corrections
+
+
+def restate_debits(corrections, created_by=None):
+    """
+    Écrire un ajustement par congé corrigé et mettre à jour les soldes, une
+    requête par lot d'utilisateurs
+    """
+    now = timezone.now()
+    changes = defaultdict(float)
+    entries = []
+    for pk, user_id, debited, expected in corrections:
+        changes[user_id] += expected - debited
+        entries.append(LeaveLedgerEntry(
+            user_id=user_id, leave_id=pk, kind='adjustment', days=expected - debited,
+            created_by_id=created_by.pk if created_by else None,
+        ))
+    with transaction.atomic():
+        LeaveLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+        change_balances(changes, now)
+    return len(entries)
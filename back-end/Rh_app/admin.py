@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Leave, Mission, WorkHours, Internship, JobApplication
+from .models import User, CvDocument, Holiday, LeaveLedgerEntry, OutgoingEmail, Leave, Mission, WorkHours, Internship, JobApplication
 
 # ✅ Custom admin for the User model
 class CustomUserAdmin(UserAdmin):
@@ -24,6 +24,16 @@ class CustomUserAdmin(UserAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        # Toute modification manuelle du solde est tracée dans le registre
+        previous = User.objects.get(pk=obj.pk).leave_balance if change else 0
+        super().save_model(request, obj, form, change)
+        if obj.leave_balance != previous:
+            LeaveLedgerEntry.objects.create(
+                user=obj, kind='adjustment' if change else 'opening',
+                days=obj.leave_balance - previous, created_by=request.user
+            )
+
 admin.site.register(User, CustomUserAdmin)
 
 
@@ -35,6 +45,30 @@ class LeaveAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'reason')
     date_hierarchy = 'start_date'
 
+# ✅ Holiday admin (jours non décomptés des congés)
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name')
+    search_fields = ('name',)
+    date_hierarchy = 'date'
+
+# ✅ Leave ledger admin (lecture seule)
+@admin.register(LeaveLedgerEntry)
+class LeaveLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'days', 'leave', 'period', 'created_by', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('user__username',)
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # ✅ Mission model admin
 @admin.register(Mission)
 class MissionAdmin(admin.ModelAdmin):
@@ -62,7 +96,27 @@ class InternshipAdmin(admin.ModelAdmin):
 # ✅ JobApplication model admin
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
-    list_display = ('first_name', 'last_name', 'position', 'application_type', 'status')
-    list_filter = ('status', 'application_type')
+    list_display = ('first_name', 'last_name', 'position', 'application_type', 'status', 'cv_status')
+    list_filter = ('status', 'application_type', 'cv_status')
     search_fields = ('first_name', 'last_name', 'email', 'position')
     date_hierarchy = 'created_at'
+
+# ✅ CV documents admin (lecture seule, alimenté par process_cvs)
+@admin.register(CvDocument)
+class CvDocumentAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'kind', 'status', 'page_count', 'size', 'parsed_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('sha256',)
+    exclude = ('text',)
+    readonly_fields = ('sha256', 'size', 'kind', 'status', 'excerpt', 'page_count', 'metadata', 'error', 'parsed_at')
+
+    def has_add_permission(self, request):
+        return False
+
+# ✅ Outbox admin
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to', 'subject')
+    date_hierarchy = 'created_at'
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class RhAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Rh_app'
+
+    def ready(self):
+        from django.conf import settings
+        from .metrics import instrument_serializers
+
+        if settings.METRICS_ENABLED:
+            instrument_serializers()
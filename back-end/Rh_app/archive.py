@@ -0,0 +1,171 @@
+"""
+Archivage des données anciennes (commande `archive_records`).
+
+Les heures de travail, les congés traités et les candidatures traitées plus
+anciens que ARCHIVE_HORIZON_DAYS quittent les tables courantes pour les
+tables d'archive (ArchivedWorkHours, ArchivedLeave, ArchivedJobApplication),
+partitionnées par mois sous PostgreSQL. Les tables courantes et leurs index
+ne contiennent plus que les données récentes, celles que lisent les listes
+et les tableaux de bord.
+
+Le déplacement se fait par lots, chacun dans sa transaction : lecture
+verrouillée des lignes, insertion dans l'archive en bulk_create, suppression
+des lignes d'origine. Chaque mois touché est ensuite réécrit en JSON Lines
+compressé sous ARCHIVE_ROOT/<archive>/<AAAA-MM>.jsonl.gz, depuis la table
+d'archive.
+"""
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedJobApplication, ArchivedLeave, ArchivedWorkHours, JobApplication, Leave, WorkHours,
+)
+
+# Lignes déplacées par transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+
+class ArchiveSpec:
+    """
+    Lignes de `model` à archiver dans `archive_model` : celles qui
+    remplissent `condition(cutoff)`, classées par mois d'après `month_field`
+    """
+
+    def __init__(self, model, archive_model, month_field, condition):
+        self.model = model
+        self.archive_model = archive_model
+        self.month_field = month_field
+        self.condition = condition
+        # Colonnes copiées telles quelles (même nom des deux côtés)
+        self.columns = [
+            field.attname for field in archive_model._meta.concrete_fields
+            if field.name not in ('month', 'archived_at')
+        ]
+
+    def candidates(self, cutoff):
+        return self.model.objects.filter(self.condition(cutoff))
+
+    def month_of(self, value):
+        if isinstance(value, datetime):
+            value = timezone.localdate(value)
+        return value.replace(day=1)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+ARCHIVES = {
+    'work-hours': ArchiveSpec(
+        WorkHours, ArchivedWorkHours, 'date',
+        lambda cutoff: Q(date__lt=cutoff),
+    ),
+    # Les demandes en attente restent dans la table courante, quel que soit leur âge
+    'leaves': ArchiveSpec(
+        Leave, ArchivedLeave, 'start_date',
+        lambda cutoff: Q(end_date__lt=cutoff) & ~Q(status='pending'),
+    ),
+    'job-applications': ArchiveSpec(
+        JobApplication, ArchivedJobApplication, 'created_at',
+        lambda cutoff: Q(created_at__lt=start_of_day(cutoff)) & ~Q(status='pending'),
+    ),
+}
+
+
+def archive_cutoff(days=None):
+    """Date avant laquelle les lignes sont archivées"""
+    if days is None:
+        days = settings.ARCHIVE_HORIZON_DAYS
+    return timezone.localdate() - timedelta(days=days)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(archive_model, month):
+    return f'{archive_model._meta.db_table}_{month:%Y_%m}'
+
+
+def ensure_partitions(archive_model, months):
+    """Créer sous PostgreSQL les partitions mensuelles qui manquent (sans effet ailleurs)"""
+    if connection.vendor != 'postgresql':
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for month in sorted(months):
+            # Bornes en littéraux : pas de paramètres dans une instruction DDL
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {quote(partition_name(archive_model, month))} '
+                f'PARTITION OF {quote(archive_model._meta.db_table)} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            )
+
+
+def archive_batch(spec, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Déplacer un lot de lignes vers l'archive ; retourne (nombre de lignes,
+    mois touchés), (0, set()) quand il ne reste rien à archiver.
+
+    La suppression passe par le collecteur de Django : les écritures du
+    registre des congés perdent leur lien vers la demande (SET_NULL), les
+    triggers de WorkHoursRollup retirent les heures des totaux.
+    """
+    with transaction.atomic():
+        rows = list(
+            spec.candidates(cutoff).select_for_update().order_by('pk').values(*spec.columns)[:batch_size]
+        )
+        if not rows:
+            return 0, set()
+        records = [
+            spec.archive_model(month=spec.month_of(row[spec.month_field]), **row) for row in rows
+        ]
+        months = {record.month for record in records}
+        ensure_partitions(spec.archive_model, months)
+        spec.archive_model.objects.bulk_create(records)
+        spec.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows), months
+
+
+def archive_path(name, month):
+    return os.path.join(settings.ARCHIVE_ROOT, name, f'{month:%Y-%m}.jsonl.gz')
+
+
+def write_month(name, month):
+    """
+    Réécrire le fichier JSON Lines compressé d'un mois depuis la table
+    d'archive ; le fichier est remplacé d'un coup (pas de fichier partiel)
+    """
+    archive_model = ARCHIVES[name].archive_model
+    path = archive_path(name, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = archive_model.objects.filter(month=month).order_by('id').values()
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as out:
+            for row in rows.iterator():
+                out.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+                out.write('\n')
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
+
+
+def vacuum_tables(models):
+    """VACUUM (ANALYZE) des tables courantes après archivage (PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(model._meta.db_table)}')
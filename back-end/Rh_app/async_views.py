@@ -0,0 +1,123 @@
+"""
+Variantes asynchrones (ASGI) des endpoints de lecture les plus sollicités.
+
+Elles réutilisent les viewsets DRF pour tout ce qui ne touche pas la base
+(get_queryset, serializers, ETag, liens de pagination) et exécutent les
+requêtes avec l'ORM asynchrone de Django : sous un serveur ASGI, un worker
+sert d'autres requêtes pendant l'attente de la base. Les réponses sont
+identiques à celles des endpoints synchrones.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import ClaimsJWTAuthentication, ClaimsUser
+from .models import User
+from .pagination import page_fields
+from .renderers import render_plain
+from .serializers import UserSerializer
+from .views import DashboardViewSet
+
+
+async def authenticate(request):
+    """
+    Utilisateur du jeton JWT. Les jetons avec claims de rôle ne demandent
+    aucune requête ; les anciens jetons retombent sur la lecture en base.
+    """
+    authenticator = ClaimsJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    token = authenticator.get_validated_token(raw_token)
+    if 'user_type' in token:
+        return ClaimsUser(token)
+    return await sync_to_async(authenticator.get_user)(token)
+
+
+class AsyncReadView(View):
+    """
+    Vue asynchrone authentifiée par JWT, réponse rendue par le JSONRenderer de DRF
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except (InvalidToken, TokenError) as e:
+            return JsonResponse({'detail': str(e)}, status=401)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        self.drf_request = Request(request)
+        self.drf_request.user = user
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            # Paramètre invalide (filtre, tri, champs, curseur) : même réponse
+            # que le gestionnaire d'exceptions de DRF sur l'endpoint synchrone
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return self.render(data, status=exc.status_code)
+
+    def render(self, data, plain=False, status=200):
+        """`plain` : données construites par Rh_app.fastread (voir render_plain)"""
+        content = render_plain(data) if plain else None
+        if content is None:
+            content = JSONRenderer().render(data)
+        return HttpResponse(content, content_type='application/json', status=status)
+
+    def get_viewset(self, viewset_class, action):
+        return viewset_class(
+            request=self.drf_request, format_kwarg=None, args=(), kwargs={}, action=action,
+        )
+
+
+class AsyncMeView(AsyncReadView):
+
+    async def get(self, request):
+        user = self.drf_request.user
+        if isinstance(user, ClaimsUser):
+            user = await User.objects.aget(pk=user.id)
+        return self.render(UserSerializer(user).data)
+
+
+class AsyncListView(AsyncReadView):
+    """
+    Liste paginée d'un viewset : même visibilité, même ETag, même page
+    """
+    viewset_class = None
+
+    async def get(self, request):
+        viewset = self.get_viewset(self.viewset_class, 'list')
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        rows = [row async for row in viewset.version_queryset(queryset)]
+        not_modified, headers = viewset.list_conditional_response(self.drf_request, rows)
+        if not_modified is not None:
+            return viewset.finalize_conditional(not_modified, headers)
+
+        paginator = viewset.paginator
+        plan = viewset.list_plan()
+        if plan is not None:
+            queryset = plan.queryset(queryset, page_fields(viewset, queryset))
+        page = await paginator.apaginate_queryset(queryset, self.drf_request, view=viewset)
+        results = plan.rows(page) if plan is not None else viewset.get_serializer(page, many=True).data
+        data = paginator.get_paginated_response(results).data
+        return viewset.finalize_conditional(self.render(data, plain=plan is not None and plan.plain), headers)
+
+
+class AsyncDashboardView(AsyncReadView):
+
+    async def get(self, request):
+        viewset = self.get_viewset(DashboardViewSet, 'list')
+        results = {}
+        for name, queryset, method, arguments in viewset.summary_queries():
+            results[name] = await getattr(queryset, f'a{method}')(**arguments)
+        user = self.drf_request.user
+        if isinstance(user, ClaimsUser):
+            balance = await User.objects.filter(pk=user.id).values_list('leave_balance', flat=True).aget()
+        else:
+            balance = user.leave_balance
+        return self.render(viewset.summary(results, balance))
@@ -0,0 +1,86 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Claims copiés du modèle User dans les jetons
+ROLE_CLAIMS = ('username', 'user_type', 'is_superuser', 'is_staff')
+
+
+def add_role_claims(token, user):
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Utilisateur construit à partir des claims du jeton, sans requête SQL.
+
+    Il expose `id`, `username`, `user_type`, `is_superuser` et `is_staff`, ce
+    qui suffit aux règles de visibilité des viewsets. Pour le reste (solde de
+    congés, email...), utiliser `full_user()`.
+    """
+
+    @property
+    def id(self):
+        # simplejwt stocke l'identifiant sous forme de chaîne
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def user_type(self):
+        return self.token.get('user_type')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT sans lecture de la table des utilisateurs.
+
+    Le rôle est lu dans les claims du jeton d'accès. Un changement de rôle ou
+    une désactivation prend donc effet au plus tard à l'expiration du jeton
+    d'accès (ACCESS_TOKEN_LIFETIME), le rafraîchissement relisant l'utilisateur
+    en base. Les jetons émis avant l'ajout des claims retombent sur la
+    lecture en base.
+    """
+
+    def get_user(self, validated_token):
+        if 'user_type' not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+
+def full_user(user):
+    """
+    Instance complète du modèle User pour l'utilisateur authentifié ; une
+    requête SQL seulement si l'on n'a qu'un ClaimsUser
+    """
+    if isinstance(user, User):
+        return user
+    return User.objects.get(pk=user.id)
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claims(super().get_token(user), user)
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rafraîchissement qui relit l'utilisateur et réécrit les claims de rôle,
+    pour que le nouveau jeton d'accès reflète les droits actuels
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        add_role_claims(refresh, user)
+        return super().validate({**attrs, 'refresh': str(refresh)})
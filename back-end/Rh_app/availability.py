@@ -0,0 +1,71 @@
+"""
+Calendrier des absences : congés dont la période chevauche une fenêtre de
+dates.
+
+Sous PostgreSQL, le chevauchement s'écrit avec des daterange, sur la même
+expression que l'index GiST `leave_period_gist_idx` et la contrainte
+d'exclusion `leave_no_overlapping_approved` (migration 0012) : la requête
+ne lit que les congés concernés, quelle que soit la profondeur de
+l'historique. Ailleurs (SQLite), les bornes sont comparées et l'index
+(end_date, start_date) sert la requête.
+"""
+from django.db.models import BooleanField, DateField, F, Func, Value
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+# Une année au plus par requête (année bissextile comprise)
+MAX_WINDOW_DAYS = 366
+
+
+class Overlaps(Func):
+    """
+    Condition : la période [start_field, end_field] de la ligne chevauche
+    [low, high], bornes incluses
+    """
+    output_field = BooleanField()
+
+    def __init__(self, start_field, end_field, low, high):
+        super().__init__(
+            F(start_field), F(end_field),
+            Value(low, output_field=DateField()), Value(high, output_field=DateField()),
+        )
+
+    def compile_bounds(self, compiler):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.append(tuple(expression_params))
+        return sqls, params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (start, end, low, high), (start_params, end_params, low_params, high_params) = self.compile_bounds(compiler)
+        return f'({start} <= {high} AND {end} >= {low})', (*start_params, *high_params, *end_params, *low_params)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        (start, end, low, high), params = self.compile_bounds(compiler)
+        return (
+            f"daterange({start}, {end}, '[]') && daterange({low}::date, {high}::date, '[]')",
+            tuple(param for expression_params in params for param in expression_params),
+        )
+
+
+def calendar_window(params):
+    """(début, fin) de la fenêtre ?start=...&end=..., validée"""
+    window = []
+    for name in ('start', 'end'):
+        if name not in params:
+            raise ValidationError({name: 'This parameter is required.'})
+        try:
+            value = parse_date(params[name])
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError({name: f'Invalid date: {params[name]!r}'})
+        window.append(value)
+    start, end = window
+    if end < start:
+        raise ValidationError({'end': 'Must be on or after start.'})
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        raise ValidationError({'end': f'The window cannot exceed {MAX_WINDOW_DAYS} days.'})
+    return start, end
@@ -0,0 +1,149 @@
+import codecs
+import csv
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import User, WorkHours
+from .serializers import WorkHoursBulkRowSerializer
+
+# Colonnes acceptées dans un fichier CSV
+CSV_COLUMNS = ('user', 'date', 'hours_worked')
+# Nombre de lignes validées puis écrites à la fois
+BATCH_SIZE = 1000
+# Au-delà, les erreurs suivantes ne sont plus détaillées dans la réponse
+MAX_REPORTED_ERRORS = 100
+
+
+def read_csv_rows(upload):
+    """
+    Lire un fichier CSV envoyé (colonnes : user, date, hours_worked) ligne par
+    ligne, sans le charger entièrement en mémoire. Un en-tête inconnu, un
+    contenu qui n'est pas de l'UTF-8 ou une ligne CSV malformée lèvent une
+    ValidationError (réponse 400), avec le numéro de la ligne en cause
+    (numérotées à partir de 1, comme les erreurs de ingest_work_hours).
+    """
+    reader = csv.DictReader(codecs.iterdecode(upload, 'utf-8-sig'))
+    number = 0
+    try:
+        unknown = [name for name in reader.fieldnames or () if name not in CSV_COLUMNS]
+        if unknown:
+            raise serializers.ValidationError({'file': [
+                f"Unknown columns: {', '.join(unknown)}. Expected: {', '.join(CSV_COLUMNS)}."
+            ]})
+        for number, row in enumerate(reader, start=1):
+            if None in row:
+                raise serializers.ValidationError({'file': [
+                    f"Row {number}: expected at most {len(reader.fieldnames)} columns."
+                ]})
+            yield {key: value for key, value in row.items() if value not in (None, '')}
+    except UnicodeDecodeError:
+        where = f'Row {number + 1}' if reader.fieldnames else 'Header'
+        raise serializers.ValidationError({'file': [f'{where}: the file is not valid UTF-8.']})
+    except csv.Error as exc:
+        where = f'Row {number + 1}' if reader.fieldnames else 'Header'
+        raise serializers.ValidationError({'file': [f'{where}: {exc}.']})
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest_work_hours(rows, user, upsert=False, batch_size=None):
+    """
+    Importer des heures de travail par lots.
+
+    Les lignes sont validées lot par lot avec les règles de
+    WorkHoursSerializer, puis insérées avec bulk_create dans une seule
+    transaction. Si une ligne est invalide, plus rien n'est écrit et toute
+    l'importation est annulée : le résultat liste alors les erreurs par ligne
+    (numérotées à partir de 1).
+
+    Une ligne dont le couple (user, date) existe déjà est refusée ; avec
+    `upsert`, elle met à jour `hours_worked` (INSERT ... ON CONFLICT DO UPDATE).
+    """
+    is_admin = user.is_superuser or user.user_type == 'admin'
+    validator = WorkHoursBulkRowSerializer()
+    result = {'created': 0, 'updated': 0, 'errors': [], 'error_count': 0}
+
+    with transaction.atomic():
+        offset = 0
+        for batch in batches(rows, batch_size or BATCH_SIZE):
+            valid = []
+            for number, row in enumerate(batch, start=offset + 1):
+                try:
+                    data = validator.run_validation(row)
+                except serializers.ValidationError as exc:
+                    add_error(result, number, exc.detail)
+                    continue
+                data.setdefault('user', user.pk)
+                if not is_admin and data['user'] != user.pk:
+                    add_error(result, number, {'user': ['Permission denied']})
+                    continue
+                valid.append((number, data))
+            offset += len(batch)
+
+            known_users = set(
+                User.objects.filter(pk__in={data['user'] for _number, data in valid})
+                .values_list('pk', flat=True)
+            )
+            existing = existing_keys(data for _number, data in valid)
+            objects, seen = [], set()
+            for number, data in valid:
+                key = (data['user'], data['date'])
+                if data['user'] not in known_users:
+                    add_error(result, number, {'user': [f"Invalid pk \"{data['user']}\" - object does not exist."]})
+                elif not upsert and (key in existing or key in seen):
+                    add_error(result, number, {'date': ['Work hours already recorded for this day.']})
+                else:
+                    objects.append(WorkHours(
+                        user_id=data['user'], date=data['date'], hours_worked=data['hours_worked']
+                    ))
+                    seen.add(key)
+
+            # Après une première erreur on continue seulement à valider
+            if result['error_count']:
+                continue
+            if upsert:
+                # En cas de doublon dans le lot, la dernière ligne l'emporte
+                objects = list({(obj.user_id, obj.date): obj for obj in objects}.values())
+                WorkHours.objects.bulk_create(
+                    objects, update_conflicts=True, unique_fields=['user', 'date'],
+                    update_fields=['hours_worked', 'updated_at'],
+                )
+                updated = sum(1 for obj in objects if (obj.user_id, obj.date) in existing)
+                result['created'] += len(objects) - updated
+                result['updated'] += updated
+            else:
+                result['created'] += len(WorkHours.objects.bulk_create(objects))
+
+        if result['error_count']:
+            transaction.set_rollback(True)
+            result['created'] = result['updated'] = 0
+    return result
+
+
+def add_error(result, number, detail):
+    result['error_count'] += 1
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'row': number, 'errors': detail})
+
+
+def existing_keys(rows):
+    """
+    Couples (user, date) du lot déjà présents en base, en une requête
+    (index unique workhours_unique_user_date)
+    """
+    keys = {(data['user'], data['date']) for data in rows}
+    if not keys:
+        return set()
+    candidates = WorkHours.objects.filter(
+        user_id__in={user_id for user_id, _day in keys}, date__in={day for _user_id, day in keys}
+    ).values_list('user_id', 'date')
+    return keys.intersection(candidates)
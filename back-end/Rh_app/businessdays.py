@@ -0,0 +1,45 @@
+"""
+Jours ouvrés : les congés sont décomptés hors week-ends et jours fériés.
+
+Le décompte d'une période ne parcourt pas ses jours : les jours de semaine
+se comptent par arithmétique (semaines entières, puis jours restants) et
+les jours fériés, triés une fois pour toutes, par recherche dichotomique.
+C'est le principe de numpy.busday_count, sans dépendre de NumPy, mais avec
+des bornes incluses comme celles des congés. Charger le calendrier (une
+requête sur Holiday, voir Holiday.calendar) puis appeler count() pour
+chaque période : recalculer les débits de toute l'entreprise ne coûte
+qu'une requête de plus.
+"""
+from bisect import bisect_left, bisect_right
+
+# Samedi et dimanche (date.weekday())
+WEEKEND = (5, 6)
+
+
+def weekday_count(start, end, weekend=WEEKEND):
+    """Jours de `start` à `end` inclus qui ne tombent pas un jour de `weekend`"""
+    days = (end - start).days + 1
+    if days <= 0:
+        return 0
+    weeks, extra = divmod(days, 7)
+    first = start.weekday()
+    return weeks * (7 - len(weekend)) + sum((first + i) % 7 not in weekend for i in range(extra))
+
+
+class BusinessCalendar:
+    """Jours ouvrés d'après une liste de jours fériés"""
+
+    def __init__(self, holidays=(), weekend=WEEKEND):
+        self.weekend = frozenset(weekend)
+        # Un jour férié tombant un week-end n'est pas décompté deux fois
+        self.holidays = sorted({day for day in holidays if day.weekday() not in self.weekend})
+
+    def count(self, start, end):
+        """Jours ouvrés de `start` à `end`, bornes incluses"""
+        if end < start:
+            return 0
+        holidays = bisect_right(self.holidays, end) - bisect_left(self.holidays, start)
+        return weekday_count(start, end, self.weekend) - holidays
+
+    def is_business_day(self, day):
+        return self.count(day, day) == 1
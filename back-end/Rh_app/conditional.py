@@ -0,0 +1,91 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .pagination import CreatedAtCursorPagination
+
+
+class ConditionalGetMixin:
+    """
+    Réponses 304 Not Modified pour `list` et `retrieve` (If-None-Match /
+    If-Modified-Since).
+
+    L'ETag d'une liste est calculé sur les lignes de la page demandée, dans
+    le queryset filtré de la vue (après les règles de visibilité de
+    get_queryset()) : (pk, updated_at) de chaque ligne de la page et de la
+    première ligne de la suivante, lus par la requête de la pagination par
+    curseur (LIMIT page_size + 1, sur l'index du tri). Une modification, une
+    suppression ou une insertion dans la page change l'ETag ; la page n'est
+    ni lue entièrement ni sérialisée si le client a déjà la bonne version,
+    et rien n'est compté sur l'ensemble de la liste. L'utilisateur, son rôle
+    et l'URL complète (curseur, filtres) entrent dans l'empreinte : deux
+    utilisateurs n'ont jamais le même ETag.
+
+    Les champs copiés d'une relation (user_name...) ne modifient pas
+    `updated_at` de la ligne : un renommage d'utilisateur n'invalide pas les
+    listes qui l'affichent.
+    """
+    updated_field = 'updated_at'
+
+    def make_etag(self, request, last_modified, version):
+        user = request.user
+        parts = (
+            user.id, user.user_type, user.is_superuser, request.get_full_path(),
+            request.headers.get('Accept', ''), last_modified.isoformat() if last_modified else '', version,
+        )
+        return quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+    def conditional_response(self, request, last_modified, version):
+        """
+        Retourne (réponse 304 ou None, en-têtes à ajouter à la réponse 200)
+        """
+        etag = self.make_etag(request, last_modified, version)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        headers = {'ETag': etag}
+        if timestamp is not None:
+            headers['Last-Modified'] = http_date(timestamp)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        return not_modified, headers
+
+    def finalize_conditional(self, response, headers):
+        for name, value in headers.items():
+            response[name] = value
+        # Le navigateur revalide à chaque fois ; aucun cache partagé ne stocke la réponse
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def version_queryset(self, queryset):
+        """
+        (pk, updated_at) des lignes qui composent la réponse de la liste :
+        la page demandée et la ligne qui décide du lien `next`, ou toute la
+        liste sans pagination par curseur
+        """
+        rows = queryset.values_list('pk', self.updated_field)
+        paginator = self.paginator
+        if isinstance(paginator, CreatedAtCursorPagination):
+            return paginator.page_queryset(rows, self.request, self)
+        return rows
+
+    def list_conditional_response(self, request, rows):
+        last_modified = max((updated for _pk, updated in rows), default=None)
+        return self.conditional_response(request, last_modified, rows)
+
+    def list(self, request, *args, **kwargs):
+        rows = list(self.version_queryset(self.filter_queryset(self.get_queryset())))
+        not_modified, headers = self.list_conditional_response(request, rows)
+        if not_modified is not None:
+            return self.finalize_conditional(not_modified, headers)
+        return self.finalize_conditional(super().list(request, *args, **kwargs), headers)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        not_modified, headers = self.conditional_response(
+            request, getattr(instance, self.updated_field), 1
+        )
+        if not_modified is not None:
+            return self.finalize_conditional(not_modified, headers)
+        serializer = self.get_serializer(instance)
+        return self.finalize_conditional(Response(serializer.data), headers)
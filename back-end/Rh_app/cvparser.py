@@ -0,0 +1,122 @@
+"""
+Extraction du texte et des métadonnées des CV.
+
+Ce module n'importe pas Django : ses fonctions tournent dans les processus
+d'un ProcessPoolExecutor (voir Rh_app.cvs) et ne reçoivent que des chemins
+de fichiers. Elles ne lèvent pas d'exception ; une erreur est retournée
+dans la clé `error`.
+"""
+import hashlib
+import re
+import zipfile
+from xml.etree import ElementTree
+
+# Au-delà, le texte est tronqué (limite de taille d'un tsvector PostgreSQL : 1 Mo)
+MAX_TEXT_LENGTH = 100000
+EXCERPT_LENGTH = 300
+CHUNK_SIZE = 1024 * 1024
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+CORE_PROPERTIES = {
+    'title': '{http://purl.org/dc/elements/1.1/}title',
+    'author': '{http://purl.org/dc/elements/1.1/}creator',
+    'created': '{http://purl.org/dc/terms/}created',
+}
+
+
+class CvParsingError(Exception):
+    pass
+
+
+def file_digest(path):
+    """
+    Empreinte SHA-256 et taille du fichier, lu par blocs
+    """
+    digest, size = hashlib.sha256(), 0
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+    except OSError as e:
+        return {'error': str(e)}
+    return {'sha256': digest.hexdigest(), 'size': size}
+
+
+def extract_cv(path):
+    """
+    Texte, extrait, nombre de pages et métadonnées d'un CV PDF, DOCX ou texte
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(8)
+        if header.startswith(b'%PDF'):
+            kind, (text, page_count, metadata) = 'pdf', read_pdf(path)
+        elif header.startswith(b'PK\x03\x04'):
+            kind, (text, page_count, metadata) = 'docx', read_docx(path)
+        elif path.lower().endswith('.txt'):
+            kind, (text, page_count, metadata) = 'text', read_text(path)
+        else:
+            raise CvParsingError('Unsupported file type')
+    except CvParsingError as e:
+        return {'error': str(e)}
+    except Exception as e:
+        # Fichier corrompu : les bibliothèques de lecture lèvent des erreurs variées
+        return {'error': f'{type(e).__name__}: {e}'}
+
+    # PostgreSQL refuse les caractères nuls dans un champ texte
+    text = normalize_text(text.replace('\x00', ''))[:MAX_TEXT_LENGTH]
+    return {
+        'kind': kind,
+        'text': text,
+        'excerpt': text[:EXCERPT_LENGTH],
+        'page_count': page_count,
+        'metadata': {key: value for key, value in metadata.items() if value},
+    }
+
+
+def normalize_text(text):
+    lines = (re.sub(r'[ \t\f\v]+', ' ', line).strip() for line in text.splitlines())
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def read_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise CvParsingError('PDF support requires the pypdf package')
+    reader = PdfReader(path)
+    text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+    info = reader.metadata or {}
+    metadata = {
+        'title': info.get('/Title'),
+        'author': info.get('/Author'),
+        'created': info.get('/CreationDate'),
+    }
+    return text, len(reader.pages), {key: str(value) for key, value in metadata.items() if value}
+
+
+def read_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        if 'word/document.xml' not in names:
+            raise CvParsingError('Unsupported file type')
+        document = ElementTree.fromstring(archive.read('word/document.xml'))
+        core = ElementTree.fromstring(archive.read('docProps/core.xml')) if 'docProps/core.xml' in names else None
+    paragraphs = (
+        ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t'))
+        for paragraph in document.iter(f'{WORD_NAMESPACE}p')
+    )
+    metadata = {}
+    if core is not None:
+        for key, tag in CORE_PROPERTIES.items():
+            node = core.find(tag)
+            if node is not None and node.text:
+                metadata[key] = node.text.strip()
+    # Word ne stocke pas la pagination dans le document
+    return '\n'.join(paragraphs), None, metadata
+
+
+def read_text(path):
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', errors='replace'), None, {}
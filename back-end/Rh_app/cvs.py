@@ -0,0 +1,121 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cvparser import extract_cv, file_digest
+from .models import CvDocument, JobApplication
+
+logger = logging.getLogger(__name__)
+
+# Délai après lequel un lot réservé mais jamais terminé retourne dans la file
+CLAIM_TIMEOUT = timedelta(minutes=30)
+
+
+def cv_path(application):
+    try:
+        return application.cv_file.path
+    except (ValueError, NotImplementedError):
+        # Pas de fichier, ou stockage sans chemin local
+        return None
+
+
+def claim_batch(batch_size):
+    """
+    Réserver un lot de candidatures à analyser : passage en `processing`
+    dans une transaction courte (SKIP LOCKED entre workers), validée avant
+    l'analyse. La réservation est datée dans sa propre colonne
+    (`cv_claimed_at`) : les autres écritures sur la candidature pendant
+    l'analyse (téléphone, décision) ne l'annulent pas. Une réservation plus
+    ancienne que CLAIM_TIMEOUT (worker arrêté en cours de lot) est reprise.
+    Retourne (candidatures, date de la réservation).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            JobApplication.objects.select_for_update(skip_locked=True)
+            .filter(Q(cv_status='pending') | Q(cv_status='processing', cv_claimed_at__lt=now - CLAIM_TIMEOUT))
+            .only('id', 'cv_file', 'created_at')
+            .order_by('created_at', 'id')[:batch_size]
+        )
+        JobApplication.objects.filter(pk__in=[application.pk for application in batch]).update(
+            cv_status='processing', cv_claimed_at=now, updated_at=now
+        )
+    return batch, now
+
+
+def process_pending(batch_size=50, executor=None):
+    """
+    Analyser les CV d'un lot de candidatures en attente (`cv_status='pending'`).
+
+    Le lot est d'abord réservé (claim_batch) : aucune ligne n'est verrouillée
+    pendant la lecture des fichiers. Empreintes et extraction tournent dans
+    `executor` (un ProcessPoolExecutor pour paralléliser, ou dans le
+    processus courant par défaut). Un contenu déjà connu n'est pas
+    réanalysé : la candidature est rattachée au CvDocument existant. Les
+    résultats sont écrits dans une seconde transaction courte. Retourne le
+    nombre de candidatures traitées.
+    """
+    run = executor.map if executor is not None else map
+    batch, claimed_at = claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    paths = [cv_path(application) for application in batch]
+    digests = list(run(file_digest, [path or '' for path in paths]))
+
+    hashes = {digest['sha256'] for digest in digests if 'sha256' in digest}
+    documents = {
+        document.sha256: document
+        for document in CvDocument.objects.filter(sha256__in=hashes).only('id', 'sha256', 'status')
+    }
+    # Un seul fichier à analyser par contenu inconnu
+    to_parse = {}
+    for path, digest in zip(paths, digests):
+        if 'sha256' in digest and digest['sha256'] not in documents:
+            to_parse.setdefault(digest['sha256'], (path, digest['size']))
+    parsed = run(extract_cv, [path for path, _size in to_parse.values()])
+    new_documents = []
+    for (sha256, (_path, size)), result in zip(to_parse.items(), parsed):
+        if 'error' in result:
+            logger.warning(f"CV {sha256} could not be parsed: {result['error']}")
+            new_documents.append(CvDocument(sha256=sha256, size=size, status='failed', error=result['error']))
+        else:
+            new_documents.append(CvDocument(sha256=sha256, size=size, status='parsed', **result))
+
+    with transaction.atomic():
+        # Un autre worker peut avoir enregistré le même contenu entre-temps
+        CvDocument.objects.bulk_create(new_documents, ignore_conflicts=True)
+        documents.update(
+            (document.sha256, document)
+            for document in CvDocument.objects.filter(sha256__in=to_parse).only('id', 'sha256', 'status')
+        )
+        # Seulement les lignes encore réservées par ce lot : un nouveau fichier
+        # téléversé entre-temps (retour à `pending`) ou une réservation reprise
+        # après CLAIM_TIMEOUT l'emportent ; les autres modifications de la
+        # candidature ne changent pas `cv_claimed_at`
+        still_claimed = set(
+            JobApplication.objects.select_for_update()
+            .filter(pk__in=[application.pk for application in batch], cv_status='processing', cv_claimed_at=claimed_at)
+            .values_list('pk', flat=True)
+        )
+        now = timezone.now()
+        results = []
+        for application, digest in zip(batch, digests):
+            if application.pk not in still_claimed:
+                continue
+            if 'error' in digest:
+                logger.warning(f"CV of application {application.pk} could not be read: {digest['error']}")
+                application.cv_status = 'failed'
+            else:
+                document = documents[digest['sha256']]
+                application.cv_document = document
+                application.cv_status = document.status
+            application.cv_claimed_at = None
+            application.updated_at = now
+            results.append(application)
+        # Le trigger de l'index de recherche reprend le texte du CV (cv_document_id)
+        JobApplication.objects.bulk_update(results, ['cv_status', 'cv_claimed_at', 'cv_document', 'updated_at'])
+    return len(batch)
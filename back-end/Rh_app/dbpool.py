@@ -0,0 +1,62 @@
+import os
+
+from django.db import connections
+
+# Compteurs de psycopg_pool (ConnectionPool.get_stats) exposés, sous un nom
+# plus parlant. Les compteurs sont cumulés depuis le démarrage du processus.
+POOL_STATS = {
+    'pool_size': 'size',
+    'pool_available': 'available',
+    'requests_waiting': 'waiting',
+    'requests_num': 'requests',
+    'requests_queued': 'waits',
+    'requests_wait_ms': 'wait_ms',
+    'requests_errors': 'timeouts',
+    'returns_bad': 'bad_returns',
+    'connections_num': 'connections_opened',
+    'connections_errors': 'connection_errors',
+    'connections_lost': 'connections_lost',
+}
+
+
+def connection_mode(connection):
+    if connection.settings_dict['OPTIONS'].get('pool'):
+        return 'pool'
+    if connection.settings_dict['CONN_MAX_AGE']:
+        return 'persistent'
+    return 'per-request'
+
+
+def pool_stats():
+    """
+    État des connexions de chaque base pour le processus courant : avec
+    plusieurs workers, chacun a son propre pool et ses propres compteurs.
+
+    Le pool n'existe qu'après la première connexion ; avant, seuls la
+    configuration et `in_use` = 0 sont renvoyés.
+    """
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        mode = connection_mode(connection)
+        state = {
+            'vendor': connection.vendor,
+            'mode': mode,
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        }
+        if mode == 'persistent':
+            state['conn_max_age'] = connection.settings_dict['CONN_MAX_AGE']
+        if mode == 'pool':
+            options = connection.settings_dict['OPTIONS']['pool']
+            options = options if isinstance(options, dict) else {}
+            state['min_size'] = options.get('min_size', 4)
+            state['max_size'] = options.get('max_size', state['min_size'])
+            state['timeout'] = options.get('timeout', 30.0)
+            # Sans créer le pool : getattr(connection, 'pool') l'instancierait
+            pool = type(connection)._connection_pools.get(alias)
+            stats = pool.get_stats() if pool is not None else {}
+            for key, name in POOL_STATS.items():
+                state[name] = stats.get(key, 0)
+            state['in_use'] = state['size'] - state['available']
+        databases[alias] = state
+    return {'pid': os.getpid(), 'databases': databases}
@@ -0,0 +1,217 @@
+"""
+Décisions en masse : approbation et rejet des congés et des candidatures,
+changement de statut des stages.
+
+Un lot est traité dans une seule transaction, par requêtes ensemblistes :
+lecture verrouillée des lignes visées, UPDATE ... WHERE id IN (...), débits
+des soldes (en jours ouvrés) regroupés par utilisateur, écritures du
+registre et emails en bulk_create. Le nombre de requêtes ne dépend pas (à
+la taille des lots près) du nombre de lignes. Le résultat est donné ligne par ligne, dans
+l'ordre des identifiants : {'id': ..., 'status': ...} si la transition est
+appliquée, {'id': ..., 'error': ...} sinon.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .filters import filter_params
+from .models import User, Holiday, Internship, JobApplication, Leave, LeaveLedgerEntry, LeaveOverlapError
+from .outbox import enqueue_emails
+
+# Lignes traitées au plus par requête
+MAX_BULK_ITEMS = 5000
+# Soldes modifiés par requête UPDATE (une branche CASE chacun)
+BALANCE_BATCH_SIZE = 500
+
+APPLICATION_EMAILS = {
+    'approved': (
+        'Your application has been approved',
+        'Congratulations! Your application for {position} has been approved.',
+    ),
+    'rejected': (
+        'Your application status',
+        'Thank you for your interest in {position}. Unfortunately, we have decided to move forward with other candidates.',
+    ),
+}
+
+
+def application_email(application_status, position, email):
+    """(sujet, corps, destinataires) de l'email envoyé au candidat après la décision"""
+    subject, body = APPLICATION_EMAILS[application_status]
+    return subject, body.format(position=position), [email]
+
+
+def bulk_targets(view, request):
+    """
+    Identifiants visés par une action en masse, parmi les lignes visibles
+    par l'utilisateur (get_queryset de la vue) : `ids` du corps de la
+    requête, sinon les lignes qui correspondent aux filtres de la liste
+    passés dans l'URL (?status=pending&start_date__lte=...). Il faut au
+    moins un filtre ou une recherche non vide : ?format= ou ?page_size=
+    seuls ne désignent pas toutes les lignes.
+    Retourne (identifiants, queryset).
+    """
+    queryset = view.get_queryset()
+    ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+    if ids is not None:
+        if not isinstance(ids, list) or not all(type(pk) is int for pk in ids):
+            raise ValidationError({'ids': 'Expected a list of integer ids'})
+        ids = list(dict.fromkeys(ids))
+    elif any(request.query_params.get(name) for name in filter_params(view)):
+        ids = list(view.filter_queryset(queryset).order_by('pk').values_list('pk', flat=True)[:MAX_BULK_ITEMS + 1])
+    else:
+        raise ValidationError({'ids': 'Provide a list of ids or filter parameters'})
+    if len(ids) > MAX_BULK_ITEMS:
+        raise ValidationError({'ids': f'Too many items (more than {MAX_BULK_ITEMS})'})
+    return ids, queryset.filter(pk__in=ids)
+
+
+def locked_rows(queryset, *fields):
+    """Lignes du lot, verrouillées jusqu'à la fin de la transaction : {id: ligne}"""
+    rows = queryset.select_for_update().order_by('pk').values('id', *fields)
+    return {row['id']: row for row in rows}
+
+
+def results_for(ids, applied, errors):
+    """Résultat de chaque identifiant, dans l'ordre de la requête"""
+    results = []
+    for pk in ids:
+        if pk in applied:
+            results.append({'id': pk, 'status': applied[pk]})
+        else:
+            results.append({'id': pk, 'error': errors.get(pk, 'Not found')})
+    return results
+
+
+def overlaps(intervals, start, end):
+    return any(other_start <= end and other_end >= start for other_start, other_end in intervals)
+
+
+def approve_leaves(ids, queryset, approved_by=None):
+    """
+    Approuver les demandes en attente du lot et débiter les soldes.
+
+    Une demande qui chevauche un congé approuvé (ou une autre demande du lot
+    déjà retenue) du même utilisateur est écartée avec une erreur, comme
+    l'aurait fait la contrainte leave_no_overlapping_approved. Lève
+    LeaveOverlapError si la contrainte échoue malgré tout (approbation
+    concurrente) : rien n'est alors enregistré.
+    """
+    applied, errors = {}, {}
+    try:
+        with transaction.atomic():
+            rows = locked_rows(queryset, 'user_id', 'start_date', 'end_date', 'status')
+            pending = [row for row in rows.values() if row['status'] == 'pending']
+            for row in rows.values():
+                if row['status'] != 'pending':
+                    errors[row['id']] = 'Leave already processed'
+            if pending:
+                approved = defaultdict(list)
+                existing = Leave.objects.filter(
+                    status='approved', user_id__in={row['user_id'] for row in pending},
+                    start_date__lte=max(row['end_date'] for row in pending),
+                    end_date__gte=min(row['start_date'] for row in pending),
+                ).values_list('user_id', 'start_date', 'end_date')
+                for user_id, start, end in existing:
+                    approved[user_id].append((start, end))
+                accepted = []
+                for row in sorted(pending, key=lambda row: (row['user_id'], row['start_date'], row['id'])):
+                    intervals = approved[row['user_id']]
+                    if overlaps(intervals, row['start_date'], row['end_date']):
+                        errors[row['id']] = 'Leave overlaps an approved leave'
+                        continue
+                    intervals.append((row['start_date'], row['end_date']))
+                    accepted.append(row)
+                if accepted:
+                    apply_leave_approvals(accepted, approved_by)
+                applied = {row['id']: 'approved' for row in accepted}
+    except IntegrityError as exc:
+        raise LeaveOverlapError(str(exc)) from exc
+    return results_for(ids, applied, errors)
+
+
+def apply_leave_approvals(rows, approved_by):
+    """Transition, débits des soldes (en jours ouvrés) et écritures du registre des demandes `rows`"""
+    now = timezone.now()
+    Leave.objects.filter(pk__in=[row['id'] for row in rows], status='pending').update(
+        status='approved', updated_at=now
+    )
+    calendar = Holiday.calendar(min(row['start_date'] for row in rows), max(row['end_date'] for row in rows))
+    changes = defaultdict(int)
+    entries = []
+    for row in rows:
+        days = calendar.count(row['start_date'], row['end_date'])
+        changes[row['user_id']] -= days
+        entries.append(LeaveLedgerEntry(
+            user_id=row['user_id'], leave_id=row['id'], kind='leave', days=-days,
+            created_by_id=approved_by.pk if approved_by else None,
+        ))
+    change_balances(changes, now)
+    LeaveLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+def change_balances(changes, now):
+    """Ajouter à chaque solde sa variation `changes` ({user_id: jours}), une branche CASE par utilisateur"""
+    changes = list(changes.items())
+    for start in range(0, len(changes), BALANCE_BATCH_SIZE):
+        batch = changes[start:start + BALANCE_BATCH_SIZE]
+        User.objects.filter(pk__in=[user_id for user_id, _days in batch]).update(
+            leave_balance=F('leave_balance') + Case(
+                *(When(pk=user_id, then=Value(float(days))) for user_id, days in batch),
+                output_field=FloatField(),
+            ),
+            updated_at=now,
+        )
+
+
+def reject_leaves(ids, queryset):
+    """Rejeter les demandes encore en attente du lot"""
+    with transaction.atomic():
+        rows = locked_rows(queryset, 'status')
+        pending = [pk for pk, row in rows.items() if row['status'] == 'pending']
+        Leave.objects.filter(pk__in=pending).update(status='rejected', updated_at=timezone.now())
+    errors = {pk: 'Leave already processed' for pk, row in rows.items() if row['status'] != 'pending'}
+    return results_for(ids, {pk: 'rejected' for pk in pending}, errors)
+
+
+def decide_applications(ids, queryset, application_status):
+    """
+    Approuver ou rejeter les candidatures du lot et mettre en file d'attente
+    les emails aux candidats. Une candidature déjà dans ce statut est
+    laissée telle quelle (pas de second email).
+    """
+    with transaction.atomic():
+        rows = locked_rows(queryset, 'status', 'position', 'email')
+        changed = [row for row in rows.values() if row['status'] != application_status]
+        JobApplication.objects.filter(pk__in=[row['id'] for row in changed]).update(
+            status=application_status, updated_at=timezone.now()
+        )
+        enqueue_emails([application_email(application_status, row['position'], row['email']) for row in changed])
+    errors = {
+        row['id']: f'Application already {application_status}'
+        for row in rows.values() if row['status'] == application_status
+    }
+    return results_for(ids, {row['id']: application_status for row in changed}, errors)
+
+
+def change_internship_statuses(ids, queryset, status_value, user):
+    """
+    Changer le statut des stages du lot ; hors administrateurs, seulement
+    ceux dont `user` est le tuteur
+    """
+    is_admin = user.user_type == 'admin' or user.is_superuser
+    with transaction.atomic():
+        rows = locked_rows(queryset, 'supervisor_id')
+        allowed = {pk for pk, row in rows.items() if is_admin or row['supervisor_id'] == user.id}
+        Internship.objects.filter(pk__in=allowed).update(status=status_value, updated_at=timezone.now())
+    errors = {pk: 'Permission denied' for pk in rows if pk not in allowed}
+    return results_for(ids, dict.fromkeys(allowed, status_value), errors)
+
+
+def bulk_response(results):
+    """Corps de la réponse d'une action en masse"""
+    error_count = sum('error' in item for item in results)
+    return {'processed': len(results) - error_count, 'error_count': error_count, 'results': results}
@@ -0,0 +1,90 @@
+import csv
+
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+class Echo:
+    """
+    Pseudo-buffer pour csv.writer : write() renvoie la ligne au lieu de la
+    stocker, ce qui permet de la transmettre directement au client
+    """
+    def write(self, value):
+        return value
+
+
+class CsvExportMixin:
+    """
+    Ajoute l'action `export` (GET .../export/?start=&end=&user=) à un viewset.
+
+    Les lignes sont lues avec QuerySet.iterator(), c'est-à-dire par un curseur
+    côté serveur sous PostgreSQL, et écrites au fil de l'eau dans une
+    StreamingHttpResponse : la mémoire reste constante quel que soit le
+    nombre de lignes exportées. Le queryset de départ est celui de
+    get_queryset(), donc soumis aux mêmes règles de visibilité.
+    """
+    # (en-tête CSV, champ ou lookup passé à values_list)
+    export_fields = ()
+    # Champ date filtré par start/end, ou couple (début, fin) pour une période
+    export_date_field = None
+    export_user_field = 'user'
+    export_chunk_size = 2000
+
+    def filter_export_queryset(self, queryset, params):
+        start, end = params.get('start'), params.get('end')
+        if isinstance(self.export_date_field, tuple):
+            # Période qui chevauche [start, end]
+            start_field, end_field = self.export_date_field
+            if start:
+                queryset = queryset.filter(**{f'{end_field}__gte': start})
+            if end:
+                queryset = queryset.filter(**{f'{start_field}__lte': end})
+        elif self.export_date_field:
+            if start:
+                queryset = queryset.filter(**{f'{self.export_date_field}__gte': start})
+            if end:
+                queryset = queryset.filter(**{f'{self.export_date_field}__lte': end})
+        if params.get('user'):
+            queryset = queryset.filter(**{self.export_user_field: params['user']})
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporter les lignes visibles au format CSV, en streaming
+        """
+        params = {}
+        for name in ('start', 'end'):
+            value = request.query_params.get(name)
+            if value:
+                params[name] = parse_date(value)
+                if params[name] is None:
+                    return Response({'error': f'Invalid {name} date'}, status=status.HTTP_400_BAD_REQUEST)
+        user = request.query_params.get('user')
+        if user:
+            if not user.isdigit():
+                return Response({'error': 'Invalid user'}, status=status.HTTP_400_BAD_REQUEST)
+            params['user'] = int(user)
+
+        queryset = self.filter_export_queryset(self.get_queryset(), params)
+        rows = (
+            queryset.order_by('pk')
+            .values_list(*(lookup for _header, lookup in self.export_fields))
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        writer = csv.writer(Echo())
+
+        def stream():
+            yield writer.writerow([header for header, _lookup in self.export_fields])
+            for row in rows:
+                yield writer.writerow(row)
+
+        filename = '-'.join(
+            [self.basename] + [str(params[name]) for name in ('start', 'end') if name in params]
+        )
+        response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
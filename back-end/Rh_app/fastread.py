@@ -0,0 +1,152 @@
+"""
+Lecture rapide des listes : les lignes sont lues avec values() et converties
+champ par champ, sans instancier de modèle ni passer par
+Serializer.to_representation.
+
+La conversion réutilise la méthode to_representation de chaque champ du
+serializer : la réponse est identique octet pour octet à celle du
+serializer. Seuls les champs dont la valeur se lit directement dans une
+colonne sont pris en charge ; si un champ ne l'est pas (serializer imbriqué,
+fichier, SerializerMethodField, relation nullable...), la liste passe par le
+serializer comme avant.
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .pagination import page_fields
+
+# Champs dont get_attribute lit simplement la colonne ; None : valeur
+# renvoyée telle quelle, sinon to_representation du champ
+CONVERTED_FIELDS = {
+    serializers.IntegerField: None,
+    serializers.BigIntegerField: 'to_representation',
+    serializers.ReadOnlyField: None,
+    serializers.PrimaryKeyRelatedField: None,
+    serializers.CharField: 'to_representation',
+    serializers.EmailField: 'to_representation',
+    serializers.ChoiceField: 'to_representation',
+    serializers.BooleanField: 'to_representation',
+    serializers.DateField: 'to_representation',
+    serializers.DateTimeField: 'to_representation',
+    serializers.DecimalField: 'to_representation',
+    serializers.FloatField: 'to_representation',
+}
+
+
+def column_path(field, model):
+    """
+    Chemin ORM lu par `field`, ou None si la valeur n'est pas celle d'une
+    colonne atteinte par des clés étrangères non nulles (DRF omet le champ
+    quand une relation intermédiaire est nulle)
+    """
+    parts = field.source_attrs
+    if not parts:
+        return None
+    target = model
+    for i, part in enumerate(parts):
+        try:
+            model_field = target._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        last = i == len(parts) - 1
+        if model_field.is_relation:
+            # Une relation n'est lue que par sa clé (PrimaryKeyRelatedField)
+            if last != isinstance(field, serializers.PrimaryKeyRelatedField):
+                return None
+            if not last and model_field.null:
+                return None
+            target = model_field.related_model
+        elif not last:
+            return None
+    return '__'.join(parts)
+
+
+class ListPlan:
+    """
+    Colonnes à lire et conversion de chaque ligne de values() en la
+    représentation du serializer
+    """
+
+    def __init__(self, columns, plain):
+        # (nom du champ, chemin ORM, conversion ou None)
+        self.columns = columns
+        # Aucun flottant dans les lignes : encodage possible par orjson (renderers.render_plain)
+        self.plain = plain
+
+    @classmethod
+    def compile(cls, serializer, model):
+        """Plan du serializer `serializer`, ou None s'il n'est pas pris en charge"""
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            return None
+        columns = []
+        plain = True
+        for field in serializer._readable_fields:
+            kind = type(field)
+            if kind not in CONVERTED_FIELDS:
+                return None
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is not None:
+                return None
+            if isinstance(field, serializers.FloatField) or (
+                isinstance(field, serializers.DecimalField) and not getattr(
+                    field, 'coerce_to_string', serializers.api_settings.COERCE_DECIMAL_TO_STRING
+                )
+            ):
+                plain = False
+            path = column_path(field, model)
+            if path is None:
+                return None
+            method = CONVERTED_FIELDS[kind]
+            columns.append((field.field_name, path, getattr(field, method) if method else None))
+        return cls(columns, plain)
+
+    def queryset(self, queryset, extra=()):
+        """`queryset` réduit aux colonnes du plan et à `extra` (clé de pagination)"""
+        paths = dict.fromkeys(path for _, path, _ in self.columns)
+        paths.update(dict.fromkeys(extra))
+        return queryset.values(*paths)
+
+    def rows(self, rows):
+        columns = self.columns
+        results = []
+        for row in rows:
+            item = {}
+            for name, path, convert in columns:
+                value = row[path]
+                item[name] = value if convert is None or value is None else convert(value)
+            results.append(item)
+        return results
+
+
+class FastListMixin:
+    """
+    Action `list` par ListPlan quand le serializer de la liste le permet
+    (FAST_READ_ENABLED), par le serializer sinon. À placer juste avant
+    ModelViewSet dans les bases, pour que ConditionalGetMixin et
+    SparseFieldsetMixin s'appliquent.
+
+    Les réponses sans flottant sont marquées `plain_data` : FastJSONRenderer
+    les encode avec orjson.
+    """
+
+    def list_plan(self):
+        if not settings.FAST_READ_ENABLED:
+            return None
+        return ListPlan.compile(self.get_serializer(), self.get_queryset().model)
+
+    def list(self, request, *args, **kwargs):
+        plan = self.list_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = plan.queryset(queryset, page_fields(self, queryset))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(plan.rows(page))
+        else:
+            response = Response(plan.rows(queryset))
+        response.plain_data = plan.plain
+        return response
@@ -0,0 +1,121 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .pagination import page_fields
+
+SPARSE_ACTIONS = ('list', 'retrieve')
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer dont on peut restreindre les champs : `fields` (champs gardés)
+    ou `omit` (champs retirés), passés à la construction
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+def model_paths(serializer, model):
+    """
+    Chemins ORM (`user__username`) des colonnes lues par les champs du
+    serializer, ou None si un champ ne correspond pas à une colonne
+    (propriété, source='*', relation multiple) : la requête n'est alors pas
+    restreinte.
+    """
+    paths = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            return None
+        path = field.source.replace('.', '__')
+        target = model
+        for part in path.split('__'):
+            try:
+                model_field = target._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if model_field.many_to_many or model_field.one_to_many:
+                return None
+            target = model_field.related_model
+        if isinstance(field, serializers.BaseSerializer):
+            nested = model_paths(field, target)
+            if nested is None:
+                return None
+            paths.append(path)
+            paths.extend(f'{path}__{nested_path}' for nested_path in nested)
+        else:
+            paths.append(path)
+    return paths
+
+
+class SparseFieldsetMixin:
+    """
+    Représentations partielles pour `list` et `retrieve`.
+
+    `?fields=a,b` renvoie uniquement ces champs du serializer de détail ;
+    `?omit=c,d` retire des champs de la représentation par défaut, qui est
+    pour `list` le serializer compact `list_serializer_class`. Un nom inconnu
+    donne une erreur 400.
+
+    La requête SQL ne lit que les colonnes nécessaires (only()), plus la clé
+    de la pagination par curseur ; les jointures inutiles sont retirées.
+    """
+    list_serializer_class = None
+
+    def sparse_fields(self):
+        """(fields, omit) validés, ou (None, None) sans restriction"""
+        if self.action not in SPARSE_ACTIONS:
+            return None, None
+        if not hasattr(self, '_sparse_fields'):
+            params = self.request.query_params
+            fields = [name for name in params.get('fields', '').split(',') if name] or None
+            omit = [name for name in params.get('omit', '').split(',') if name] or None
+            if fields is not None or omit is not None:
+                available = set(self.get_serializer_class()().fields)
+                for param, names in (('fields', fields), ('omit', omit)):
+                    unknown = sorted(set(names or ()) - available)
+                    if unknown:
+                        raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}"})
+            self._sparse_fields = fields, omit
+        return self._sparse_fields
+
+    def get_serializer_class(self):
+        if (self.action == 'list' and self.list_serializer_class is not None
+                and not self.request.query_params.get('fields', '').strip(',')):
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        fields, omit = self.sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if omit is not None:
+            kwargs.setdefault('omit', omit)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in SPARSE_ACTIONS:
+            return queryset
+        paths = model_paths(self.get_serializer(), queryset.model)
+        if paths is None:
+            return queryset
+        if self.action == 'list':
+            paths += page_fields(self, queryset)
+        relations = set()
+        for path in paths:
+            parts = path.split('__')
+            relations.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+        # select_related() sans argument suivrait toutes les clés étrangères
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(queryset.model._meta.pk.name, *paths, *relations)
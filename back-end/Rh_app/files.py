@@ -0,0 +1,183 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.text import get_valid_filename
+from rest_framework import serializers
+
+# Extensions acceptées et signature des premiers octets du fichier
+CV_TYPES = {
+    '.pdf': (b'%PDF', 'application/pdf'),
+    '.docx': (b'PK\x03\x04', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    '.doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+}
+# Taille des blocs lus dans le corps de la requête et écrits sur disque
+BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def cv_extension(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in CV_TYPES:
+        raise serializers.ValidationError(
+            f"Unsupported file type; accepted: {', '.join(sorted(CV_TYPES))}"
+        )
+    return extension
+
+
+def check_cv_size(size):
+    if size > settings.CV_UPLOAD_MAX_SIZE:
+        raise serializers.ValidationError(
+            f'File too large; maximum size is {settings.CV_UPLOAD_MAX_SIZE} bytes'
+        )
+
+
+def check_signature(filename, head):
+    signature, _content_type = CV_TYPES[cv_extension(filename)]
+    if not head.startswith(signature):
+        raise serializers.ValidationError('File content does not match its extension')
+
+
+def validate_cv_file(file):
+    """
+    Taille, extension et signature d'un CV envoyé en multipart
+    """
+    check_cv_size(file.size)
+    cv_extension(file.name)
+    head = file.read(len(max((signature for signature, _type in CV_TYPES.values()), key=len)))
+    file.seek(0)
+    check_signature(file.name, head)
+    return file
+
+
+def final_cv_name(upload):
+    # L'identifiant du téléversement rend le nom unique sans requête au stockage
+    return f'cvs/{upload.pk.hex}_{get_valid_filename(upload.filename)}'
+
+
+def append_chunk(upload, stream, length):
+    """
+    Écrire `length` octets de `stream` à la position `upload.offset` du
+    fichier partiel, par blocs : la mémoire utilisée ne dépend pas de la
+    taille du morceau. Le premier morceau est refusé si sa signature ne
+    correspond pas à l'extension. Retourne le nouvel offset.
+    """
+    if upload.offset + length > upload.size:
+        raise UploadError('Chunk exceeds the declared upload size', 413)
+    path = default_storage.path(upload.partial_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+        # Un morceau interrompu précédemment est écrasé
+        f.seek(upload.offset)
+        f.truncate()
+        remaining = length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                f.truncate(upload.offset)
+                raise UploadError('Request body shorter than Content-Length', 400)
+            if f.tell() == 0:
+                try:
+                    check_signature(upload.filename, block)
+                except serializers.ValidationError as e:
+                    raise UploadError(e.detail[0], 415)
+            f.write(block)
+            remaining -= len(block)
+    return upload.offset + length
+
+
+def complete_upload(upload):
+    """
+    Déplacer le fichier complet à son emplacement définitif (simple
+    renommage, sans copie)
+    """
+    name = final_cv_name(upload)
+    os.replace(default_storage.path(upload.partial_name), default_storage.path(name))
+    return name
+
+
+def parse_range(header, size):
+    """
+    (début, fin) inclusifs pour un en-tête `Range: bytes=...` portant sur une
+    seule plage ; None pour servir le fichier entier. Lève ValueError si la
+    plage ne peut pas être satisfaite.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        suffix = int(end)
+        if not suffix:
+            raise ValueError(header)
+        return max(size - suffix, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length:
+            block = file.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def serve_file(request, field_file, filename):
+    """
+    Servir un fichier du stockage.
+
+    Si CV_ACCEL_REDIRECT_PREFIX est défini, la réponse est vide et porte un
+    en-tête X-Accel-Redirect : nginx envoie le fichier lui-même (plages
+    comprises) sans occuper un worker Python. Sinon le fichier est lu par
+    blocs, avec prise en charge d'une plage `Range: bytes=` (réponse 206).
+    """
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    disposition = f"attachment; filename*=UTF-8''{quote(filename)}"
+    prefix = settings.CV_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + field_file.name)
+        response['Content-Disposition'] = disposition
+        return response
+
+    size = field_file.size
+    byte_range = None
+    # If-Range sans validateur connu : on renvoie le fichier entier
+    if 'Range' in request.headers and 'If-Range' not in request.headers:
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = field_file.storage.open(field_file.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(file, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return response
@@ -0,0 +1,135 @@
+"""
+Filtres, tri et recherche des listes par paramètres d'URL.
+
+Les filtres s'appliquent au queryset de get_queryset(), donc après les
+règles de visibilité du rôle : un filtre ne peut que restreindre ce que
+l'utilisateur voit déjà. Chaque paramètre devient une condition SQL sur une
+colonne indexée (voir les index des modèles). Une valeur invalide donne une
+erreur 400 ; les paramètres inconnus sont ignorés (pagination, fields...).
+
+`?search=` (SearchFilter de DRF) cherche chaque mot, sans tenir compte de
+la casse, dans les champs `search_fields` de la vue ; sous PostgreSQL, les
+index trigrammes de la migration 0010 servent ces recherches.
+"""
+from django.utils.dateparse import parse_date
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+# Comparaisons acceptées sur les dates : ?start_date__gte=2024-01-01
+DATE_LOOKUPS = ('gte', 'lte', 'gt', 'lt')
+TRUE_VALUES = ('true', '1')
+FALSE_VALUES = ('false', '0')
+
+
+def parse_values(param, raw, convert, message):
+    """Liste de valeurs séparées par des virgules, converties par `convert`"""
+    values = []
+    for value in raw.split(','):
+        value = value.strip()
+        converted = convert(value) if value else None
+        if converted is None:
+            raise ValidationError({param: f'{message}: {value!r}'})
+        values.append(converted)
+    return values
+
+
+def parse_id(value):
+    return int(value) if value.isdigit() else None
+
+
+def parse_date_value(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+class FieldFilter(filters.BaseFilterBackend):
+    """
+    Filtres déclarés par la vue dans `filter_fields` : {paramètre: (champ, type)}.
+
+    - 'choice' : `?status=pending,approved`, valeurs vérifiées d'après les
+      choices du champ ;
+    - 'id' : `?user=3` ou `?user=3,4` ;
+    - 'date' : `?date=2024-01-31`, `?date__gte=...`, `?date__lt=...` ;
+    - 'bool' : `?completed=true` (ou false, 1, 0).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        conditions = {}
+        for param, (field, kind) in getattr(view, 'filter_fields', {}).items():
+            if kind == 'date':
+                for lookup in ('', *DATE_LOOKUPS):
+                    name = f'{param}__{lookup}' if lookup else param
+                    if name in params:
+                        value = parse_date_value(params[name])
+                        if value is None:
+                            raise ValidationError({name: f'Invalid date: {params[name]!r}'})
+                        conditions[f'{field}__{lookup}' if lookup else field] = value
+                continue
+            if param not in params:
+                continue
+            raw = params[param]
+            if kind == 'bool':
+                if raw.lower() not in TRUE_VALUES + FALSE_VALUES:
+                    raise ValidationError({param: f'Invalid boolean: {raw!r}'})
+                conditions[field] = raw.lower() in TRUE_VALUES
+            elif kind == 'id':
+                conditions[f'{field}__in'] = parse_values(param, raw, parse_id, 'Invalid id')
+            elif kind == 'choice':
+                choices = {str(key) for key, _label in queryset.model._meta.get_field(field).choices}
+                conditions[f'{field}__in'] = parse_values(
+                    param, raw, lambda value: value if value in choices else None, 'Invalid choice'
+                )
+        return queryset.filter(**conditions) if conditions else queryset
+
+
+class OrderingFilter(filters.OrderingFilter):
+    """
+    `?ordering=-start_date,created_at` parmi les champs `ordering_fields` de
+    la vue ; un champ inconnu donne une erreur 400. Sans paramètre, l'ordre
+    est celui de la pagination par curseur. L'id est ajouté en dernier pour
+    que l'ordre soit total.
+    """
+
+    def get_default_ordering(self, view):
+        return getattr(view.paginator, 'ordering', None)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = {item[0] for item in self.get_valid_fields(queryset, view, {'request': request})}
+        unknown = [term for term in fields if term.lstrip('-') not in valid_fields]
+        if unknown:
+            raise ValidationError({self.ordering_param: f"Unknown field(s): {', '.join(unknown)}"})
+        return fields
+
+    def get_valid_fields(self, queryset, view, context=None):
+        return [(name, name) for name in getattr(view, 'ordering_fields', ())]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        ordering = list(ordering)
+        if not any(term.lstrip('-') in ('id', 'pk') for term in ordering):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+
+def filter_params(view):
+    """
+    Paramètres d'URL qui restreignent la liste de `view` : ceux de
+    `filter_fields` (avec les comparaisons des dates) et `search`
+    """
+    names = set()
+    for param, (_field, kind) in getattr(view, 'filter_fields', {}).items():
+        names.add(param)
+        if kind == 'date':
+            names.update(f'{param}__{lookup}' for lookup in DATE_LOOKUPS)
+    if getattr(view, 'search_fields', None):
+        names.add(api_settings.SEARCH_PARAM)
+    return names
+
+
+LIST_FILTER_BACKENDS = (FieldFilter, filters.SearchFilter, OrderingFilter)
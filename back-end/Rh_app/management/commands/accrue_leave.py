@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Rh_app.accrual import accrual_candidates, accrue_month, months_between
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f"Mois invalide : {value!r} (format AAAA-MM)")
+
+
+class Command(BaseCommand):
+    help = "Créditer les congés acquis du mois (LEAVE_ACCRUAL_DAYS_PER_MONTH) à tous les utilisateurs actifs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Mois à créditer, AAAA-MM (défaut : le mois en cours)")
+        parser.add_argument(
+            '--since', help="Créditer aussi les mois précédents depuis ce mois (AAAA-MM) ; les mois déjà crédités sont ignorés",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Compter les utilisateurs à créditer sans rien écrire")
+
+    def handle(self, *args, **options):
+        last = parse_month(options['month']) if options['month'] else timezone.localdate().replace(day=1)
+        first = parse_month(options['since']) if options['since'] else last
+        if first > last:
+            raise CommandError("--since doit précéder --month")
+        total = 0
+        for month in months_between(first, last):
+            if options['dry_run']:
+                count = accrual_candidates(month).count()
+                self.stdout.write(f"{month:%Y-%m}: {count} utilisateur(s) à créditer")
+            else:
+                count = accrue_month(month)
+                self.stdout.write(f"{month:%Y-%m}: {count} utilisateur(s) crédité(s)")
+            total += count
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("Simulation : aucun crédit écrit"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{total} crédit(s) mensuel(s) écrit(s) au registre"))
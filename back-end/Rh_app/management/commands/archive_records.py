@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Rh_app.archive import ARCHIVE_BATCH_SIZE, ARCHIVES, archive_batch, archive_cutoff, vacuum_tables, write_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplacer les heures de travail, congés et candidatures traités anciens vers les tables "
+        "d'archive, avec une copie JSON Lines compressée par mois"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None, metavar='JOURS',
+            help=f"Âge minimal des lignes archivées (défaut : ARCHIVE_HORIZON_DAYS = {settings.ARCHIVE_HORIZON_DAYS})",
+        )
+        parser.add_argument(
+            '--only', action='append', choices=list(ARCHIVES),
+            help="Archiver seulement ces données (option répétable)",
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help="Lignes déplacées par transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Compter les lignes à archiver sans rien déplacer")
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help="Lancer VACUUM (ANALYZE) sur les tables courantes après l'archivage (PostgreSQL)",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['older_than'])
+        names = options['only'] or list(ARCHIVES)
+        self.stdout.write(f"Archivage des lignes antérieures au {cutoff}")
+        archived = []
+        for name in names:
+            spec = ARCHIVES[name]
+            if options['dry_run']:
+                self.stdout.write(f"{name}: {spec.candidates(cutoff).count()} ligne(s) à archiver")
+                continue
+            count, months = 0, set()
+            while True:
+                moved, batch_months = archive_batch(spec, cutoff, options['batch_size'])
+                if not moved:
+                    break
+                count += moved
+                months |= batch_months
+            for month in sorted(months):
+                write_month(name, month)
+            if count:
+                archived.append(spec.model)
+            self.stdout.write(f"{name}: {count} ligne(s) archivée(s), {len(months)} fichier(s) mensuel(s) réécrit(s)")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("Simulation : aucune ligne déplacée"))
+            return
+        if options['vacuum']:
+            vacuum_tables(archived)
+        self.stdout.write(self.style.SUCCESS("Archivage terminé"))
@@ -0,0 +1,399 @@
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from Rh_app.archive import ARCHIVES
+from Rh_app.authentication import RoleTokenObtainPairSerializer
+from Rh_app.models import User, CvUpload, Leave, Mission, WorkHours, Internship, JobApplication
+from Rh_app.urls import router
+
+PDF = b'%PDF-1.4\n' + b'0' * 200_000
+
+
+def json_body(build):
+    return lambda c: {'data': build(c), 'format': 'json'}
+
+
+# (endpoint, rôle, méthode, chemin, arguments de la requête) ; l'endpoint est
+# `préfixe du routeur.action`, le chemin et les arguments sont construits à
+# partir du contexte (voir Command.context). Les requêtes qui modifient les
+# données sont annulées après chaque exécution.
+ENDPOINTS = (
+    ('users.list', 'admin', 'get', '/api/users/', None),
+    ('users.list', 'employee', 'get', '/api/users/', None),
+    ('users.list', 'admin', 'get', '/api/users/?page_size=500', None),
+    ('users.retrieve', 'admin', 'get', '/api/users/{employee}/', None),
+    ('users.me', 'employee', 'get', '/api/users/me/', None),
+    ('users.create', None, 'post', '/api/users/', json_body(lambda c: {
+        'username': 'bench_signup', 'email': 'bench_signup@example.com', 'password': 'bench-password-1',
+    })),
+    ('users.update', 'admin', 'put', '/api/users/{spare_user}/', json_body(lambda c: {
+        'username': 'bench_spare', 'email': 'bench_spare@example.com', 'password': 'bench-password-1',
+        'user_type': 'employee', 'first_name': 'Bench', 'last_name': 'Spare',
+    })),
+    ('users.partial_update', 'admin', 'patch', '/api/users/{spare_user}/', json_body(lambda c: {'first_name': 'Bench'})),
+    ('users.destroy', 'admin', 'delete', '/api/users/{spare_user}/', None),
+
+    ('leaves.list', 'admin', 'get', '/api/leaves/', None),
+    ('leaves.list', 'employee', 'get', '/api/leaves/', None),
+    ('leaves.list', 'admin', 'get', '/api/leaves/?page_size=500', None),
+    ('leaves.retrieve', 'employee', 'get', '/api/leaves/{leave}/', None),
+    ('leaves.create', 'employee', 'post', '/api/leaves/', json_body(lambda c: {
+        'start_date': c['future'], 'end_date': c['future'], 'reason': 'Benchmark',
+    })),
+    ('leaves.update', 'employee', 'put', '/api/leaves/{leave}/', json_body(lambda c: {
+        'start_date': c['future'], 'end_date': c['future'], 'reason': 'Benchmark',
+    })),
+    ('leaves.partial_update', 'employee', 'patch', '/api/leaves/{leave}/', json_body(lambda c: {'reason': 'Benchmark'})),
+    ('leaves.destroy', 'employee', 'delete', '/api/leaves/{leave}/', None),
+    ('leaves.approve_leave', 'admin', 'post', '/api/leaves/{leave}/approve_leave/', None),
+    ('leaves.reject_leave', 'admin', 'post', '/api/leaves/{leave}/reject_leave/', None),
+    ('leaves.export', 'admin', 'get', '/api/leaves/export/', None),
+    ('leaves.bulk_approve', 'admin', 'post', '/api/leaves/bulk_approve/?status=pending', None),
+    ('leaves.bulk_reject', 'admin', 'post', '/api/leaves/bulk_reject/', json_body(lambda c: {'ids': [c['leave']]})),
+    ('leaves.calendar', 'admin', 'get', '/api/leaves/calendar/?start={today}&end={next_month}', None),
+
+    ('missions.list', 'admin', 'get', '/api/missions/', None),
+    ('missions.list', 'employee', 'get', '/api/missions/', None),
+    ('missions.retrieve', 'employee', 'get', '/api/missions/{mission}/', None),
+    ('missions.create', 'admin', 'post', '/api/missions/', json_body(lambda c: {
+        'title': 'Benchmark', 'description': 'Benchmark', 'assigned_to': c['employee'],
+        'supervisor': c['admin'], 'deadline': c['future'],
+    })),
+    ('missions.update', 'admin', 'put', '/api/missions/{mission}/', json_body(lambda c: {
+        'title': 'Benchmark', 'description': 'Benchmark', 'assigned_to': c['employee'],
+        'supervisor': c['admin'], 'deadline': c['future'], 'completed': False,
+    })),
+    ('missions.partial_update', 'admin', 'patch', '/api/missions/{mission}/', json_body(lambda c: {'title': 'Benchmark'})),
+    ('missions.destroy', 'admin', 'delete', '/api/missions/{mission}/', None),
+    ('missions.complete_mission', 'employee', 'post', '/api/missions/{mission}/complete_mission/', None),
+    ('missions.export', 'admin', 'get', '/api/missions/export/', None),
+
+    ('work-hours.list', 'admin', 'get', '/api/work-hours/', None),
+    ('work-hours.list', 'employee', 'get', '/api/work-hours/', None),
+    ('work-hours.list', 'admin', 'get', '/api/work-hours/?page_size=500', None),
+    ('work-hours.retrieve', 'employee', 'get', '/api/work-hours/{work_hours}/', None),
+    ('work-hours.create', 'employee', 'post', '/api/work-hours/', json_body(lambda c: {
+        'date': c['future'], 'hours_worked': '7.50',
+    })),
+    ('work-hours.update', 'employee', 'put', '/api/work-hours/{work_hours}/', json_body(lambda c: {
+        'date': c['future'], 'hours_worked': '7.50',
+    })),
+    ('work-hours.partial_update', 'employee', 'patch', '/api/work-hours/{work_hours}/', json_body(lambda c: {'hours_worked': '6.00'})),
+    ('work-hours.destroy', 'employee', 'delete', '/api/work-hours/{work_hours}/', None),
+    ('work-hours.bulk', 'admin', 'post', '/api/work-hours/bulk/', json_body(lambda c: [
+        {'user': c['employee'], 'date': (date.fromisoformat(c['future']) + timedelta(days=i)).isoformat(), 'hours_worked': '7.50'}
+        for i in range(100)
+    ])),
+    ('work-hours.export', 'admin', 'get', '/api/work-hours/export/', None),
+    ('timesheets.list', 'admin', 'get', '/api/timesheets/?period=month&page_size=500', None),
+    ('timesheets.list', 'employee', 'get', '/api/timesheets/?period=week', None),
+
+    ('internships.list', 'admin', 'get', '/api/internships/', None),
+    ('internships.list', 'intern', 'get', '/api/internships/', None),
+    ('internships.retrieve', 'admin', 'get', '/api/internships/{internship}/', None),
+    ('internships.create', 'admin', 'post', '/api/internships/', json_body(lambda c: {
+        'intern': c['intern'], 'supervisor': c['employee'], 'start_date': c['future'], 'end_date': c['future'],
+    })),
+    ('internships.update', 'admin', 'put', '/api/internships/{internship}/', json_body(lambda c: {
+        'intern': c['intern'], 'supervisor': c['employee'], 'start_date': c['future'], 'end_date': c['future'],
+        'status': 'active',
+    })),
+    ('internships.partial_update', 'admin', 'patch', '/api/internships/{internship}/', json_body(lambda c: {'status': 'active'})),
+    ('internships.destroy', 'admin', 'delete', '/api/internships/{internship}/', None),
+    ('internships.change_status', 'admin', 'post', '/api/internships/{internship}/change_status/', json_body(lambda c: {'status': 'active'})),
+    ('internships.bulk_change_status', 'admin', 'post', '/api/internships/bulk_change_status/?status=pending', json_body(lambda c: {'status': 'active'})),
+
+    ('job-applications.list', 'admin', 'get', '/api/job-applications/', None),
+    ('job-applications.retrieve', 'admin', 'get', '/api/job-applications/{application}/', None),
+    ('job-applications.create', 'employee', 'post', '/api/job-applications/', lambda c: {'format': 'multipart', 'data': {
+        'application_type': 'employee', 'position': 'Benchmark', 'first_name': 'Bench', 'last_name': 'Mark',
+        'email': 'bench@example.com', 'phone': '20000000', 'education': 'Master', 'experience': 'Django',
+        'motivation': 'Benchmark', 'cv_file': SimpleUploadedFile('cv.pdf', PDF, content_type='application/pdf'),
+    }}),
+    ('job-applications.update', 'admin', 'put', '/api/job-applications/{application}/', json_body(lambda c: {
+        'application_type': 'employee', 'position': 'Benchmark', 'first_name': 'Bench', 'last_name': 'Mark',
+        'email': 'bench@example.com', 'phone': '20000000', 'education': 'Master', 'experience': 'Django',
+        'motivation': 'Benchmark', 'status': 'pending',
+    })),
+    ('job-applications.partial_update', 'admin', 'patch', '/api/job-applications/{application}/', json_body(lambda c: {'position': 'Benchmark'})),
+    ('job-applications.destroy', 'admin', 'delete', '/api/job-applications/{application}/', None),
+    ('job-applications.cv', 'admin', 'get', '/api/job-applications/{application}/cv/', None),
+    ('job-applications.search', 'admin', 'get', '/api/job-applications/search/?q=django postgresql', None),
+    ('job-applications.approve', 'admin', 'post', '/api/job-applications/{application}/approve/', None),
+    ('job-applications.reject', 'admin', 'post', '/api/job-applications/{application}/reject/', None),
+    ('job-applications.bulk_approve', 'admin', 'post', '/api/job-applications/bulk_approve/?status=pending', None),
+    ('job-applications.bulk_reject', 'admin', 'post', '/api/job-applications/bulk_reject/', json_body(lambda c: {'ids': [c['application']]})),
+
+    ('cv-uploads.create', 'employee', 'post', '/api/cv-uploads/', json_body(lambda c: {'filename': 'cv.pdf', 'size': 1024 * 1024})),
+    ('cv-uploads.retrieve', 'employee', 'get', '/api/cv-uploads/{cv_upload}/', None),
+    ('cv-uploads.partial_update', 'employee', 'patch', '/api/cv-uploads/{cv_upload}/', lambda c: {
+        'data': PDF[:64 * 1024], 'content_type': 'application/offset+octet-stream', 'HTTP_UPLOAD_OFFSET': '0',
+    }),
+    ('cv-uploads.destroy', 'employee', 'delete', '/api/cv-uploads/{cv_upload}/', None),
+
+    ('archive/work-hours.list', 'admin', 'get', '/api/archive/work-hours/?page_size=500', None),
+    ('archive/work-hours.list', 'employee', 'get', '/api/archive/work-hours/', None),
+    ('archive/work-hours.retrieve', 'employee', 'get', '/api/archive/work-hours/{archived_work_hours}/', None),
+    ('archive/leaves.list', 'admin', 'get', '/api/archive/leaves/', None),
+    ('archive/leaves.list', 'employee', 'get', '/api/archive/leaves/', None),
+    ('archive/leaves.retrieve', 'employee', 'get', '/api/archive/leaves/{archived_leave}/', None),
+    ('archive/job-applications.list', 'admin', 'get', '/api/archive/job-applications/', None),
+    ('archive/job-applications.retrieve', 'admin', 'get', '/api/archive/job-applications/{archived_application}/', None),
+
+    ('dashboard.list', 'admin', 'get', '/api/dashboard/', None),
+    ('dashboard.list', 'employee', 'get', '/api/dashboard/', None),
+    ('db-pool.list', 'admin', 'get', '/api/db-pool/', None),
+)
+STANDARD_ACTIONS = ('list', 'create', 'retrieve', 'update', 'partial_update', 'destroy')
+
+
+class Rollback(Exception):
+    pass
+
+
+def archived_copy(name, pk):
+    """Copie dans l'archive de la ligne courante `pk` : son identifiant est libre dans l'archive"""
+    spec = ARCHIVES[name]
+    row = spec.model.objects.values(*spec.columns).get(pk=pk)
+    return spec.archive_model.objects.create(month=spec.month_of(row[spec.month_field]), **row).id
+
+
+def router_endpoints():
+    """`préfixe.action` pour chaque route et action personnalisée du routeur"""
+    endpoints = set()
+    for prefix, viewset, _basename in router.registry:
+        for name in STANDARD_ACTIONS:
+            if hasattr(viewset, name):
+                endpoints.add(f'{prefix}.{name}')
+        for extra in viewset.get_extra_actions():
+            endpoints.add(f'{prefix}.{extra.__name__}')
+    return endpoints
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(
+            ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    try:
+        return git('rev-parse', '--short', 'HEAD'), bool(git('status', '--porcelain'))
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Chronométrer chaque endpoint du routeur et chaque action personnalisée "
+        "sur les données en base (voir generate_data) : requêtes SQL, latences "
+        "p50/p95/p99 et pic mémoire. Les modifications sont annulées. --output "
+        "enregistre les résultats en JSON, --compare les compare à un fichier "
+        "précédent (par exemple celui d'un autre commit)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', help="Ne mesurer que les endpoints contenant ce texte")
+        parser.add_argument('--output', help="Fichier JSON de résultats")
+        parser.add_argument('--compare', help="Fichier JSON de référence")
+        parser.add_argument(
+            '--threshold', type=float, default=20.0,
+            help="Hausse du p50 (en %%) au-delà de laquelle un endpoint est signalé",
+        )
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                "DEBUG=True : chaque requête SQL est conservée en mémoire, les mesures s'en ressentent"
+            ))
+        uncovered = sorted(router_endpoints() - {endpoint for endpoint, *_rest in ENDPOINTS})
+        for endpoint in uncovered:
+            self.stdout.write(self.style.WARNING(f"Endpoint non mesuré : {endpoint}"))
+
+        specs = [spec for spec in ENDPOINTS if not options['only'] or options['only'] in spec[0]]
+        # Fichiers écrits par les requêtes (CV) dans un répertoire temporaire
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            try:
+                with transaction.atomic():
+                    context = self.context()
+                    clients = {role: self.client(context, role) for role in ('admin', 'employee', 'intern', None)}
+                    results = {}
+                    for endpoint, role, method, path, build in specs:
+                        name = f'{endpoint} ({role or "anonyme"})'
+                        if name in results:
+                            # Même endpoint avec d'autres paramètres (?page_size=...)
+                            name = f"{name} {path.partition('?')[2]}"
+                        results[name] = self.measure(
+                            clients[role], method, path.format(**context), build, context, options
+                        )
+                        self.report_line(name, results[name])
+                    raise Rollback
+            except Rollback:
+                pass
+
+        revision, dirty = git_revision()
+        report = {
+            'meta': {
+                'revision': revision, 'dirty': dirty, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'vendor': connection.vendor, 'debug': settings.DEBUG,
+                'python': platform.python_version(), 'django': django.get_version(),
+                'repeat': options['repeat'], 'rows': self.row_counts(), 'uncovered': uncovered,
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Résultats enregistrés dans {options['output']}")
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = self.compare(baseline, report, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} endpoint(s) en régression")
+
+    def context(self):
+        """
+        Utilisateurs de chaque rôle et objets qui leur sont visibles ; les
+        objets créés ici disparaissent avec l'annulation finale
+        """
+        admin = User.objects.filter(user_type='admin').order_by('id').first()
+        employee = User.objects.filter(
+            user_type='employee', leave_requests__status='pending', assigned_missions__completed=False,
+            workhours__isnull=False,
+        ).order_by('id').first()
+        intern = User.objects.filter(user_type='intern', internship__isnull=False).order_by('id').first()
+        application = JobApplication.objects.order_by('id').first()
+        if None in (admin, employee, intern, application):
+            raise CommandError("Données insuffisantes : lancer d'abord generate_data")
+
+        application.cv_file = default_storage.save('cvs/benchmark.pdf', ContentFile(PDF))
+        application.save(update_fields=['cv_file'])
+        spare_user = User.objects.create(username='bench_spare', email='bench_spare@example.com')
+        cv_upload = CvUpload.objects.create(user=employee, filename='cv.pdf', size=1024 * 1024)
+        # Date sans congé ni heures enregistrées
+        future = date.today() + timedelta(days=3650)
+        leave = employee.leave_requests.filter(status='pending').order_by('id').first().pk
+        work_hours = WorkHours.objects.filter(user=employee).order_by('-date').first().pk
+        return {
+            'admin': admin.pk, 'employee': employee.pk, 'intern': intern.pk, 'spare_user': spare_user.pk,
+            'leave': leave,
+            'mission': Mission.objects.filter(assigned_to=employee, completed=False).order_by('id').first().pk,
+            'work_hours': work_hours,
+            'internship': Internship.objects.filter(intern=intern).order_by('id').first().pk,
+            'application': application.pk, 'cv_upload': cv_upload.pk, 'future': future.isoformat(),
+            'today': date.today().isoformat(), 'next_month': (date.today() + timedelta(days=30)).isoformat(),
+            'archived_work_hours': archived_copy('work-hours', work_hours),
+            'archived_leave': archived_copy('leaves', leave),
+            'archived_application': archived_copy('job-applications', application.pk),
+        }
+
+    def client(self, context, role):
+        client = APIClient(SERVER_NAME='localhost')
+        if role is not None:
+            # Jeton réel : l'authentification JWT fait partie de la mesure
+            user = User.objects.get(pk=context[role])
+            token = RoleTokenObtainPairSerializer.get_token(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def measure(self, client, method, path, build, context, options):
+        def request():
+            kwargs = build(context) if build else {}
+            response = getattr(client, method)(path, **kwargs)
+            # Le client de test ferme lui-même la réponse (sans fermer la connexion)
+            size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+            return response.status_code, size
+
+        def run():
+            if method == 'get':
+                return request()
+            with transaction.atomic():
+                result = request()
+                transaction.set_rollback(True)
+            return result
+
+        for _ in range(options['warmup']):
+            run()
+        # Requêtes et mémoire sur une exécution à part : tracemalloc ralentit tout.
+        # Le journal connection.queries est vidé à chaque début de requête :
+        # les requêtes SQL sont comptées au passage.
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        tracemalloc.start()
+        try:
+            with connection.execute_wrapper(record):
+                status, size = run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        cuts = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else timings * 99
+        return {
+            'status': status, 'bytes': size, 'queries': len(queries), 'peak_kb': round(peak / 1024, 1),
+            'p50_ms': round(statistics.median(timings), 3), 'p95_ms': round(cuts[94], 3),
+            'p99_ms': round(cuts[98], 3), 'mean_ms': round(statistics.fmean(timings), 3),
+        }
+
+    def report_line(self, name, result):
+        line = (
+            f"{name:48} {result['status']}  {result['queries']:3} req.  "
+            f"p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  "
+            f"{result['peak_kb']:9.1f} Ko"
+        )
+        self.stdout.write(self.style.ERROR(line) if result['status'] >= 400 else line)
+
+    def row_counts(self):
+        return {
+            model._meta.model_name: model.objects.count()
+            for model in (User, Leave, Mission, WorkHours, Internship, JobApplication)
+        }
+
+    def compare(self, baseline, report, threshold):
+        before_meta = baseline['meta']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nComparaison avec {before_meta.get('revision')} ({before_meta.get('date')})"
+        ))
+        if before_meta.get('rows') != report['meta']['rows']:
+            self.stdout.write(self.style.WARNING("Volumes de données différents : comparaison indicative"))
+        regressions = []
+        for name, after in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            change = (after['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            line = (
+                f"{name:48} p50 {before['p50_ms']:8.2f} -> {after['p50_ms']:8.2f} ms ({change:+6.1f} %)  "
+                f"requêtes {before['queries']} -> {after['queries']}"
+            )
+            if change > threshold or after['queries'] > before['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -0,0 +1,166 @@
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Rh_app.models import User, Leave, Mission, WorkHours, JobApplication
+
+# Index et contraintes ajoutés par la migration 0005, par modèle
+QUERY_PATTERN_INDEXES = {
+    Leave: ['leave_user_status_start_idx', 'leave_pending_start_idx'],
+    Mission: ['mission_assignee_due_idx', 'mission_supervisor_due_idx'],
+    JobApplication: ['jobapp_status_created_idx'],
+    WorkHours: ['workhours_unique_user_date'],
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Comparer les plans d'exécution et les temps des requêtes les plus "
+        "fréquentes avec et sans les index composites, sur des données générées. "
+        "Tout est fait dans une transaction annulée à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--days', type=int, default=365, help="Jours d'heures de travail par utilisateur")
+        parser.add_argument('--rows', type=int, default=20000, help="Congés, missions et candidatures générés")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                self.analyze()
+                after = self.run_queries(options['repeat'])
+                self.drop_indexes()
+                self.analyze()
+                before = self.run_queries(options['repeat'])
+                self.report(before, after)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        today = date.today()
+        self.stdout.write("Génération des données...")
+        users = User.objects.bulk_create([
+            User(username=f'bench_user_{i}', user_type=rng.choice(['admin', 'employee', 'intern']))
+            for i in range(options['users'])
+        ])
+        self.user = users[0]
+        WorkHours.objects.bulk_create(
+            (
+                WorkHours(user=user, date=today - timedelta(days=day), hours_worked=rng.randint(4, 10))
+                for user in users for day in range(options['days'])
+            ),
+            batch_size=5000,
+        )
+        leaves = []
+        # Périodes approuvées par utilisateur : un congé approuvé qui en
+        # chevaucherait une autre (contrainte leave_no_overlapping_approved)
+        # est généré en attente ou refusé
+        approved = defaultdict(list)
+        for _ in range(options['rows']):
+            user = rng.choice(users)
+            start = today + timedelta(days=rng.randint(-365, 90))
+            end = start + timedelta(days=rng.randint(0, 10))
+            status = rng.choices(['pending', 'approved', 'rejected'], [1, 8, 1])[0]
+            if status == 'approved':
+                if any(other_start <= end and start <= other_end for other_start, other_end in approved[user.pk]):
+                    status = rng.choice(['pending', 'rejected'])
+                else:
+                    approved[user.pk].append((start, end))
+            leaves.append(Leave(user=user, start_date=start, end_date=end, reason='', status=status))
+        Leave.objects.bulk_create(leaves, batch_size=5000)
+        Mission.objects.bulk_create([
+            Mission(
+                title='', description='', assigned_to=rng.choice(users), supervisor=rng.choice(users),
+                deadline=today + timedelta(days=rng.randint(-365, 90)), completed=rng.random() < 0.8,
+            )
+            for _ in range(options['rows'])
+        ], batch_size=5000)
+        JobApplication.objects.bulk_create([
+            JobApplication(
+                application_type='employee', position='', first_name='', last_name='', email='x@example.com',
+                phone='', education='', experience='', motivation='', cv_file='cvs/x.pdf',
+                status=rng.choices(['pending', 'approved', 'rejected'], [1, 4, 4])[0],
+            )
+            for _ in range(options['rows'])
+        ], batch_size=5000)
+
+    def queries(self):
+        user, today = self.user, date.today()
+        return {
+            'work hours (user, date range)': WorkHours.objects.filter(
+                user=user, date__range=(today - timedelta(days=30), today)
+            ),
+            'leaves (user, status, start_date)': Leave.objects.filter(
+                user=user, status='approved', start_date__gte=today
+            ),
+            'pending leaves queue': Leave.objects.filter(status='pending').order_by('start_date')[:50],
+            'missions overdue (assigned_to)': Mission.objects.filter(
+                assigned_to=user, completed=False, deadline__lt=today
+            ),
+            'missions open (supervisor)': Mission.objects.filter(
+                supervisor=user, completed=False
+            ).order_by('deadline'),
+            'pending applications': JobApplication.objects.filter(status='pending').order_by('-created_at')[:25],
+        }
+
+    def run_queries(self, repeat):
+        results = {}
+        for name, queryset in self.queries().items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (queryset.explain(), statistics.median(timings))
+        return results
+
+    def drop_indexes(self):
+        if connection.vendor == 'sqlite':
+            # L'éditeur de schéma SQLite refuse de s'ouvrir dans une transaction ;
+            # une contrainte d'unicité n'y est supprimable qu'en recréant la table
+            with connection.cursor() as cursor:
+                for model, names in QUERY_PATTERN_INDEXES.items():
+                    for index in model._meta.indexes:
+                        if index.name in names:
+                            cursor.execute(f'DROP INDEX "{index.name}"')
+                    for constraint in model._meta.constraints:
+                        if constraint.name in names:
+                            self.stdout.write(self.style.WARNING(f"{constraint.name} conservé sous SQLite"))
+            return
+        with connection.schema_editor(atomic=False) as editor:
+            for model, names in QUERY_PATTERN_INDEXES.items():
+                for index in model._meta.indexes:
+                    if index.name in names:
+                        editor.remove_index(model, index)
+                for constraint in model._meta.constraints:
+                    if constraint.name in names:
+                        editor.remove_constraint(model, constraint)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def report(self, before, after):
+        for name in after:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            self.stdout.write(f"  sans index : {ms_before:.2f} ms (médiane)")
+            self.stdout.write('    ' + plan_before.replace('\n', '\n    '))
+            self.stdout.write(f"  avec index : {ms_after:.2f} ms (médiane)")
+            self.stdout.write('    ' + plan_after.replace('\n', '\n    '))
@@ -0,0 +1,46 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from Rh_app import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Générer des données synthétiques réalistes et reproductibles (voir "
+        "Rh_app.synthetic). Les volumes de --scale peuvent être remplacés un à un."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(synthetic.SCALES), default='small')
+        for name in synthetic.SCALES['small']:
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--anchor', type=date.fromisoformat, default=None,
+            help="Date de référence (AAAA-MM-JJ) ; par défaut aujourd'hui",
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help="Supprimer d'abord les données générées")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = synthetic.clear()
+            self.stdout.write(f"{deleted} ligne(s) générée(s) supprimée(s)")
+
+        volumes = {
+            name: options[name] if options[name] is not None else default
+            for name, default in synthetic.SCALES[options['scale']].items()
+        }
+        started = time.perf_counter()
+        generator = synthetic.Generator(
+            anchor=options['anchor'] or date.today(), seed=options['seed'],
+            batch_size=options['batch_size'],
+            report=lambda message: self.stdout.write(f"  {message} ({time.perf_counter() - started:.0f} s)"),
+        )
+        generator.run(**volumes)
+        self.stdout.write(self.style.SUCCESS(
+            f"Données générées en {time.perf_counter() - started:.0f} s ; "
+            f"mot de passe des comptes {synthetic.USERNAME_PREFIX}... : {synthetic.PASSWORD}"
+        ))
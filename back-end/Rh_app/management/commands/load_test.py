@@ -0,0 +1,72 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ['/api/users/me/', '/api/dashboard/', '/api/leaves/', '/api/work-hours/']
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesurer débit et latences (p50, p99) d'un serveur en cours d'exécution, "
+        "par exemple le même code servi en WSGI puis en ASGI. Avec --async, les "
+        "chemins /api/... sont remplacés par leur variante /api/async/..."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help="Par exemple http://127.0.0.1:8000")
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--path', action='append', dest='paths', help="Répétable ; par défaut : " + ', '.join(DEFAULT_PATHS))
+        parser.add_argument('--async', action='store_true', dest='use_async')
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--requests', type=int, default=2000, help="Requêtes par chemin")
+        parser.add_argument('--warmup', type=int, default=50)
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        token = self.obtain_token(base_url, options['username'], options['password'])
+        headers = {'Authorization': f'Bearer {token}'}
+        for path in options['paths'] or DEFAULT_PATHS:
+            if options['use_async']:
+                path = path.replace('/api/', '/api/async/', 1)
+            url = base_url + path
+            self.run(url, headers, options['concurrency'], options['warmup'])
+            started = time.perf_counter()
+            latencies, errors = self.run(url, headers, options['concurrency'], options['requests'])
+            elapsed = time.perf_counter() - started
+            cuts = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{path:40} {len(latencies) / elapsed:8.1f} req/s   "
+                f"p50 {cuts[49]:7.1f} ms   p99 {cuts[98]:7.1f} ms   erreurs {errors}"
+            )
+
+    def obtain_token(self, base_url, username, password):
+        request = Request(
+            f'{base_url}/api/token/', data=json.dumps({'username': username, 'password': password}).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urlopen(request) as response:
+                return json.load(response)['access']
+        except HTTPError as e:
+            raise CommandError(f"Authentification impossible : {e}")
+
+    def run(self, url, headers, concurrency, count):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=headers)) as response:
+                    response.read()
+                ok = True
+            except HTTPError:
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(count)))
+        return [latency for latency, _ok in results], sum(1 for _latency, ok in results if not ok)
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Rh_app.cvs import process_pending
+from Rh_app.models import CvDocument, JobApplication
+
+
+class Command(BaseCommand):
+    help = (
+        "Extraire le texte des CV en attente dans un pool de processus. Sans "
+        "--loop, traite tout l'existant (reprise de l'archive) puis s'arrête."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help="Processus d'analyse ; 0 pour tout faire dans le processus courant",
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help="Remettre en attente les CV en échec (par exemple après installation de pypdf)",
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Tourner en continu (worker) au lieu de vider la file une fois",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Attente en secondes entre deux passages quand la file est vide",
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            # Sans quoi la déduplication rattacherait de nouveau l'analyse en échec
+            CvDocument.objects.filter(status='failed').delete()
+            retried = JobApplication.objects.filter(cv_status='failed').update(
+                cv_status='pending', updated_at=timezone.now()
+            )
+            self.stdout.write(f"{retried} CV remis en attente")
+
+        executor = None
+        if options['workers']:
+            # spawn : les processus fils n'héritent ni de Django ni des connexions
+            # à la base ; Rh_app.cvparser n'en a pas besoin
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn')
+            )
+        total = 0
+        try:
+            while True:
+                processed = process_pending(batch_size=options['batch_size'], executor=executor)
+                total += processed
+                if processed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(f"{total} CV traité(s)"))
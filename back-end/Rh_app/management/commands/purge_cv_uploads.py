@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Rh_app.models import CvUpload
+
+
+class Command(BaseCommand):
+    help = "Supprimer les téléversements de CV abandonnés (inachevés ou jamais rattachés à une candidature)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Âge minimal depuis le dernier morceau reçu")
+
+    def handle(self, *args, **options):
+        stale = CvUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=options['hours']))
+        count = 0
+        for upload in stale.iterator():
+            for name in (upload.partial_name, upload.file_name):
+                if name:
+                    default_storage.delete(name)
+            upload.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} téléversement(s) supprimé(s)"))
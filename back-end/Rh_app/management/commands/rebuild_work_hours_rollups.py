@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from Rh_app.models import WorkHours, WorkHoursRollup
+
+PERIOD_FUNCTIONS = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def expected_rollups():
+    """
+    Totaux recalculés depuis WorkHours : {(user_id, period, start): (hours, days)}
+    """
+    hours_field = WorkHoursRollup._meta.get_field('hours')
+    expected = {}
+    for period, trunc in PERIOD_FUNCTIONS.items():
+        totals = (
+            WorkHours.objects.order_by()
+            .values('user_id', start=trunc('date'))
+            .annotate(
+                hours=Sum('hours_worked', output_field=DecimalField(
+                    max_digits=hours_field.max_digits, decimal_places=hours_field.decimal_places,
+                )),
+                days=Count('id'),
+            )
+            .values_list('user_id', 'start', 'hours', 'days')
+        )
+        for user_id, start, hours, days in totals.iterator():
+            expected[user_id, period, start] = (hours, days)
+    return expected
+
+
+class Command(BaseCommand):
+    help = "Compare les totaux d'heures par semaine et par mois à WorkHours et corrige les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Réécrire les totaux incohérents, ajouter les manquants et supprimer les orphelins",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['fix'] and connection.vendor == 'postgresql':
+                # Pas d'écriture dans WorkHours pendant la comparaison et la correction
+                connection.cursor().execute(
+                    f'LOCK TABLE {connection.ops.quote_name(WorkHours._meta.db_table)} IN SHARE MODE'
+                )
+            expected = expected_rollups()
+            stale, changed = [], {}
+            for rollup in WorkHoursRollup.objects.select_related('user').iterator():
+                label = f"{rollup.user.username} {rollup.period} {rollup.start}"
+                totals = expected.pop((rollup.user_id, rollup.period, rollup.start), None)
+                if totals is None:
+                    self.stdout.write(f"{label}: total {rollup.hours}h sans saisie")
+                    stale.append(rollup.pk)
+                elif (rollup.hours, rollup.days) != totals:
+                    self.stdout.write(
+                        f"{label}: total {rollup.hours}h ({rollup.days} j) / saisies {totals[0]}h ({totals[1]} j)"
+                    )
+                    changed[rollup.user_id, rollup.period, rollup.start] = totals
+            # Restent dans `expected` les totaux manquants
+            for (user_id, period, start), (hours, days) in expected.items():
+                self.stdout.write(f"utilisateur {user_id} {period} {start}: total manquant (saisies {hours}h)")
+            changed.update(expected)
+
+            count = len(stale) + len(changed)
+            if not count:
+                self.stdout.write(self.style.SUCCESS("Tous les totaux sont cohérents avec les saisies"))
+                return
+            if not options['fix']:
+                self.stdout.write(self.style.WARNING(f"{count} total(aux) incohérent(s) ; relancer avec --fix pour corriger"))
+                return
+
+            WorkHoursRollup.objects.filter(pk__in=stale).delete()
+            WorkHoursRollup.objects.bulk_create(
+                [
+                    WorkHoursRollup(user_id=user_id, period=period, start=start, hours=hours, days=days)
+                    for (user_id, period, start), (hours, days) in changed.items()
+                ],
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['user', 'period', 'start'],
+                update_fields=['hours', 'days'],
+            )
+        self.stdout.write(self.style.SUCCESS(f"{count} total(aux) recalculé(s) depuis les saisies"))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from Rh_app.models import User, LeaveLedgerEntry
+
+
+def ledger_balance():
+    """
+    Sous-requête : somme des écritures du registre pour l'utilisateur courant
+    """
+    total = (
+        LeaveLedgerEntry.objects.filter(user=OuterRef('pk'))
+        .order_by()
+        .values('user')
+        .annotate(total=Sum('days'))
+        .values('total')
+    )
+    return Coalesce(Subquery(total, output_field=FloatField()), Value(0.0))
+
+
+class Command(BaseCommand):
+    help = "Compare User.leave_balance au registre des congés et corrige les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Réécrire les soldes à partir du registre (une seule requête UPDATE)",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            User.objects.annotate(ledger_balance=ledger_balance())
+            .exclude(leave_balance=F('ledger_balance'))
+            .values_list('username', 'leave_balance', 'ledger_balance')
+        )
+        count = 0
+        for username, balance, expected in drifted.iterator():
+            count += 1
+            self.stdout.write(f"{username}: solde {balance} / registre {expected}")
+
+        if not count:
+            self.stdout.write(self.style.SUCCESS("Tous les soldes sont cohérents avec le registre"))
+            return
+        if not options['fix']:
+            self.stdout.write(self.style.WARNING(f"{count} solde(s) incohérent(s) ; relancer avec --fix pour corriger"))
+            return
+
+        with transaction.atomic():
+            updated = User.objects.update(leave_balance=ledger_balance(), updated_at=timezone.now())
+        self.stdout.write(self.style.SUCCESS(f"{updated} solde(s) recalculé(s) depuis le registre"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Rh_app.accrual import debit_corrections, restate_debits
+from Rh_app.models import Leave, LeaveLedgerEntry
+
+
+class Command(BaseCommand):
+    help = "Compare le débit des congés approuvés à leur nombre de jours ouvrés et corrige les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Écrire un ajustement au registre pour chaque écart et mettre à jour les soldes",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['fix'] and connection.vendor == 'postgresql':
+                # Pas d'approbation ni d'écriture au registre pendant le recalcul
+                for model in (Leave, LeaveLedgerEntry):
+                    connection.cursor().execute(
+                        f'LOCK TABLE {connection.ops.quote_name(model._meta.db_table)} IN SHARE MODE'
+                    )
+            corrections = debit_corrections()
+            for pk, user_id, debited, expected in corrections:
+                self.stdout.write(f"congé {pk} (utilisateur {user_id}): débité {-debited:g} j, {-expected} j ouvré(s)")
+            if not corrections:
+                self.stdout.write(self.style.SUCCESS("Tous les débits correspondent aux jours ouvrés"))
+                return
+            if not options['fix']:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(corrections)} débit(s) à corriger ; relancer avec --fix pour écrire les ajustements"
+                ))
+                return
+            count = restate_debits(corrections)
+        self.stdout.write(self.style.SUCCESS(f"{count} ajustement(s) écrit(s) au registre"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Rh_app.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = "Envoyer les emails en attente de la file (outbox)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Tourner en continu (worker) au lieu de vider la file une fois",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Attente en secondes entre deux passages quand la file est vide",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = send_pending(batch_size=options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"{total} email(s) traité(s)"))
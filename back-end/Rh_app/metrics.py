@@ -0,0 +1,331 @@
+"""
+Mesures par requête, assez légères pour rester actives en production.
+
+RequestMetricsMiddleware mesure pour chaque requête la durée totale, le
+nombre et la durée des requêtes SQL, le temps passé dans les serializers
+DRF (`serializer.data`) et la taille de la réponse. Ces mesures sont :
+
+- renvoyées dans l'en-tête `Server-Timing` (visible dans les outils de
+  développement du navigateur) ;
+- agrégées en histogrammes par vue et action (`LeaveViewSet.approve_leave`),
+  exposés au format Prometheus sur `/metrics`, réservé aux détenteurs de
+  METRICS_TOKEN (ou, sans jeton, aux adresses de METRICS_ALLOWED_IPS) ;
+- au-delà de METRICS_SLOW_REQUEST_MS, journalisées avec le détail des
+  requêtes SQL (logger `Rh_app.metrics`).
+
+Chaque processus a ses propres histogrammes. Avec plusieurs workers,
+METRICS_DIR désigne un répertoire partagé où chacun écrit régulièrement son
+état ; `/metrics` en fait la somme.
+"""
+import contextvars
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+from .dbpool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# (nom, description, bornes) ; les étiquettes sont view, method et, pour la
+# durée totale, la classe du statut (2xx, 4xx...)
+HISTOGRAMS = {
+    'request_duration': ('rh_http_request_duration_seconds', 'Durée totale de la requête', LATENCY_BUCKETS),
+    'db_queries': ('rh_http_request_db_queries', 'Requêtes SQL par requête HTTP', QUERY_BUCKETS),
+    'db_duration': ('rh_http_request_db_duration_seconds', 'Temps passé en base par requête', LATENCY_BUCKETS),
+    'serializer_duration': (
+        'rh_http_request_serializer_duration_seconds', 'Temps passé dans les serializers', LATENCY_BUCKETS,
+    ),
+    'response_size': ('rh_http_response_size_bytes', 'Taille du corps de la réponse', SIZE_BUCKETS),
+}
+
+_current = contextvars.ContextVar('rh_request_metrics', default=None)
+
+
+class RequestRecord:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing', 'trace')
+
+    def __init__(self, trace):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        # (durée, SQL) de chaque requête, conservés seulement si le journal
+        # des requêtes lentes est activé
+        self.trace = [] if trace else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.trace is not None:
+                self.trace.append((elapsed, sql))
+
+
+class Registry:
+    """
+    Histogrammes du processus : {métrique: {étiquettes: [effectif par
+    borne (non cumulé, +Inf en dernier)..., somme]}}
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.data = {metric: {} for metric in HISTOGRAMS}
+            self.flushed_at = 0.0
+
+    def observe(self, observations):
+        with self.lock:
+            for metric, labels, value in observations:
+                buckets = HISTOGRAMS[metric][2]
+                series = self.data[metric].get(labels)
+                if series is None:
+                    series = self.data[metric][labels] = [0] * (len(buckets) + 2)
+                series[bisect_left(buckets, value)] += 1
+                series[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                metric: [[list(labels), list(values)] for labels, values in series.items()]
+                for metric, series in self.data.items()
+            }
+
+    def flush(self, directory, interval):
+        """Écrire l'état du processus dans `directory`, au plus une fois par `interval` secondes"""
+        now = time.monotonic()
+        if now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temporary, path)
+
+
+REGISTRY = Registry()
+
+
+def merged_snapshots(directory):
+    """
+    Somme des états de tous les processus : ceux écrits dans `directory` et
+    celui, à jour, du processus courant
+    """
+    snapshots = [REGISTRY.snapshot()]
+    own = f'{os.getpid()}.json'
+    for name in os.listdir(directory) if directory else ():
+        if name.endswith('.json') and name != own:
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    merged = {metric: {} for metric in HISTOGRAMS}
+    for snapshot in snapshots:
+        for metric, series in snapshot.items():
+            for labels, values in series:
+                total = merged[metric].setdefault(tuple(labels), [0] * len(values))
+                for i, value in enumerate(values):
+                    total[i] += value
+    return merged
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def label_set(names, values, extra=''):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}'
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(merged, pools):
+    lines = []
+    for metric, (name, description, buckets) in HISTOGRAMS.items():
+        names = ('view', 'method', 'status') if metric == 'request_duration' else ('view', 'method')
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, values in sorted(merged[metric].items()):
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), values[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{format_number(bound)}"'
+                lines.append(f'{name}_bucket{label_set(names, labels, le)} {cumulative}')
+            lines.append(f'{name}_sum{label_set(names, labels)} {format_number(values[-1])}')
+            lines.append(f'{name}_count{label_set(names, labels)} {cumulative}')
+
+    # État des connexions du processus qui répond (voir Rh_app.dbpool)
+    gauges = (
+        ('in_use', 'Connexions du pool utilisées'), ('available', 'Connexions du pool libres'),
+        ('waiting', 'Requêtes en attente d\'une connexion'),
+    )
+    counters = (
+        ('waits', 'Requêtes ayant attendu une connexion'),
+        ('timeouts', 'Requêtes sans connexion dans le délai'),
+    )
+    for kind, metrics in (('gauge', gauges), ('counter', counters)):
+        for key, description in metrics:
+            name = f'rh_db_pool_{key}' + ('_total' if kind == 'counter' else '')
+            lines.append(f'# HELP {name} {description} (processus {pools["pid"]})')
+            lines.append(f'# TYPE {name} {kind}')
+            for alias, state in pools['databases'].items():
+                if state['mode'] == 'pool':
+                    lines.append(f'{name}{label_set(("alias", "pid"), (alias, pools["pid"]))} {state[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_allowed(request):
+    """
+    Avec METRICS_TOKEN, seul l'en-tête `Authorization: Bearer <jeton>` donne
+    accès ; sans jeton, l'adresse du client doit figurer dans
+    METRICS_ALLOWED_IPS. Derrière un reverse proxy, toutes les requêtes
+    arrivent de 127.0.0.1 : METRICS_TOKEN est alors obligatoire.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """Histogrammes au format texte Prometheus"""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    body = render_prometheus(merged_snapshots(settings.METRICS_DIR), pool_stats())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def view_label(view_func):
+    """`ViewSet.action` pour DRF, nom de la classe ou de la fonction sinon"""
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    return cls.__name__
+
+
+def response_size(response):
+    if response.streaming:
+        # Corps envoyé après la fin du middleware : taille connue seulement si déclarée
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """
+    À placer en tête de MIDDLEWARE pour que la durée totale couvre les
+    autres middlewares. Sous ASGI, les requêtes SQL des vues asynchrones
+    s'exécutent dans un autre thread et ne sont pas comptées.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED or request.path == '/metrics':
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        slow_ms = settings.METRICS_SLOW_REQUEST_MS
+        record = RequestRecord(trace=slow_ms is not None)
+        request._metrics_view = 'unmatched'
+        token = _current.set(record)
+        try:
+            with connections['default'].execute_wrapper(record):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        view, method = request._metrics_view, request.method
+        observations = [
+            ('request_duration', (view, method, f'{response.status_code // 100}xx'), total),
+            ('db_queries', (view, method), record.queries),
+            ('db_duration', (view, method), record.db_time),
+            ('serializer_duration', (view, method), record.serializer_time),
+        ]
+        size = response_size(response)
+        if size is not None:
+            observations.append(('response_size', (view, method), size))
+        REGISTRY.observe(observations)
+        if settings.METRICS_DIR:
+            REGISTRY.flush(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+
+        if settings.METRICS_SERVER_TIMING:
+            app = max(total - record.db_time - record.serializer_time, 0)
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={record.db_time * 1000:.1f};desc="{record.queries} queries"',
+                f'serializer;dur={record.serializer_time * 1000:.1f}',
+                f'app;dur={app * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ))
+        if slow_ms is not None and total * 1000 >= slow_ms:
+            self.log_slow_request(request, view, total, record)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        label = view_label(view_func)
+        actions = getattr(view_func, 'actions', None)
+        if actions:
+            label = f'{label}.{actions.get(request.method.lower(), request.method.lower())}'
+        request._metrics_view = label
+
+    def log_slow_request(self, request, view, total, record):
+        slowest = sorted(record.trace, key=lambda query: query[0], reverse=True)[:10]
+        logger.warning(
+            "Requête lente %s %s (%s) : %.0f ms, %d requêtes SQL en %.0f ms, serializers %.0f ms\n%s",
+            request.method, request.get_full_path(), view, total * 1000, record.queries,
+            record.db_time * 1000, record.serializer_time * 1000,
+            '\n'.join(f'  {elapsed * 1000:8.1f} ms  {sql}' for elapsed, sql in slowest),
+        )
+
+
+def instrument_serializers():
+    """
+    Mesurer le temps passé dans `serializer.data` (appelé depuis
+    RhAppConfig.ready). Les serializers imbriqués passent par
+    to_representation et ne sont pas comptés deux fois.
+    """
+    data = serializers.BaseSerializer.data
+
+    def timed_data(self):
+        record = _current.get()
+        if record is None or record.serializing:
+            return data.fget(self)
+        record.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            record.serializer_time += time.perf_counter() - started
+            record.serializing = False
+
+    serializers.BaseSerializer.data = property(timed_data)
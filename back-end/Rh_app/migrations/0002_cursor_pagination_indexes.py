@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='internship',
+            index=models.Index(fields=['-created_at', '-id'], name='internship_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-created_at', '-id'], name='jobapplication_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['-created_at', '-id'], name='leave_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mission',
+            index=models.Index(fields=['-created_at', '-id'], name='mission_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhours',
+            index=models.Index(fields=['-created_at', '-id'], name='workhours_created_id_idx'),
+        ),
+    ]
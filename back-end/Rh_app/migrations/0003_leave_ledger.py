@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    # Le solde actuel de chaque utilisateur devient son écriture d'ouverture
+    User = apps.get_model('Rh_app', 'User')
+    LeaveLedgerEntry = apps.get_model('Rh_app', 'LeaveLedgerEntry')
+    LeaveLedgerEntry.objects.bulk_create(
+        LeaveLedgerEntry(user_id=user_id, kind='opening', days=balance)
+        for user_id, balance in User.objects.exclude(leave_balance=0).values_list('id', 'leave_balance').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0002_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Solde initial'), ('leave', 'Congé approuvé'), ('accrual', 'Acquisition'), ('adjustment', 'Ajustement')], max_length=20)),
+                ('days', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='leave',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['pending', 'approved', 'rejected'])), name='leave_status_valid'),
+        ),
+        migrations.AddField(
+            model_name='leaveledgerentry',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Rh_app.user'),
+        ),
+        migrations.AddField(
+            model_name='leaveledgerentry',
+            name='leave',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='Rh_app.leave'),
+        ),
+        migrations.AddField(
+            model_name='leaveledgerentry',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='Rh_app.user'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveledgerentry',
+            index=models.Index(fields=['user', 'created_at'], name='ledger_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaveledgerentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'leave')), fields=('leave',), name='ledger_single_debit_per_leave'),
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
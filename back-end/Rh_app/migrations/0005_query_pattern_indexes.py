@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:21
+
+from django.db import migrations, models
+
+
+def remove_duplicate_work_hours(apps, schema_editor):
+    # Avant la contrainte d'unicité (user, date) : on garde la saisie la plus
+    # récente de chaque jour, comme le fait l'import en masse avec upsert
+    WorkHours = apps.get_model('Rh_app', 'WorkHours')
+    duplicates = (
+        WorkHours.objects.values('user', 'date')
+        .annotate(latest=models.Max('id'), count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in list(duplicates):
+        WorkHours.objects.filter(user=row['user'], date=row['date']).exclude(id=row['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0004_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['status', '-created_at'], name='jobapp_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['user', 'status', 'start_date'], name='leave_user_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['start_date'], name='leave_pending_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mission',
+            index=models.Index(fields=['assigned_to', 'completed', 'deadline'], name='mission_assignee_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mission',
+            index=models.Index(fields=['supervisor', 'completed', 'deadline'], name='mission_supervisor_due_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_work_hours, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='workhours',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='workhours_unique_user_date'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Poids et configuration repris dans Rh_app.search
+SEARCH_FIELDS = (('position', 'A'), ('experience', 'A'), ('education', 'B'), ('motivation', 'C'))
+SEARCH_CONFIG = 'french'
+FTS_TABLE = 'Rh_app_jobapplication_fts'
+
+POSTGRES_SQL = """
+CREATE FUNCTION rh_jobapplication_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$;
+CREATE TRIGGER rh_jobapplication_search_vector_update
+    BEFORE INSERT OR UPDATE OF {fields} ON {table}
+    FOR EACH ROW EXECUTE FUNCTION rh_jobapplication_search_vector();
+UPDATE {table} SET position = position;
+CREATE INDEX jobapp_search_vector_idx ON {table} USING gin (search_vector);
+"""
+
+POSTGRES_REVERSE_SQL = """
+DROP INDEX IF EXISTS jobapp_search_vector_idx;
+DROP TRIGGER IF EXISTS rh_jobapplication_search_vector_update ON {table};
+DROP FUNCTION IF EXISTS rh_jobapplication_search_vector();
+"""
+
+SQLITE_SQL = (
+    """CREATE VIRTUAL TABLE "{fts}" USING fts5({fields}, tokenize = 'unicode61 remove_diacritics 2')""",
+    """INSERT INTO "{fts}" (rowid, {fields}) SELECT id, {fields} FROM {table}""",
+    """CREATE TRIGGER "{fts}_insert" AFTER INSERT ON {table} BEGIN
+        INSERT INTO "{fts}" (rowid, {fields}) VALUES (new.id, {new_fields});
+    END""",
+    """CREATE TRIGGER "{fts}_update" AFTER UPDATE OF {fields} ON {table} BEGIN
+        DELETE FROM "{fts}" WHERE rowid = old.id;
+        INSERT INTO "{fts}" (rowid, {fields}) VALUES (new.id, {new_fields});
+    END""",
+    """CREATE TRIGGER "{fts}_delete" AFTER DELETE ON {table} BEGIN
+        DELETE FROM "{fts}" WHERE rowid = old.id;
+    END""",
+)
+
+SQLITE_REVERSE_SQL = (
+    'DROP TRIGGER IF EXISTS "{fts}_insert"',
+    'DROP TRIGGER IF EXISTS "{fts}_update"',
+    'DROP TRIGGER IF EXISTS "{fts}_delete"',
+    'DROP TABLE IF EXISTS "{fts}"',
+)
+
+
+def sql_parameters(apps, schema_editor):
+    table = apps.get_model('Rh_app', 'JobApplication')._meta.db_table
+    fields = [field for field, _weight in SEARCH_FIELDS]
+    return {
+        'table': schema_editor.quote_name(table),
+        'fts': FTS_TABLE,
+        'fields': ', '.join(fields),
+        'new_fields': ', '.join(f'new.{field}' for field in fields),
+        'vector': ' || '.join(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.{field}, '')), '{weight}')"
+            for field, weight in SEARCH_FIELDS
+        ),
+    }
+
+
+def create_search_index(apps, schema_editor):
+    # Index tenu à jour par trigger : save(), bulk_create() et update() compris
+    vendor = schema_editor.connection.vendor
+    parameters = sql_parameters(apps, schema_editor)
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL.format(**parameters))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    parameters = sql_parameters(apps, schema_editor)
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL.format(**parameters))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# L'index de recherche de la migration 0007 couvre aussi le texte du CV (poids D)
+SEARCH_FIELDS = (('position', 'A'), ('experience', 'A'), ('education', 'B'), ('motivation', 'C'))
+SEARCH_CONFIG = 'french'
+FTS_TABLE = 'Rh_app_jobapplication_fts'
+
+POSTGRES_SQL = """
+CREATE OR REPLACE FUNCTION rh_jobapplication_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$;
+DROP TRIGGER IF EXISTS rh_jobapplication_search_vector_update ON {table};
+CREATE TRIGGER rh_jobapplication_search_vector_update
+    BEFORE INSERT OR UPDATE OF {fields}{cv_column} ON {table}
+    FOR EACH ROW EXECUTE FUNCTION rh_jobapplication_search_vector();
+"""
+
+# Le remplacement de la table par la migration (ALTER TABLE sous SQLite) a
+# supprimé les triggers : la table FTS5 est recréée et remplie à nouveau
+SQLITE_SQL = (
+    'DROP TABLE IF EXISTS "{fts}"',
+    """CREATE VIRTUAL TABLE "{fts}" USING fts5({fields}, cv_text, tokenize = 'unicode61 remove_diacritics 2')""",
+    """INSERT INTO "{fts}" (rowid, {fields}, cv_text)
+        SELECT id, {fields}, (SELECT text FROM {cv_table} WHERE id = cv_document_id) FROM {table}""",
+    """CREATE TRIGGER "{fts}_insert" AFTER INSERT ON {table} BEGIN
+        INSERT INTO "{fts}" (rowid, {fields}, cv_text) VALUES ({new_values});
+    END""",
+    """CREATE TRIGGER "{fts}_update" AFTER UPDATE OF {fields}, cv_document_id ON {table} BEGIN
+        DELETE FROM "{fts}" WHERE rowid = old.id;
+        INSERT INTO "{fts}" (rowid, {fields}, cv_text) VALUES ({new_values});
+    END""",
+    """CREATE TRIGGER "{fts}_delete" AFTER DELETE ON {table} BEGIN
+        DELETE FROM "{fts}" WHERE rowid = old.id;
+    END""",
+)
+
+
+def sql_parameters(apps, schema_editor, with_cv=True):
+    table = schema_editor.quote_name(apps.get_model('Rh_app', 'JobApplication')._meta.db_table)
+    cv_table = schema_editor.quote_name(apps.get_model('Rh_app', 'CvDocument')._meta.db_table)
+    fields = [field for field, _weight in SEARCH_FIELDS]
+    cv_text = f'(SELECT text FROM {cv_table} WHERE id = NEW.cv_document_id)'
+    return {
+        'table': table,
+        'cv_table': cv_table,
+        'fts': FTS_TABLE,
+        'fields': ', '.join(fields),
+        'new_values': ', '.join(['new.id'] + [f'new.{field}' for field in fields] + [cv_text]),
+        'vector': ' || '.join(
+            [
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.{field}, '')), '{weight}')"
+                for field, weight in SEARCH_FIELDS
+            ]
+            + ([f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({cv_text}, '')), 'D')"] if with_cv else [])
+        ),
+        'cv_column': ', cv_document_id' if with_cv else '',
+    }
+
+
+def index_cv_text(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    parameters = sql_parameters(apps, schema_editor)
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL.format(**parameters))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+def unindex_cv_text(apps, schema_editor):
+    # Sous SQLite, la suppression des colonnes recrée la table et ses triggers
+    # disparaissent : revenir à 0006 puis réappliquer 0007 pour reconstruire l'index
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL.format(**sql_parameters(apps, schema_editor, with_cv=False)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0007_jobapplication_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CvDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('kind', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(choices=[('parsed', 'Analysé'), ('failed', 'Échec')], max_length=10)),
+                ('text', models.TextField(blank=True)),
+                ('excerpt', models.CharField(blank=True, max_length=300)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('parsed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('parsed', 'Analysé'), ('failed', 'Échec')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applications', to='Rh_app.cvdocument'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(condition=models.Q(('cv_status', 'pending')), fields=['created_at'], name='jobapp_cv_pending_idx'),
+        ),
+        migrations.RunPython(index_cv_text, unindex_cv_text),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:15
+
+from django.db import migrations, models
+
+# Colonnes de `search_fields` des viewsets (?search=, voir Rh_app.filters).
+# SearchFilter génère UPPER("colonne"::text) LIKE UPPER('%mot%') : sous
+# PostgreSQL, un index GIN trigramme sur la même expression sert ces
+# recherches. Sous SQLite, pas d'équivalent : LIKE parcourt la table.
+TRIGRAM_COLUMNS = (
+    ('User', 'username'), ('User', 'first_name'), ('User', 'last_name'), ('User', 'email'),
+    ('Leave', 'reason'),
+    ('Mission', 'title'), ('Mission', 'description'),
+    ('JobApplication', 'first_name'), ('JobApplication', 'last_name'), ('JobApplication', 'email'),
+    ('JobApplication', 'position'),
+)
+
+
+def trigram_indexes(apps, schema_editor):
+    for model_name, column in TRIGRAM_COLUMNS:
+        table = apps.get_model('Rh_app', model_name)._meta.db_table
+        yield f'{model_name.lower()}_{column}_trgm_idx', schema_editor.quote_name(table), column
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in trigram_indexes(apps, schema_editor):
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON {table} USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in trigram_indexes(apps, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0009_cv_uploads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='internship',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='internship_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['application_type', '-created_at', '-id'], name='jobapp_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='leave_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['start_date', 'id'], name='leave_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mission',
+            index=models.Index(fields=['deadline', 'id'], name='mission_deadline_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhours',
+            index=models.Index(fields=['date', 'id'], name='workhours_date_id_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
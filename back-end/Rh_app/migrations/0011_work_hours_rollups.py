@@ -0,0 +1,159 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Début de la semaine (lundi, comme TruncWeek) et du mois d'une date, par base
+PERIOD_STARTS = {
+    'postgresql': {
+        'week': "date_trunc('week', {value})::date",
+        'month': "date_trunc('month', {value})::date",
+    },
+    'sqlite': {
+        'week': "date({value}, 'weekday 0', '-6 days')",
+        'month': "date({value}, 'start of month')",
+    },
+}
+
+# Ajout d'une saisie : création du total ou addition (upsert)
+ADD_SQL = """
+INSERT INTO {rollup} (user_id, period, start, hours, days)
+VALUES ({row}.user_id, 'week', {row_week}, {row}.hours_worked, 1),
+       ({row}.user_id, 'month', {row_month}, {row}.hours_worked, 1)
+ON CONFLICT (user_id, period, start) DO UPDATE
+SET hours = {rollup}.hours + excluded.hours, days = {rollup}.days + excluded.days;
+"""
+
+# Retrait d'une saisie : jamais de création de ligne (la suppression en
+# cascade d'un utilisateur peut avoir déjà supprimé ses totaux), et les
+# totaux vides sont supprimés
+REMOVE_SQL = """
+UPDATE {rollup} SET hours = hours - {row}.hours_worked, days = days - 1
+WHERE user_id = {row}.user_id
+  AND ((period = 'week' AND start = {row_week}) OR (period = 'month' AND start = {row_month}));
+DELETE FROM {rollup}
+WHERE user_id = {row}.user_id AND days <= 0
+  AND ((period = 'week' AND start = {row_week}) OR (period = 'month' AND start = {row_month}));
+"""
+
+FILL_SQL = """
+INSERT INTO {rollup} (user_id, period, start, hours, days)
+SELECT user_id, '{period}', {start}, SUM(hours_worked), COUNT(*)
+FROM {table} GROUP BY user_id, {start}
+"""
+
+POSTGRES_SQL = """
+CREATE FUNCTION rh_workhours_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {remove_old}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {add_new}
+    END IF;
+    RETURN NULL;
+END
+$$;
+CREATE TRIGGER rh_workhours_rollup_update
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, date, hours_worked ON {table}
+    FOR EACH ROW EXECUTE FUNCTION rh_workhours_rollup();
+"""
+
+POSTGRES_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS rh_workhours_rollup_update ON {table};
+DROP FUNCTION IF EXISTS rh_workhours_rollup();
+"""
+
+# Une reconstruction de table par SQLite (certains AlterField) supprime ces
+# triggers : une migration qui reconstruit la table de WorkHours doit les
+# recréer, comme 0008 pour la recherche
+SQLITE_SQL = (
+    """CREATE TRIGGER rh_workhours_rollup_insert AFTER INSERT ON {table} BEGIN
+        {add_new}
+    END""",
+    """CREATE TRIGGER rh_workhours_rollup_update AFTER UPDATE OF user_id, date, hours_worked ON {table} BEGIN
+        {remove_old}
+        {add_new}
+    END""",
+    """CREATE TRIGGER rh_workhours_rollup_delete AFTER DELETE ON {table} BEGIN
+        {remove_old}
+    END""",
+)
+
+SQLITE_REVERSE_SQL = (
+    'DROP TRIGGER IF EXISTS rh_workhours_rollup_insert',
+    'DROP TRIGGER IF EXISTS rh_workhours_rollup_update',
+    'DROP TRIGGER IF EXISTS rh_workhours_rollup_delete',
+)
+
+
+def sql_parameters(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    starts = PERIOD_STARTS[vendor]
+    parameters = {
+        'table': schema_editor.quote_name(apps.get_model('Rh_app', 'WorkHours')._meta.db_table),
+        'rollup': schema_editor.quote_name(apps.get_model('Rh_app', 'WorkHoursRollup')._meta.db_table),
+    }
+    old, new = ('OLD', 'NEW') if vendor == 'postgresql' else ('old', 'new')
+    for name, template, row in (('remove_old', REMOVE_SQL, old), ('add_new', ADD_SQL, new)):
+        parameters[name] = template.format(
+            row=row,
+            row_week=starts['week'].format(value=f'{row}.date'),
+            row_month=starts['month'].format(value=f'{row}.date'),
+            **parameters,
+        ).strip()
+    return parameters
+
+
+def create_rollups(apps, schema_editor):
+    # Totaux tenus à jour par trigger : save(), bulk_create(), update() et
+    # suppressions en cascade compris
+    vendor = schema_editor.connection.vendor
+    if vendor not in PERIOD_STARTS:
+        return
+    parameters = sql_parameters(apps, schema_editor)
+    for period, start in PERIOD_STARTS[vendor].items():
+        schema_editor.execute(FILL_SQL.format(period=period, start=start.format(value='"date"'), **parameters))
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL.format(**parameters))
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+def drop_rollups(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    parameters = sql_parameters(apps, schema_editor) if vendor in PERIOD_STARTS else {}
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL.format(**parameters))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0010_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkHoursRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Semaine'), ('month', 'Mois')], max_length=5)),
+                ('start', models.DateField()),
+                ('hours', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('days', models.IntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_hours_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'start', 'user'], name='rollup_period_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'period', 'start'), name='rollup_unique_user_period')],
+            },
+        ),
+        migrations.RunPython(create_rollups, drop_rollups),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:24
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+# Période d'un congé, bornes incluses : expression de l'index GiST, de la
+# contrainte d'exclusion et des requêtes de chevauchement (Rh_app.availability)
+PERIOD = "daterange(start_date, end_date, '[]')"
+
+POSTGRES_SQL = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+CREATE INDEX leave_period_gist_idx ON {table} USING gist ({period});
+ALTER TABLE {table} ADD CONSTRAINT leave_no_overlapping_approved
+    EXCLUDE USING gist (user_id WITH =, {period} WITH &&) WHERE (status = 'approved');
+"""
+
+POSTGRES_REVERSE_SQL = """
+ALTER TABLE {table} DROP CONSTRAINT IF EXISTS leave_no_overlapping_approved;
+DROP INDEX IF EXISTS leave_period_gist_idx;
+"""
+
+# Sans type intervalle, SQLite compare les bornes : index (end_date,
+# start_date) pour les requêtes de chevauchement, triggers à la place de la
+# contrainte d'exclusion. Une reconstruction de la table par SQLite
+# (certains AlterField) supprime ces triggers, comme ceux de 0008 et 0011.
+OVERLAP_CHECK = """SELECT RAISE(ABORT, 'leave_no_overlapping_approved') WHERE EXISTS (
+            SELECT 1 FROM {table} AS other
+            WHERE other.user_id = new.user_id AND other.status = 'approved'
+              AND other.start_date <= new.end_date AND other.end_date >= new.start_date{exclude}
+        );"""
+
+SQLITE_SQL = (
+    "CREATE INDEX leave_end_start_idx ON {table} (end_date, start_date)",
+    """CREATE TRIGGER leave_no_overlapping_approved_insert BEFORE INSERT ON {table}
+    WHEN new.status = 'approved' BEGIN
+        {insert_check}
+    END""",
+    """CREATE TRIGGER leave_no_overlapping_approved_update
+    BEFORE UPDATE OF user_id, start_date, end_date, status ON {table}
+    WHEN new.status = 'approved' BEGIN
+        {update_check}
+    END""",
+)
+
+SQLITE_REVERSE_SQL = (
+    'DROP TRIGGER IF EXISTS leave_no_overlapping_approved_insert',
+    'DROP TRIGGER IF EXISTS leave_no_overlapping_approved_update',
+    'DROP INDEX IF EXISTS leave_end_start_idx',
+)
+
+
+def sql_parameters(apps, schema_editor):
+    table = schema_editor.quote_name(apps.get_model('Rh_app', 'Leave')._meta.db_table)
+    return {
+        'table': table,
+        'period': PERIOD,
+        'insert_check': OVERLAP_CHECK.format(table=table, exclude=''),
+        'update_check': OVERLAP_CHECK.format(table=table, exclude=' AND other.id <> new.id'),
+    }
+
+
+def create_overlap_constraint(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    Leave = apps.get_model('Rh_app', 'Leave')
+    overlapping = Leave.objects.filter(
+        user_id=OuterRef('user_id'), status='approved',
+        start_date__lte=OuterRef('end_date'), end_date__gte=OuterRef('start_date'),
+    ).exclude(pk=OuterRef('pk'))
+    conflicts = list(
+        Leave.objects.filter(Exists(overlapping), status='approved').values_list('pk', flat=True)[:20]
+    )
+    if conflicts:
+        raise RuntimeError(
+            f"Congés approuvés qui se chevauchent (ids {conflicts}) : à corriger avant la migration"
+        )
+    parameters = sql_parameters(apps, schema_editor)
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL.format(**parameters))
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    parameters = sql_parameters(apps, schema_editor)
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL.format(**parameters))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement.format(**parameters))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0011_work_hours_rollups'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='leave',
+            constraint=models.CheckConstraint(condition=models.Q(('end_date__gte', models.F('start_date'))), name='leave_dates_ordered'),
+        ),
+        migrations.RunPython(create_overlap_constraint, drop_overlap_constraint),
+    ]
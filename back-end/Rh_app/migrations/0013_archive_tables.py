@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+ARCHIVE_MODELS = ('ArchivedWorkHours', 'ArchivedLeave', 'ArchivedJobApplication')
+
+# Sous PostgreSQL, tables partitionnées par mois ; les partitions sont
+# créées au besoin par la commande archive_records (Rh_app.archive)
+POSTGRES_CREATE_TABLE = 'CREATE TABLE %(table)s (%(definition)s) PARTITION BY RANGE ("month")'
+
+
+def create_archive_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.sql_create_table = POSTGRES_CREATE_TABLE
+    try:
+        for name in ARCHIVE_MODELS:
+            schema_editor.create_model(apps.get_model('Rh_app', name))
+    finally:
+        schema_editor.__dict__.pop('sql_create_table', None)
+
+
+def drop_archive_tables(apps, schema_editor):
+    # Supprime aussi les partitions
+    for name in ARCHIVE_MODELS:
+        schema_editor.delete_model(apps.get_model('Rh_app', name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0012_leave_overlap'),
+    ]
+
+    # Tables créées par create_archive_tables, d'après l'état des modèles
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedJobApplication',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('month', 'id', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('month', models.DateField()),
+                        ('id', models.BigIntegerField()),
+                        ('archived_at', models.DateTimeField(auto_now_add=True)),
+                        ('application_type', models.CharField(choices=[('employee', 'Employé'), ('intern', 'Stagiaire')], max_length=20)),
+                        ('position', models.CharField(max_length=100)),
+                        ('first_name', models.CharField(max_length=100)),
+                        ('last_name', models.CharField(max_length=100)),
+                        ('email', models.EmailField(max_length=254)),
+                        ('phone', models.CharField(max_length=20)),
+                        ('education', models.TextField()),
+                        ('experience', models.TextField()),
+                        ('motivation', models.TextField()),
+                        ('cv_file', models.CharField(max_length=100)),
+                        ('status', models.CharField(choices=[('pending', 'En attente'), ('approved', 'Approuvé'), ('rejected', 'Rejeté')], max_length=20)),
+                        ('cv_status', models.CharField(choices=[('pending', 'En attente'), ('parsed', 'Analysé'), ('failed', 'Échec')], max_length=10)),
+                        ('cv_document_id', models.BigIntegerField(blank=True, null=True)),
+                        ('created_at', models.DateTimeField()),
+                        ('updated_at', models.DateTimeField()),
+                        ('user', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'month'], name='archived_jobapp_user_idx')],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='ArchivedLeave',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('month', 'id', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('month', models.DateField()),
+                        ('id', models.BigIntegerField()),
+                        ('archived_at', models.DateTimeField(auto_now_add=True)),
+                        ('start_date', models.DateField()),
+                        ('end_date', models.DateField()),
+                        ('reason', models.TextField()),
+                        ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=10)),
+                        ('created_at', models.DateTimeField()),
+                        ('updated_at', models.DateTimeField()),
+                        ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'month'], name='archived_leave_user_idx')],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='ArchivedWorkHours',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('month', 'id', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('month', models.DateField()),
+                        ('id', models.BigIntegerField()),
+                        ('archived_at', models.DateTimeField(auto_now_add=True)),
+                        ('date', models.DateField()),
+                        ('hours_worked', models.DecimalField(decimal_places=2, max_digits=4)),
+                        ('created_at', models.DateTimeField()),
+                        ('updated_at', models.DateTimeField()),
+                        ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'month'], name='archived_workhours_user_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_tables, drop_archive_tables),
+    ]
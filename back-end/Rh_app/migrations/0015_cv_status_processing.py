@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0014_leave_accrual'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedjobapplication',
+            name='cv_status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours'), ('parsed', 'Analysé'), ('failed', 'Échec')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='cv_status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours'), ('parsed', 'Analysé'), ('failed', 'Échec')], default='pending', max_length=10),
+        ),
+    ]
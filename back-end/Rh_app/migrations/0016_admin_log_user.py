@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:05
+
+"""
+Bases créées avant AUTH_USER_MODEL = 'Rh_app.User' : la clé étrangère
+django_admin_log.user_id pointe encore sur auth_user. Sous PostgreSQL, elle
+est reportée sur la table des utilisateurs de l'application ; les entrées de
+l'historique de l'admin dont l'auteur n'y existe pas sont supprimées. Sans
+effet sur une base neuve (la clé pointe déjà sur Rh_app_user).
+
+Étapes manuelles restantes, voir AUTH_USER_MODEL dans les réglages :
+  - SQLite : `python manage.py migrate admin zero` puis `python manage.py
+    migrate admin` recrée django_admin_log (historique de l'admin perdu) ;
+  - les comptes de auth_user (créés par createsuperuser avant le
+    changement) ne sont pas repris : les recréer avec createsuperuser.
+"""
+from django.db import migrations
+
+ADMIN_LOG_TABLE = 'django_admin_log'
+CONSTRAINT = 'django_admin_log_user_id_rh_app_user_fk'
+
+
+def auth_user_foreign_keys(connection, cursor):
+    """Contraintes de django_admin_log.user_id qui pointent sur auth_user"""
+    constraints = connection.introspection.get_constraints(cursor, ADMIN_LOG_TABLE)
+    return [
+        name for name, constraint in constraints.items()
+        if constraint['columns'] == ['user_id'] and (constraint['foreign_key'] or ('',))[0] == 'auth_user'
+    ]
+
+
+def repoint_admin_log(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if ADMIN_LOG_TABLE not in connection.introspection.table_names(cursor):
+            return
+        names = auth_user_foreign_keys(connection, cursor)
+    if not names:
+        return
+    quote = schema_editor.quote_name
+    users = quote(apps.get_model('Rh_app', 'User')._meta.db_table)
+    for name in names:
+        schema_editor.execute(f'ALTER TABLE {ADMIN_LOG_TABLE} DROP CONSTRAINT {quote(name)}')
+    schema_editor.execute(
+        f'DELETE FROM {ADMIN_LOG_TABLE} WHERE NOT EXISTS '
+        f'(SELECT 1 FROM {users} WHERE {users}.id = {ADMIN_LOG_TABLE}.user_id)'
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {ADMIN_LOG_TABLE} ADD CONSTRAINT {quote(CONSTRAINT)} '
+        f'FOREIGN KEY (user_id) REFERENCES {users} (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Rh_app', '0015_cv_status_processing'),
+    ]
+
+    operations = [
+        migrations.RunPython(repoint_admin_log, migrations.RunPython.noop),
+    ]
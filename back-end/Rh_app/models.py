@@ -1,6 +1,13 @@
-from django.db import models
+import uuid
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+from .businessdays import BusinessCalendar
 
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -18,6 +25,7 @@ class User(AbstractUser):
         )]
     )
     leave_balance = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Redéfinir les relations avec des related_name pour éviter le conflit
     groups = models.ManyToManyField(
@@ -31,6 +39,10 @@ class User(AbstractUser):
         blank=True,
     )
 
+class LeaveOverlapError(Exception):
+    """La demande chevauche un congé approuvé du même utilisateur"""
+
+
 class Leave(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -43,10 +55,157 @@ class Leave(models.Model):
     reason = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Clé de la pagination par curseur (voir Rh_app.pagination)
+            models.Index(fields=['-created_at', '-id'], name='leave_created_id_idx'),
+            models.Index(fields=['user', 'status', 'start_date'], name='leave_user_status_start_idx'),
+            # File d'attente des approbations : uniquement les demandes en attente
+            models.Index(fields=['start_date'], condition=Q(status='pending'), name='leave_pending_start_idx'),
+            # Filtres et tris des listes (voir Rh_app.filters)
+            models.Index(fields=['status', '-created_at', '-id'], name='leave_status_created_idx'),
+            models.Index(fields=['start_date', 'id'], name='leave_start_id_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(status__in=['pending', 'approved', 'rejected']),
+                name='leave_status_valid',
+            ),
+            models.CheckConstraint(
+                condition=Q(end_date__gte=F('start_date')),
+                name='leave_dates_ordered',
+            ),
+            # Pas de chevauchement entre congés approuvés d'un même utilisateur :
+            # contrainte d'exclusion (PostgreSQL) ou triggers (SQLite) créés
+            # par la migration 0012, hors de l'état des modèles
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.start_date} to {self.end_date}"
 
+    @property
+    def days(self):
+        """Jours ouvrés de la demande : ni week-ends ni jours fériés (une requête)"""
+        return Holiday.calendar(self.start_date, self.end_date).count(self.start_date, self.end_date)
+
+    def approve(self, approved_by=None):
+        """
+        Approuver la demande et débiter le solde de congés, de façon atomique.
+
+        La transition n'est appliquée que si la demande est encore en attente
+        (UPDATE ... WHERE status = 'pending') : deux approbations concurrentes
+        ne peuvent pas débiter deux fois. Le débit est calculé sur les dates
+        relues après la transition, pas sur celles de l'instance. Retourne
+        False si la demande a déjà été traitée ; lève LeaveOverlapError si elle chevauche un congé
+        approuvé du même utilisateur.
+        """
+        try:
+            with transaction.atomic():
+                approved = Leave.objects.filter(pk=self.pk, status='pending').update(
+                    status='approved', updated_at=timezone.now()
+                )
+                if not approved:
+                    return False
+                # Dates de la ligne verrouillée : une modification validée
+                # pendant l'attente du verrou (LeaveSerializer.update) compte
+                self.start_date, self.end_date = (
+                    Leave.objects.select_for_update().filter(pk=self.pk).values_list('start_date', 'end_date').get()
+                )
+                days = self.days
+                User.objects.filter(pk=self.user_id).update(
+                    leave_balance=F('leave_balance') - days, updated_at=timezone.now()
+                )
+                LeaveLedgerEntry.objects.create(
+                    user_id=self.user_id, leave=self, kind='leave', days=-days,
+                    created_by_id=approved_by.pk if approved_by else None,
+                )
+        except IntegrityError as exc:
+            # Seule contrainte que la transition peut violer : le chevauchement
+            # avec un congé approuvé (leave_no_overlapping_approved)
+            raise LeaveOverlapError(str(exc)) from exc
+        self.status = 'approved'
+        return True
+
+    def reject(self):
+        """
+        Rejeter la demande si elle est encore en attente. Retourne False sinon.
+        """
+        rejected = Leave.objects.filter(pk=self.pk, status='pending').update(
+            status='rejected', updated_at=timezone.now()
+        )
+        if not rejected:
+            return False
+        self.status = 'rejected'
+        return True
+
+
+class Holiday(models.Model):
+    """Jour férié : non décompté des congés (voir Rh_app.businessdays)"""
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"{self.date} - {self.name}"
+
+    @classmethod
+    def calendar(cls, start, end):
+        """Calendrier des jours ouvrés, avec les jours fériés de `start` à `end`"""
+        return BusinessCalendar(cls.objects.filter(date__range=(start, end)).values_list('date', flat=True))
+
+
+class LeaveLedgerEntry(models.Model):
+    """
+    Registre des mouvements de congés, en ajout seul.
+
+    La somme des écritures d'un utilisateur doit être égale à
+    `User.leave_balance` ; la commande `recompute_leave_balances` le vérifie
+    et corrige les écarts.
+    """
+    KIND_CHOICES = (
+        ('opening', 'Solde initial'),
+        ('leave', 'Congé approuvé'),
+        ('accrual', 'Acquisition'),
+        ('adjustment', 'Ajustement'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leave_ledger')
+    leave = models.ForeignKey(Leave, on_delete=models.SET_NULL, related_name='ledger_entries', null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    days = models.FloatField()
+    # Mois crédité (premier jour) des écritures `accrual` (voir Rh_app.accrual)
+    period = models.DateField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, related_name='+', null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='ledger_user_created_idx'),
+        ]
+        constraints = [
+            # Une demande de congé ne peut être débitée qu'une seule fois
+            models.UniqueConstraint(
+                fields=['leave'], condition=Q(kind='leave'), name='ledger_single_debit_per_leave'
+            ),
+            # Un seul crédit mensuel par utilisateur
+            models.UniqueConstraint(
+                fields=['user', 'period'], condition=Q(kind='accrual'), name='ledger_single_accrual_per_month'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.kind}: {self.days}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Les écritures du registre de congés ne peuvent pas être modifiées")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Les écritures du registre de congés ne peuvent pas être supprimées")
+
 
 class Mission(models.Model):
     title = models.CharField(max_length=200)
@@ -56,6 +215,17 @@ class Mission(models.Model):
     deadline = models.DateField()
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Clé de la pagination par curseur (voir Rh_app.pagination)
+            models.Index(fields=['-created_at', '-id'], name='mission_created_id_idx'),
+            models.Index(fields=['assigned_to', 'completed', 'deadline'], name='mission_assignee_due_idx'),
+            models.Index(fields=['supervisor', 'completed', 'deadline'], name='mission_supervisor_due_idx'),
+            # Filtres et tris des listes (voir Rh_app.filters)
+            models.Index(fields=['deadline', 'id'], name='mission_deadline_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -65,10 +235,59 @@ class WorkHours(models.Model):
     date = models.DateField()
     hours_worked = models.DecimalField(max_digits=4, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Clé de la pagination par curseur (voir Rh_app.pagination)
+            models.Index(fields=['-created_at', '-id'], name='workhours_created_id_idx'),
+            # Période sur toutes les saisies (admin) ; par employé : la contrainte (user, date)
+            models.Index(fields=['date', 'id'], name='workhours_date_id_idx'),
+        ]
+        constraints = [
+            # Une seule ligne par employé et par jour ; sert aussi d'index (user, date)
+            models.UniqueConstraint(fields=['user', 'date'], name='workhours_unique_user_date'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.date}: {self.hours_worked}h"
 
+class WorkHoursRollup(models.Model):
+    """
+    Total des heures de travail d'un employé par semaine ou par mois.
+
+    Les lignes sont tenues à jour par des triggers sur la table de WorkHours
+    (migration 0011) : save(), delete(), update(), bulk_create() (upsert
+    compris) et suppressions en cascade. La commande
+    `rebuild_work_hours_rollups` compare les totaux à WorkHours et corrige
+    les écarts. Le total journalier est WorkHours elle-même, unique par
+    (user, date).
+    """
+    PERIOD_CHOICES = (
+        ('week', 'Semaine'),
+        ('month', 'Mois'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='work_hours_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    # Lundi de la semaine ou premier jour du mois
+    start = models.DateField()
+    hours = models.DecimalField(max_digits=6, decimal_places=2)
+    # Nombre de jours saisis ; pas de contrainte de signe, pour qu'un écart
+    # ne fasse jamais échouer une écriture dans WorkHours
+    days = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            # Rapport de toute l'équipe sur une période ; par employé : la contrainte
+            models.Index(fields=['period', 'start', 'user'], name='rollup_period_start_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period', 'start'], name='rollup_unique_user_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.period} {self.start}: {self.hours}h"
+
 class Internship(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -82,10 +301,73 @@ class Internship(models.Model):
     end_date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Clé de la pagination par curseur (voir Rh_app.pagination)
+            models.Index(fields=['-created_at', '-id'], name='internship_created_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='internship_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.intern.username} - {self.start_date} to {self.end_date}"
 
+class CvUpload(models.Model):
+    """
+    Téléversement d'un CV en plusieurs morceaux, que le client peut
+    reprendre à `offset` après une coupure (voir Rh_app.files).
+
+    Une fois complet, le fichier est déplacé à `file_name` et peut être
+    rattaché à une candidature par son identifiant.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cv_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def completed(self):
+        return bool(self.file_name)
+
+    @property
+    def partial_name(self):
+        return f'cvs/partial/{self.pk.hex}'
+
+
+class CvDocument(models.Model):
+    """
+    Texte extrait d'un fichier CV, une ligne par contenu distinct.
+
+    Les candidatures dont le fichier a la même empreinte SHA-256 partagent
+    la même ligne : un fichier déposé plusieurs fois n'est analysé qu'une
+    fois (voir Rh_app.cvs).
+    """
+    STATUS_CHOICES = (
+        ('parsed', 'Analysé'),
+        ('failed', 'Échec'),
+    )
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    kind = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    text = models.TextField(blank=True)
+    excerpt = models.CharField(max_length=300, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    parsed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.status})"
+
 class JobApplication(models.Model):
     STATUS_CHOICES = (
         ('pending', 'En attente'),
@@ -96,6 +378,12 @@ class JobApplication(models.Model):
         ('employee', 'Employé'),
         ('intern', 'Stagiaire'),
     )
+    CV_STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('processing', 'En cours'),
+        ('parsed', 'Analysé'),
+        ('failed', 'Échec'),
+    )
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_applications', null=True, blank=True)
     application_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     position = models.CharField(max_length=100)
@@ -109,6 +397,145 @@ class JobApplication(models.Model):
     cv_file = models.FileField(upload_to='cvs/')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Renseigné hors requête par la commande process_cvs
+    cv_status = models.CharField(max_length=10, choices=CV_STATUS_CHOICES, default='pending')
+    # Réservation du lot en cours d'analyse (Rh_app.cvs.claim_batch)
+    cv_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    cv_document = models.ForeignKey(
+        CvDocument, on_delete=models.SET_NULL, related_name='applications', null=True, blank=True
+    )
+    # Vecteur pondéré de position, experience, education, motivation et du
+    # texte du CV, calculé par trigger sous PostgreSQL (index GIN) ; voir Rh_app.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Clé de la pagination par curseur (voir Rh_app.pagination)
+            models.Index(fields=['-created_at', '-id'], name='jobapplication_created_id_idx'),
+            models.Index(fields=['status', '-created_at'], name='jobapp_status_created_idx'),
+            models.Index(fields=['application_type', '-created_at', '-id'], name='jobapp_type_created_idx'),
+            # File d'attente de l'analyse des CV
+            models.Index(fields=['created_at'], condition=Q(cv_status='pending'), name='jobapp_cv_pending_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.first_name} {self.last_name} - {self.position}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name} - {self.position}"
+
+class OutgoingEmail(models.Model):
+    """
+    File d'attente persistante des emails (outbox).
+
+    Les vues enregistrent le message dans la même transaction que le
+    changement d'état qui le déclenche ; la commande `send_outbox` l'envoie
+    ensuite hors requête (voir Rh_app.outbox).
+    """
+    STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('sending', "En cours d'envoi"),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    # Destinataires séparés par des virgules
+    to = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # Réservation par un worker de send_outbox (Rh_app.outbox.claim_batch)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.to} - {self.subject} ({self.status})"
+
+    @property
+    def recipients(self):
+        return [address for address in self.to.split(',') if address]
+
+
+class ArchivedRecord(models.Model):
+    """
+    Ligne archivée par la commande `archive_records` (voir Rh_app.archive).
+
+    `id` est l'identifiant de la ligne d'origine. Sous PostgreSQL, les tables
+    d'archive sont partitionnées par mois sur `month` (migration 0013) : la
+    clé primaire doit contenir la clé de partition, d'où la clé (month, id).
+    Les clés étrangères n'ont ni contrainte ni index propre en base (l'index
+    (user, month) sert les lectures par employé) ; la suppression en cascade
+    des utilisateurs passe par Django.
+    """
+    pk = models.CompositePrimaryKey('month', 'id')
+    # Premier jour du mois de la ligne d'origine (clé de partition)
+    month = models.DateField()
+    id = models.BigIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedWorkHours(ArchivedRecord):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_constraint=False, db_index=False)
+    date = models.DateField()
+    hours_worked = models.DecimalField(max_digits=4, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'month'], name='archived_workhours_user_idx'),
+        ]
+
+
+class ArchivedLeave(ArchivedRecord):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_constraint=False, db_index=False)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.TextField()
+    status = models.CharField(max_length=10, choices=Leave.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'month'], name='archived_leave_user_idx'),
+        ]
+
+
+class ArchivedJobApplication(ArchivedRecord):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+', db_constraint=False, db_index=False,
+        null=True, blank=True,
+    )
+    application_type = models.CharField(max_length=20, choices=JobApplication.TYPE_CHOICES)
+    position = models.CharField(max_length=100)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=20)
+    education = models.TextField()
+    experience = models.TextField()
+    motivation = models.TextField()
+    # Chemin du fichier dans le stockage ; le fichier n'est pas déplacé
+    cv_file = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES)
+    cv_status = models.CharField(max_length=10, choices=JobApplication.CV_STATUS_CHOICES)
+    # Texte du CV : ligne CvDocument, conservée après l'archivage
+    cv_document_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'month'], name='archived_jobapp_user_idx'),
+        ]
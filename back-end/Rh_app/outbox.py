@@ -0,0 +1,125 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    """
+    Mettre un email en file d'attente ; il sera envoyé par `send_outbox`
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipients),
+    )
+
+
+def enqueue_emails(messages, from_email=None):
+    """
+    Mettre plusieurs emails en file d'attente en une seule insertion :
+    `messages` est une liste de (sujet, corps, destinataires)
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    return OutgoingEmail.objects.bulk_create(
+        [
+            OutgoingEmail(subject=subject, body=body, from_email=from_email, to=','.join(recipients))
+            for subject, body, recipients in messages
+        ],
+        batch_size=500,
+    )
+
+
+def retry_delay(attempts):
+    """
+    Délai avant la prochaine tentative : backoff exponentiel plafonné
+    """
+    base = settings.OUTBOX_RETRY_BACKOFF_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_DELAY_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Réserver un lot d'emails dus : passage en `sending` dans une transaction
+    courte (SKIP LOCKED entre workers), validée avant les envois. Une
+    réservation plus ancienne que OUTBOX_LEASE_SECONDS (worker arrêté en
+    cours de lot) est reprise. Retourne (emails, date de la réservation).
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', claimed_at__lt=now - lease))
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in batch]).update(status='sending', claimed_at=now)
+    return batch, now
+
+
+def send_pending(batch_size=100, connection=None):
+    """
+    Envoyer un lot d'emails dus sur une seule connexion SMTP.
+
+    Le lot est d'abord réservé (claim_batch), ce qui permet de lancer
+    plusieurs workers sans double envoi : aucune transaction ni verrou n'est
+    gardé pendant les envois, qui peuvent être lents. Les résultats sont
+    écrits ensuite dans une seconde transaction courte. Un échec replanifie
+    le message avec backoff ; après OUTBOX_MAX_ATTEMPTS il passe en `failed`.
+    Retourne le nombre d'emails traités (envoyés ou replanifiés).
+    """
+    connection = connection or get_connection()
+    batch, claimed_at = claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    try:
+        # Une seule connexion pour tout le lot ; si elle échoue, chaque
+        # envoi ci-dessous échoue à son tour et est replanifié
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Email connection failed: {e}")
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection
+            )
+            email.attempts += 1
+            try:
+                message.send()
+            except Exception as e:
+                logger.warning(f"Email {email.pk} failed (attempt {email.attempts}): {e}")
+                email.last_error = str(e)
+                if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    email.status = 'failed'
+                else:
+                    email.status = 'pending'
+                    email.next_attempt_at = claimed_at + retry_delay(email.attempts)
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+            email.claimed_at = None
+    finally:
+        connection.close()
+
+    with transaction.atomic():
+        # Seulement les emails encore réservés par ce lot (réservation non reprise)
+        still_claimed = set(
+            OutgoingEmail.objects.select_for_update()
+            .filter(pk__in=[email.pk for email in batch], status='sending', claimed_at=claimed_at)
+            .values_list('pk', flat=True)
+        )
+        OutgoingEmail.objects.bulk_update(
+            [email for email in batch if email.pk in still_claimed],
+            ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'claimed_at'],
+        )
+    return len(batch)
@@ -0,0 +1,148 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) sur (created_at, id).
+
+    Le coût d'une page ne dépend pas de sa position : la requête filtre sur la
+    clé du curseur au lieu d'utiliser OFFSET, et aucun COUNT(*) n'est exécuté.
+    Une vue peut définir `page_size` pour changer la taille par défaut ; le
+    client peut la réduire ou l'augmenter (jusqu'à `max_page_size`) avec
+    `?page_size=`.
+
+    Contrairement à CursorPagination de DRF, qui ne garde que le premier
+    champ du tri et départage les ex aequo par un OFFSET (plafonné à
+    `offset_cutoff`), la position du curseur contient tous les champs du tri :
+    un tri sur une colonne peu sélective (?ordering=status, voir
+    Rh_app.filters) reste paginé par clé.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def _get_position_from_instance(self, instance, ordering):
+        """Valeurs de tous les champs du tri, en JSON ; `instance` peut être une ligne de values()"""
+        names = [term.lstrip('-') for term in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in names]
+        else:
+            values = [getattr(instance, name) for name in names]
+        return json.dumps([str(value) for value in values])
+
+    def keyset_filter(self, queryset, position, reverse):
+        """
+        Lignes qui suivent `position` dans l'ordre de la page :
+        (a > x) OR (a = x AND b > y) OR ..., sens de chaque comparaison selon
+        le tri et la direction du curseur
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = {}
+        for term, value in zip(self.ordering, values):
+            name = term.lstrip('-')
+            lookup = 'lt' if reverse != term.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        # Borne redondante sur le premier champ, pour que l'index serve de point de départ
+        first = self.ordering[0]
+        bound = 'lte' if reverse != first.startswith('-') else 'gte'
+        return queryset.filter(Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition)
+
+    def page_queryset(self, queryset, request, view):
+        """Requête de la page demandée, avec une ligne de plus pour savoir s'il y a une page suivante"""
+        self.page_size = getattr(view, 'page_size', type(self).page_size)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            queryset = self.keyset_filter(queryset, current_position, reverse)
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """Page et positions des liens, d'après les lignes lues par page_queryset()"""
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+        self.page = results[:self.page_size]
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Variante asynchrone de paginate_queryset (mêmes curseurs, mêmes
+        liens), dont la page est lue avec l'ORM asynchrone
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        return self.set_page([obj async for obj in queryset])
+
+
+class DateJoinedCursorPagination(CreatedAtCursorPagination):
+    """
+    Même pagination pour les utilisateurs, qui n'ont pas de `created_at`.
+    """
+    ordering = ('-date_joined', '-id')
+
+
+class PeriodStartCursorPagination(CreatedAtCursorPagination):
+    """
+    Même pagination pour les totaux d'heures (une période à la fois) :
+    ordre chronologique, puis par employé.
+    """
+    ordering = ('start', 'user_id')
+
+
+class ArchivedCursorPagination(CreatedAtCursorPagination):
+    """
+    Même pagination pour les archives : clé primaire (month, id), mois les
+    plus récents d'abord.
+    """
+    ordering = ('-month', '-id')
+
+
+def page_fields(view, queryset):
+    """
+    Champs de la clé de pagination de la liste `view`, ?ordering= compris
+    (à lire avec la page), ou [] sans pagination par curseur
+    """
+    paginator = view.paginator
+    if not isinstance(paginator, CursorPagination):
+        return []
+    return [name.lstrip('-') for name in paginator.get_ordering(view.request, queryset, view)]
@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def render_plain(data):
+    """
+    Encodage JSON de `data` identique octet pour octet à celui de
+    JSONRenderer (UNICODE_JSON, COMPACT_JSON), à condition que `data` ne
+    contienne que des dict à clés str, des listes, des str, des int, des
+    booléens et None : orjson n'écrit pas les flottants comme json.dumps
+    (1e16 au lieu de 1e+16). Renvoie None si orjson est absent ou refuse
+    les données.
+    """
+    if orjson is None:
+        return None
+    try:
+        ret = orjson.dumps(data)
+    except orjson.JSONEncodeError:
+        return None
+    # Comme JSONRenderer : U+2028 et U+2029 échappés pour rester du JavaScript valide
+    return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer qui encode avec orjson les réponses marquées `plain_data`
+    (listes construites par Rh_app.fastread), les autres avec json.dumps
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if (data is not None and getattr(response, 'plain_data', False)
+                and not self.ensure_ascii and self.compact
+                and self.get_indent(accepted_media_type, renderer_context) is None):
+            ret = render_plain(data)
+            if ret is not None:
+                return ret
+        return super().render(data, accepted_media_type, renderer_context)
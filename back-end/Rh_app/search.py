@@ -0,0 +1,64 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+
+# Champs indexés et leur poids (A > B > C > D), dans l'ordre des colonnes de la
+# table FTS5 SQLite ; les migrations 0007 et 0008 installent les mêmes poids
+# sous PostgreSQL. cv_text est le texte du CvDocument de la candidature.
+SEARCH_WEIGHTS = (
+    ('position', 'A'),
+    ('experience', 'A'),
+    ('education', 'B'),
+    ('motivation', 'C'),
+    ('cv_text', 'D'),
+)
+# Poids par défaut de ts_rank, repris pour bm25()
+RANK_WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+# Configuration PostgreSQL du trigger des migrations 0007 et 0008
+SEARCH_CONFIG = 'french'
+FTS_TABLE = 'Rh_app_jobapplication_fts'
+
+
+def fts5_query(text):
+    """
+    Requête FTS5 : chaque mot entre guillemets (pas de syntaxe FTS5 côté
+    client), tous les mots requis
+    """
+    words = text.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def search_job_applications(queryset, text):
+    """
+    Filtrer le queryset sur `text` et l'annoter d'un score `rank`, le plus
+    pertinent en premier.
+
+    Sous PostgreSQL la recherche utilise la colonne `search_vector` (index
+    GIN, tenue à jour par trigger) ; sous SQLite, la table FTS5 équivalente.
+    """
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-created_at', '-id')
+        )
+
+    match = fts5_query(text)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    weights = ', '.join(str(RANK_WEIGHTS[weight]) for _field, weight in SEARCH_WEIGHTS)
+    # bm25() est négatif, et d'autant plus petit que le document est pertinent
+    rank = RawSQL(
+        f'SELECT -bm25("{FTS_TABLE}", {weights}) FROM "{FTS_TABLE}" '
+        f'WHERE "{FTS_TABLE}" MATCH %s AND rowid = "{table}"."id"',
+        (match,), output_field=FloatField(),
+    )
+    return (
+        queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', (match,)))
+        .annotate(rank=rank)
+        .order_by('-rank', '-created_at', '-id')
+    )
@@ -1,34 +1,96 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import User, Leave, Mission, WorkHours, Internship, JobApplication
+from .fieldsets import SparseFieldsSerializerMixin
+from .files import check_cv_size, cv_extension, validate_cv_file
+from .models import (
+    User, ArchivedJobApplication, ArchivedLeave, ArchivedWorkHours, CvDocument, CvUpload, LeaveLedgerEntry, Leave,
+    Mission, WorkHours, WorkHoursRollup, Internship, JobApplication,
+)
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
+    # Modifiables par un administrateur seulement : le rôle est recopié dans
+    # les claims du jeton, le solde suit le registre des congés
+    admin_fields = ('user_type', 'leave_balance')
 
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'password', 'user_type', 'leave_balance', 'first_name', 'last_name')
         extra_kwargs = {'password': {'write_only': True}}
-        
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if not (user and user.is_authenticated and (user.is_superuser or user.user_type == 'admin')):
+            for name in self.admin_fields:
+                fields[name].read_only = True
+        return fields
+
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            user_type=validated_data.get('user_type', 'employee'),
-            leave_balance=validated_data.get('leave_balance', 30),
-            first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', '')
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=validated_data['username'],
+                email=validated_data['email'],
+                password=validated_data['password'],
+                user_type=validated_data.get('user_type', 'employee'),
+                leave_balance=validated_data.get('leave_balance', 30),
+                first_name=validated_data.get('first_name', ''),
+                last_name=validated_data.get('last_name', '')
+            )
+            LeaveLedgerEntry.objects.create(user=user, kind='opening', days=user.leave_balance)
         return user
 
-class LeaveSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        """Un nouveau solde est tracé dans le registre par un ajustement"""
+        with transaction.atomic():
+            if 'leave_balance' in validated_data:
+                current = User.objects.select_for_update().values_list('leave_balance', flat=True).get(pk=instance.pk)
+                change = validated_data['leave_balance'] - current
+                if change:
+                    request = self.context.get('request')
+                    LeaveLedgerEntry.objects.create(
+                        user=instance, kind='adjustment', days=change,
+                        created_by_id=request.user.id if request else None,
+                    )
+            return super().update(instance, validated_data)
+
+class LeaveSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.ReadOnlyField(source='user.username')
     
     class Meta:
         model = Leave
         fields = '__all__'
+        # Le statut ne change que via approve_leave / reject_leave ; l'auteur
+        # est l'utilisateur connecté (LeaveViewSet.perform_create)
+        read_only_fields = ('status', 'user')
+
+    def validate(self, attrs):
+        start = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start and end and end < start:
+            raise serializers.ValidationError({'end_date': 'End date must be on or after start date.'})
+        return attrs
+
+    def update(self, instance, validated_data):
+        """
+        Seule une demande en attente peut être modifiée : le débit d'un congé
+        approuvé est calculé sur ses dates (voir Leave.approve). La ligne est
+        verrouillée pour qu'une approbation concurrente attende la fin de la
+        modification.
+        """
+        with transaction.atomic():
+            current = Leave.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+            if current != 'pending':
+                raise serializers.ValidationError({'status': 'Only pending leaves can be modified.'})
+            return super().update(instance, validated_data)
 
-class MissionSerializer(serializers.ModelSerializer):
+class LeaveListSerializer(LeaveSerializer):
+    """Représentation des listes de congés"""
+    class Meta(LeaveSerializer.Meta):
+        fields = ('id', 'user', 'user_name', 'start_date', 'end_date', 'reason', 'status', 'created_at')
+
+class MissionSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     assigned_to_name = serializers.ReadOnlyField(source='assigned_to.username')
     supervisor_name = serializers.ReadOnlyField(source='supervisor.username')
     
@@ -36,14 +98,56 @@ class MissionSerializer(serializers.ModelSerializer):
         model = Mission
         fields = '__all__'
 
-class WorkHoursSerializer(serializers.ModelSerializer):
+class WorkHoursSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.ReadOnlyField(source='user.username')
+    # Par défaut, l'utilisateur connecté (voir WorkHoursViewSet.perform_create)
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
     
     class Meta:
         model = WorkHours
         fields = '__all__'
+        # L'unicité (user, date) est vérifiée dans validate(), user pouvant être implicite
+        validators = []
+
+    def validate(self, attrs):
+        user = attrs.get('user') or getattr(self.instance, 'user', None) or self.context['request'].user
+        day = attrs.get('date', getattr(self.instance, 'date', None))
+        duplicates = WorkHours.objects.filter(user_id=user.pk, date=day)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({'date': 'Work hours already recorded for this day.'})
+        return attrs
+
+class WorkHoursListSerializer(WorkHoursSerializer):
+    """Représentation des listes d'heures de travail"""
+    class Meta(WorkHoursSerializer.Meta):
+        fields = ('id', 'user', 'user_name', 'date', 'hours_worked', 'created_at')
 
-class InternshipSerializer(serializers.ModelSerializer):
+class WorkHoursBulkRowSerializer(serializers.ModelSerializer):
+    """
+    Validation d'une ligne d'import en masse : mêmes règles que
+    WorkHoursSerializer, mais `user` est un simple identifiant dont
+    l'existence est vérifiée par lot (voir Rh_app.bulk).
+    """
+    user = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = WorkHours
+        fields = ('user', 'date', 'hours_worked')
+        # L'unicité (user, date) est vérifiée une fois par lot
+        validators = []
+
+class WorkHoursRollupSerializer(serializers.ModelSerializer):
+    """Total des heures d'un employé sur une semaine ou un mois (lecture seule)"""
+    user_name = serializers.ReadOnlyField(source='user.username')
+
+    class Meta:
+        model = WorkHoursRollup
+        fields = ('user', 'user_name', 'period', 'start', 'hours', 'days')
+        read_only_fields = fields
+
+class InternshipSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     intern_name = serializers.ReadOnlyField(source='intern.username')
     supervisor_name = serializers.ReadOnlyField(source='supervisor.username')
     
@@ -51,7 +155,116 @@ class InternshipSerializer(serializers.ModelSerializer):
         model = Internship
         fields = '__all__'
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class InternshipListSerializer(InternshipSerializer):
+    """Représentation des listes de stages"""
+    class Meta(InternshipSerializer.Meta):
+        fields = (
+            'id', 'intern', 'intern_name', 'supervisor', 'supervisor_name', 'start_date', 'end_date',
+            'status', 'created_at',
+        )
+
+class CvDocumentSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CvDocument
+        fields = ('id', 'kind', 'status', 'page_count', 'metadata', 'excerpt', 'error')
+
+class CvUploadSerializer(serializers.ModelSerializer):
+    completed = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = CvUpload
+        fields = ('id', 'filename', 'size', 'offset', 'completed', 'created_at')
+        read_only_fields = ('offset',)
+
+    def validate_filename(self, value):
+        cv_extension(value)
+        return value
+
+    def validate_size(self, value):
+        check_cv_size(value)
+        return value
+
+class JobApplicationSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    # Résultat de l'analyse du CV (commande process_cvs), sans le texte complet
+    cv = CvDocumentSummarySerializer(source='cv_document', read_only=True)
+    cv_file = serializers.FileField(required=False, validators=[validate_cv_file])
+    # Alternative à cv_file : identifiant d'un téléversement par morceaux terminé
+    cv_upload = serializers.PrimaryKeyRelatedField(
+        queryset=CvUpload.objects.exclude(file_name=''), write_only=True, required=False
+    )
+
     class Meta:
         model = JobApplication
-        fields = '__all__'
\ No newline at end of file
+        exclude = ('search_vector', 'cv_document')
+        # La décision passe par les actions approve/reject (et leur email) ;
+        # le candidat est l'utilisateur connecté (perform_create)
+        read_only_fields = ('cv_status', 'status', 'user')
+
+    def validate_cv_upload(self, upload):
+        if upload.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError('Upload not found.')
+        return upload
+
+    def validate(self, attrs):
+        if 'cv_file' in attrs and 'cv_upload' in attrs:
+            raise serializers.ValidationError('Provide either cv_file or cv_upload, not both.')
+        if self.instance is None and 'cv_file' not in attrs and 'cv_upload' not in attrs:
+            raise serializers.ValidationError({'cv_file': 'No file was submitted.'})
+        return attrs
+
+    def save(self, **kwargs):
+        upload = self.validated_data.pop('cv_upload', None)
+        if upload is not None:
+            # Le fichier est déjà à son emplacement définitif : on ne garde que le nom
+            kwargs['cv_file'] = upload.file_name
+        instance = super().save(**kwargs)
+        if upload is not None:
+            upload.delete()
+        return instance
+
+class JobApplicationListSerializer(JobApplicationSerializer):
+    """
+    Représentation des listes de candidatures, sans les textes (formation,
+    expérience, motivation) ni le résumé du CV
+    """
+    class Meta(JobApplicationSerializer.Meta):
+        exclude = None
+        fields = (
+            'id', 'user', 'application_type', 'position', 'first_name', 'last_name', 'email', 'phone',
+            'status', 'cv_status', 'created_at',
+        )
+
+class JobApplicationSearchSerializer(JobApplicationSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+class ArchivedWorkHoursSerializer(serializers.ModelSerializer):
+    """Heures de travail archivées (lecture seule)"""
+    user_name = serializers.ReadOnlyField(source='user.username')
+
+    class Meta:
+        model = ArchivedWorkHours
+        fields = ('id', 'month', 'user', 'user_name', 'date', 'hours_worked', 'created_at', 'updated_at', 'archived_at')
+        read_only_fields = fields
+
+class ArchivedLeaveSerializer(serializers.ModelSerializer):
+    """Congé archivé (lecture seule)"""
+    user_name = serializers.ReadOnlyField(source='user.username')
+
+    class Meta:
+        model = ArchivedLeave
+        fields = (
+            'id', 'month', 'user', 'user_name', 'start_date', 'end_date', 'reason', 'status',
+            'created_at', 'updated_at', 'archived_at',
+        )
+        read_only_fields = fields
+
+class ArchivedJobApplicationSerializer(serializers.ModelSerializer):
+    """Candidature archivée (lecture seule) ; `cv_file` est le chemin du CV dans le stockage"""
+    class Meta:
+        model = ArchivedJobApplication
+        fields = (
+            'id', 'month', 'user', 'application_type', 'position', 'first_name', 'last_name', 'email', 'phone',
+            'education', 'experience', 'motivation', 'cv_file', 'status', 'cv_status', 'cv_document_id',
+            'created_at', 'updated_at', 'archived_at',
+        )
+        read_only_fields = fields
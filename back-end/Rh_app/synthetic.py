@@ -0,0 +1,292 @@
+"""
+Génération de données synthétiques réalistes pour les mesures de
+performance (commandes generate_data et benchmark_endpoints).
+
+Les données sont déterministes pour une graine et une date de référence
+données, insérées par lots (bulk_create) sans garder plus d'un lot en
+mémoire, et cohérentes entre elles : congés d'un même utilisateur sans
+chevauchement, soldes égaux au registre des congés, un stage par stagiaire.
+Tous les comptes générés ont le nom `synth_...` et le même mot de passe.
+"""
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .businessdays import BusinessCalendar
+from .models import User, Holiday, Leave, LeaveLedgerEntry, Mission, WorkHours, Internship, JobApplication
+
+USERNAME_PREFIX = 'synth_'
+PASSWORD = 'synthetic'
+
+# Volumes par échelle ; `work_hours` est un nombre total de lignes réparti
+# sur les jours ouvrés des employés et stagiaires
+SCALES = {
+    'small': {
+        'users': 500, 'work_hours': 50_000, 'leaves': 5_000, 'missions': 2_000,
+        'internships': 100, 'applications': 1_000,
+    },
+    'medium': {
+        'users': 5_000, 'work_hours': 1_000_000, 'leaves': 50_000, 'missions': 20_000,
+        'internships': 1_000, 'applications': 10_000,
+    },
+    'large': {
+        'users': 50_000, 'work_hours': 10_000_000, 'leaves': 500_000, 'missions': 200_000,
+        'internships': 10_000, 'applications': 100_000,
+    },
+}
+# Répartition des rôles : 2 % d'admins, 8 % de stagiaires
+USER_TYPE_WEIGHTS = (('admin', 2), ('employee', 90), ('intern', 8))
+OPENING_BALANCE = 30.0
+
+FIRST_NAMES = (
+    'Ahmed', 'Amira', 'Youssef', 'Salma', 'Mohamed', 'Ines', 'Karim', 'Nour', 'Sami', 'Leila',
+    'Hichem', 'Mariem', 'Walid', 'Rania', 'Omar', 'Yasmine', 'Anis', 'Sarra', 'Mehdi', 'Fatma',
+)
+LAST_NAMES = (
+    'Ben Ali', 'Trabelsi', 'Gharbi', 'Jaziri', 'Mansouri', 'Hammami', 'Ayari', 'Bouazizi',
+    'Chaabane', 'Dridi', 'Ferchichi', 'Khelifi', 'Mejri', 'Saidi', 'Zouari', 'Baccouche',
+)
+POSITIONS = (
+    'Développeur Python', 'Développeur front-end', 'Comptable', 'Chargé de recrutement',
+    'Administrateur système', 'Chef de projet', 'Analyste de données', 'Assistant RH',
+    'Commercial', 'Contrôleur de gestion', 'Ingénieur DevOps', 'Juriste',
+)
+SKILLS = (
+    'Django', 'React', 'PostgreSQL', 'Docker', 'Excel', 'SAP', 'paie', 'recrutement',
+    'gestion de projet', 'comptabilité analytique', 'Kubernetes', 'TypeScript', 'droit social',
+)
+EDUCATION = (
+    'Licence en informatique', 'Master en génie logiciel', 'Diplôme d\'ingénieur',
+    'Licence en gestion', 'Master en finance', 'BTS comptabilité', 'Master RH',
+)
+LEAVE_REASONS = (
+    'Vacances', 'Congé familial', 'Déménagement', 'Mariage', 'Raisons personnelles',
+    'Voyage', 'Formation', 'Rendez-vous médical',
+)
+MISSION_TITLES = (
+    'Audit des accès', 'Migration de la base', 'Préparation de la paie', 'Revue des contrats',
+    'Mise à jour de la documentation', 'Campagne de recrutement', 'Inventaire du matériel',
+    'Rapport trimestriel', 'Tests de charge', 'Formation des nouveaux arrivants',
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def insert(model, objects, batch_size):
+    """
+    Insérer `objects` (itérable, éventuellement un générateur) par lots, une
+    transaction par lot. Retourne le nombre de lignes insérées.
+    """
+    count = 0
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def business_days(end, count):
+    """`count` jours ouvrés (lundi-vendredi) jusqu'à `end` inclus, du plus récent au plus ancien"""
+    day = end
+    while count:
+        if day.weekday() < 5:
+            yield day
+            count -= 1
+        day -= timedelta(days=1)
+
+
+class Generator:
+    """
+    Génère un jeu de données complet ; `report` est appelé avec un message
+    après chaque étape.
+    """
+
+    def __init__(self, anchor, seed=42, batch_size=5000, report=None):
+        self.anchor = anchor
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.report = report or (lambda message: None)
+
+    def run(self, users, work_hours, leaves, missions, internships, applications):
+        counts = {}
+        counts['users'] = self.create_users(users)
+        counts['work_hours'] = self.create_work_hours(work_hours)
+        counts['leaves'] = self.create_leaves(leaves)
+        counts['missions'] = self.create_missions(missions)
+        counts['internships'] = self.create_internships(internships)
+        counts['applications'] = self.create_applications(applications)
+        return counts
+
+    def person(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def create_users(self, count):
+        # Un seul hachage : PBKDF2 sur des dizaines de milliers de comptes prendrait des heures
+        password = make_password(PASSWORD)
+        types, weights = zip(*USER_TYPE_WEIGHTS)
+        offset = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+
+        def users():
+            for i in range(offset, offset + count):
+                first_name, last_name = self.person()
+                # Au moins un compte de chaque rôle, même pour de très petits volumes
+                user_type = types[i - offset] if i - offset < len(types) else self.rng.choices(types, weights)[0]
+                yield User(
+                    username=f'{USERNAME_PREFIX}{i:06d}', password=password,
+                    first_name=first_name, last_name=last_name,
+                    email=f'{USERNAME_PREFIX}{i:06d}@example.com',
+                    user_type=user_type,
+                    # Ajusté par create_leaves d'après les congés approuvés
+                    leave_balance=OPENING_BALANCE,
+                )
+
+        inserted = insert(User, users(), self.batch_size)
+        generated = User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id')
+        self.users = list(generated.values_list('id', 'user_type')[offset:])
+        self.admins = [pk for pk, user_type in self.users if user_type == 'admin']
+        self.employees = [pk for pk, user_type in self.users if user_type == 'employee']
+        self.interns = [pk for pk, user_type in self.users if user_type == 'intern']
+        self.staff = self.employees + self.interns
+        insert(LeaveLedgerEntry, (
+            LeaveLedgerEntry(user_id=pk, kind='opening', days=OPENING_BALANCE) for pk, _type in self.users
+        ), self.batch_size)
+        self.report(f"{inserted} utilisateurs")
+        return inserted
+
+    def create_work_hours(self, count):
+        if not self.staff:
+            return 0
+        # Jours ouvrés consécutifs par personne : (user, date) reste unique
+        per_user, extra = divmod(count, len(self.staff))
+
+        def rows():
+            for index, user_id in enumerate(self.staff):
+                for day in business_days(self.anchor, per_user + (index < extra)):
+                    hours = min(max(self.rng.gauss(7.5, 1.2), 1), 12)
+                    yield WorkHours(user_id=user_id, date=day, hours_worked=round(hours * 4) / 4)
+
+        inserted = insert(WorkHours, rows(), self.batch_size)
+        self.report(f"{inserted} heures de travail")
+        return inserted
+
+    def create_leaves(self, count):
+        if not self.staff:
+            return 0
+        per_user, extra = divmod(count, len(self.staff))
+        debits = {}
+        # Débits en jours ouvrés, comme à l'approbation
+        calendar = BusinessCalendar(Holiday.objects.values_list('date', flat=True))
+
+        def leaves():
+            for index, user_id in enumerate(self.staff):
+                # Congés successifs sans chevauchement (37 jours d'écart en
+                # moyenne) ; les derniers tombent dans les deux mois à venir
+                count = per_user + (index < extra)
+                start = self.anchor - timedelta(days=37 * count - 60)
+                for _ in range(count):
+                    start += timedelta(days=self.rng.randint(7, 60))
+                    end = start + timedelta(days=self.rng.choice((0, 0, 1, 2, 4, 4, 9, 13)))
+                    if start > self.anchor:
+                        status = self.rng.choices(('pending', 'approved', 'rejected'), (6, 3, 1))[0]
+                    else:
+                        status = self.rng.choices(('approved', 'rejected'), (9, 1))[0]
+                    if status == 'approved':
+                        debits[user_id] = debits.get(user_id, 0) + calendar.count(start, end)
+                    yield Leave(
+                        user_id=user_id, start_date=start, end_date=end,
+                        reason=self.rng.choice(LEAVE_REASONS), status=status,
+                    )
+                    start = end
+
+        inserted = insert(Leave, leaves(), self.batch_size)
+        # Écritures du registre et soldes correspondant aux congés approuvés
+        approved = Leave.objects.filter(user_id__in=list(debits), status='approved').values_list(
+            'id', 'user_id', 'start_date', 'end_date'
+        )
+        insert(LeaveLedgerEntry, (
+            LeaveLedgerEntry(user_id=user_id, leave_id=pk, kind='leave', days=-calendar.count(start, end))
+            for pk, user_id, start, end in approved.iterator()
+        ), self.batch_size)
+        balances = [User(pk=pk, leave_balance=OPENING_BALANCE - days) for pk, days in debits.items()]
+        for batch in batched(balances, self.batch_size):
+            User.objects.bulk_update(batch, ['leave_balance'])
+        self.report(f"{inserted} congés")
+        return inserted
+
+    def create_missions(self, count):
+        supervisors = self.admins + self.employees
+        if not supervisors or not self.staff:
+            return 0
+
+        def missions():
+            for _ in range(count):
+                deadline = self.anchor + timedelta(days=self.rng.randint(-365, 90))
+                yield Mission(
+                    title=self.rng.choice(MISSION_TITLES),
+                    description=f"{self.rng.choice(MISSION_TITLES)} ({', '.join(self.rng.sample(SKILLS, 2))})",
+                    assigned_to_id=self.rng.choice(self.staff), supervisor_id=self.rng.choice(supervisors),
+                    deadline=deadline,
+                    completed=deadline < self.anchor and self.rng.random() < 0.85,
+                )
+
+        inserted = insert(Mission, missions(), self.batch_size)
+        self.report(f"{inserted} missions")
+        return inserted
+
+    def create_internships(self, count):
+        if not self.interns or not self.employees:
+            return 0
+
+        def internships():
+            for intern_id in self.interns[:count]:
+                start = self.anchor + timedelta(days=self.rng.randint(-300, 60))
+                end = start + timedelta(days=self.rng.choice((30, 60, 90, 180)))
+                if start > self.anchor:
+                    status = 'pending'
+                elif end < self.anchor:
+                    status = self.rng.choices(('completed', 'terminated'), (9, 1))[0]
+                else:
+                    status = 'active'
+                yield Internship(
+                    intern_id=intern_id, supervisor_id=self.rng.choice(self.employees),
+                    start_date=start, end_date=end, status=status,
+                )
+
+        inserted = insert(Internship, internships(), self.batch_size)
+        self.report(f"{inserted} stages")
+        return inserted
+
+    def create_applications(self, count):
+        def applications():
+            for i in range(count):
+                first_name, last_name = self.person()
+                skills = ', '.join(self.rng.sample(SKILLS, 3))
+                yield JobApplication(
+                    application_type=self.rng.choices(('employee', 'intern'), (7, 3))[0],
+                    position=self.rng.choice(POSITIONS), first_name=first_name, last_name=last_name,
+                    email=f'candidat{i}@example.com', phone=f'+216 {self.rng.randint(20000000, 99999999)}',
+                    education=self.rng.choice(EDUCATION),
+                    experience=f"{self.rng.randint(0, 15)} ans d'expérience : {skills}",
+                    motivation=f"Intéressé par le poste, compétences en {skills}.",
+                    # Aucun fichier sur disque : process_cvs ne doit pas les reprendre
+                    cv_file=f'cvs/synthetic_{i}.pdf', cv_status='failed',
+                    status=self.rng.choices(('pending', 'approved', 'rejected'), (3, 2, 5))[0],
+                )
+
+        inserted = insert(JobApplication, applications(), self.batch_size)
+        self.report(f"{inserted} candidatures")
+        return inserted
+
+
+def clear():
+    """Supprimer les comptes générés et tout ce qui leur est rattaché"""
+    with transaction.atomic():
+        JobApplication.objects.filter(email__startswith='candidat', cv_file__startswith='cvs/synthetic_').delete()
+        return User.objects.filter(username__startswith=USERNAME_PREFIX).delete()[0]
@@ -1,3 +1,1849 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from io import StringIO
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import mail
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .accrual import accrue_month
+from .businessdays import BusinessCalendar
+from .cvparser import extract_cv, file_digest
+from .cvs import CLAIM_TIMEOUT, process_pending
+from .dbpool import pool_stats
+from .metrics import REGISTRY, merged_snapshots
+from .outbox import send_pending
+from .renderers import render_plain
+from .models import (
+    User, ArchivedJobApplication, ArchivedLeave, ArchivedWorkHours, CvDocument, CvUpload, Holiday, LeaveLedgerEntry,
+    OutgoingEmail, Leave, Mission, WorkHours, WorkHoursRollup, Internship, JobApplication,
+)
+
+
+class RhAppTestCase(TestCase):
+    """
+    Jeu de données commun : un admin, un employé, un stagiaire et quelques
+    lignes pour chaque modèle.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', password='pass', user_type='admin', leave_balance=30
+        )
+        cls.employee = User.objects.create_user(
+            username='employee', password='pass', user_type='employee', leave_balance=30
+        )
+        cls.intern = User.objects.create_user(
+            username='intern', password='pass', user_type='intern', leave_balance=0
+        )
+        cls.today = date.today()
+        cls.leave = Leave.objects.create(
+            user=cls.employee, start_date=cls.today, end_date=cls.today + timedelta(days=2),
+            reason='Vacances'
+        )
+        cls.mission = Mission.objects.create(
+            title='Audit', description='Audit annuel', assigned_to=cls.employee,
+            supervisor=cls.admin, deadline=cls.today + timedelta(days=7)
+        )
+        cls.work_hours = WorkHours.objects.create(
+            user=cls.employee, date=cls.today, hours_worked=Decimal('7.50')
+        )
+        cls.internship = Internship.objects.create(
+            intern=cls.intern, supervisor=cls.employee, start_date=cls.today,
+            end_date=cls.today + timedelta(days=90)
+        )
+        cls.application = JobApplication.objects.create(
+            application_type='employee', position='Comptable', first_name='Ali',
+            last_name='Ben Salah', email='ali@example.com', phone='20000000',
+            education='Licence', experience='3 ans', motivation='Motivé',
+            cv_file='cvs/ali.pdf'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def login(self, user):
+        self.client.force_authenticate(user=user)
+
+
+def url_patterns(resolver=None, namespace='', parameters=()):
+    """(nom complet, paramètres, vue) de chaque URL du projet, hors admin de Django"""
+    for pattern in (resolver or get_resolver()).url_patterns:
+        names = (*parameters, *pattern.pattern.regex.groupindex)
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace != 'admin':
+                yield from url_patterns(pattern, f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace, names)
+        else:
+            yield f'{namespace}{pattern.name}' if pattern.name else None, names, pattern.callback
+
+
+class UrlPatternTests(RhAppTestCase):
+
+    def test_every_url_pattern_answers(self):
+        """Chaque méthode de chaque URL répond sans erreur serveur (action manquante, ...)"""
+        self.login(self.admin)
+        for name, parameters, callback in url_patterns():
+            self.assertIsNotNone(name, callback)
+            kwargs = {key: 'json' if key == 'format' else self.leave.pk for key in parameters}
+            url = reverse(name, kwargs=kwargs)
+            actions = getattr(callback, 'actions', None)
+            if actions is not None:
+                methods = list(actions)
+            elif hasattr(callback, 'cls'):
+                methods = [method for method in callback.cls.http_method_names if hasattr(callback.cls, method)]
+            else:
+                methods = ['get']
+            for method in methods:
+                if method in ('delete', 'options', 'head'):
+                    continue
+                with self.subTest(url=url, method=method):
+                    response = getattr(self.client, method)(url, {}, format='json')
+                    self.assertLess(response.status_code, 500)
+
+
+class QueryBudgetTests(RhAppTestCase):
+    """
+    Nombre maximal de requêtes SQL par endpoint. Un dépassement signale une
+    régression N+1 (select_related manquant, accès à une relation dans un
+    serializer, ...).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_leave = Leave.objects.create(
+            user=cls.employee, start_date=cls.today, end_date=cls.today, reason='Rendez-vous'
+        )
+
+    # (méthode, url, budget) ; une liste coûte les clés de la page (ETag) plus la page
+    QUERY_BUDGETS = [
+        ('get', '/api/users/', 2),
+        ('get', '/api/users/me/', 0),
+        ('get', '/api/leaves/', 2),
+        ('get', '/api/leaves/{leave}/', 1),
+        ('get', '/api/missions/', 2),
+        ('get', '/api/missions/{mission}/', 1),
+        ('get', '/api/work-hours/', 2),
+        ('get', '/api/work-hours/{work_hours}/', 1),
+        ('get', '/api/internships/', 2),
+        ('get', '/api/internships/{internship}/', 1),
+        ('get', '/api/job-applications/', 2),
+        ('get', '/api/job-applications/{application}/', 1),
+        ('get', '/api/dashboard/', 7),
+        # approbation : lecture, SAVEPOINT, 2 UPDATE conditionnels, jours fériés, écriture du registre, RELEASE
+        ('post', '/api/leaves/{leave}/approve_leave/', 8),
+        ('post', '/api/leaves/{other_leave}/reject_leave/', 2),
+        ('post', '/api/missions/{mission}/complete_mission/', 2),
+        ('post', '/api/internships/{internship}/change_status/', 2),
+        # candidature : lecture, SAVEPOINT, UPDATE, email en file d'attente, RELEASE
+        ('post', '/api/job-applications/{application}/approve/', 5),
+        ('post', '/api/job-applications/{application}/reject/', 5),
+    ]
+
+    def url(self, template):
+        return template.format(
+            leave=self.leave.pk, other_leave=self.other_leave.pk, mission=self.mission.pk, work_hours=self.work_hours.pk,
+            internship=self.internship.pk, application=self.application.pk,
+        )
+
+    def test_admin_query_budgets(self):
+        self.login(self.admin)
+        for method, template, budget in self.QUERY_BUDGETS:
+            with self.subTest(method=method, url=template):
+                data = {'status': 'active'} if 'change_status' in template else {}
+                with self.assertNumQueries(budget):
+                    response = getattr(self.client, method)(self.url(template), data)
+                self.assertLess(response.status_code, 400)
+
+    def test_list_query_count_is_independent_of_row_count(self):
+        users = [self.employee, self.intern, self.admin]
+        WorkHours.objects.bulk_create([
+            WorkHours(user=users[i % 3], date=self.today - timedelta(days=i), hours_worked=8)
+            for i in range(1, 50)
+        ])
+        Mission.objects.bulk_create([
+            Mission(title=f'Mission {i}', description='', assigned_to=users[i % 3],
+                    supervisor=self.admin, deadline=self.today)
+            for i in range(50)
+        ])
+        self.login(self.admin)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/work-hours/')
+        self.assertEqual(len(response.data['results']), 50)
+        with self.assertNumQueries(2):
+            self.client.get('/api/missions/')
+
+    def test_scoped_list_query_budgets(self):
+        self.login(self.employee)
+        expected = {'/api/leaves/': 2, '/api/missions/': 1, '/api/work-hours/': 1, '/api/internships/': 1}
+        for url, count in expected.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertEqual(len(response.data['results']), count)
+
+
+class CursorPaginationTests(RhAppTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        WorkHours.objects.bulk_create([
+            WorkHours(user=cls.employee, date=cls.today - timedelta(days=i), hours_worked=8)
+            for i in range(1, 25)
+        ])
+
+    def test_walk_all_pages(self):
+        self.login(self.admin)
+        seen = []
+        url = '/api/work-hours/?page_size=10'
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_view_page_size_and_max_page_size(self):
+        self.login(self.admin)
+        response = self.client.get('/api/work-hours/')
+        self.assertEqual(len(response.data['results']), 25)
+        self.assertIsNone(response.data['next'])
+        response = self.client.get('/api/job-applications/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_users_are_paginated(self):
+        self.login(self.admin)
+        response = self.client.get('/api/users/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_ordering_with_ties(self):
+        # 25 lignes à 8 h (moins une à 7,5 h) : la position contient aussi l'id
+        self.login(self.admin)
+        expected = list(WorkHours.objects.order_by('-hours_worked', '-id').values_list('id', flat=True))
+        seen = []
+        url = '/api/work-hours/?page_size=4&ordering=-hours_worked'
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+        previous = self.client.get(response.data['previous']).data
+        self.assertEqual([row['id'] for row in previous['results']], expected[-5:-1])
+
+
+class DashboardTests(RhAppTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Leave.objects.create(
+            user=cls.intern, start_date=cls.today + timedelta(days=10),
+            end_date=cls.today + timedelta(days=11), reason='Examens', status='approved'
+        )
+        Mission.objects.create(
+            title='Rapport', description='', assigned_to=cls.employee, supervisor=cls.admin,
+            deadline=cls.today - timedelta(days=1)
+        )
+        WorkHours.objects.create(user=cls.intern, date=cls.today, hours_worked=Decimal('4.00'))
+
+    def test_admin_sees_all_figures(self):
+        self.login(self.admin)
+        data = self.client.get('/api/dashboard/').data
+        self.assertEqual(data['leaves']['total'], 2)
+        self.assertEqual(data['leaves']['pending'], 1)
+        self.assertEqual(data['leaves']['approved'], 1)
+        self.assertEqual(data['leaves']['upcoming']['user_name'], 'intern')
+        self.assertEqual(data['missions'], {'total': 2, 'active': 2, 'completed': 0, 'overdue': 1})
+        self.assertEqual(data['work_hours']['week'], '11.50')
+        self.assertEqual(data['internships']['pending'], 1)
+        self.assertEqual(data['job_applications']['pending'], 1)
+        self.assertEqual(data['pending_approvals'], 3)
+        self.assertEqual(data['team_members'], 3)
+
+    def test_employee_figures_are_scoped(self):
+        self.login(self.employee)
+        data = self.client.get('/api/dashboard/').data
+        self.assertEqual(data['leaves']['total'], 1)
+        self.assertIsNone(data['leaves']['upcoming'])
+        self.assertEqual(data['work_hours']['week'], '7.50')
+        self.assertEqual(data['job_applications']['total'], 0)
+        self.assertEqual(data['team_members'], 1)
+        self.assertEqual(data['leave_balance'], 30)
+
+
+class LeaveApprovalTests(RhAppTestCase):
+
+    def approve(self):
+        return self.client.post(f'/api/leaves/{self.leave.pk}/approve_leave/')
+
+    def test_approve_debits_balance_once(self):
+        self.login(self.admin)
+        self.assertEqual(self.approve().status_code, 200)
+        self.assertEqual(self.approve().status_code, 409)
+        self.employee.refresh_from_db()
+        # Débit en jours ouvrés
+        days = self.leave.days
+        self.assertEqual(self.employee.leave_balance, 30 - days)
+        entry = LeaveLedgerEntry.objects.get(leave=self.leave)
+        self.assertEqual((entry.kind, entry.days, entry.created_by), ('leave', -days, self.admin))
+
+    def test_stale_instance_cannot_approve_twice(self):
+        first, second = Leave.objects.get(pk=self.leave.pk), Leave.objects.get(pk=self.leave.pk)
+        self.assertTrue(first.approve())
+        self.assertFalse(second.approve())
+        self.assertFalse(second.reject())
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 30 - self.leave.days)
+
+    def test_debit_uses_dates_committed_before_approval(self):
+        stale = Leave.objects.get(pk=self.leave.pk)
+        # Dates modifiées (LeaveSerializer.update) pendant que l'approbation attend le verrou
+        monday = self.today + timedelta(days=7 - self.today.weekday())
+        Leave.objects.filter(pk=self.leave.pk).update(start_date=monday, end_date=monday + timedelta(days=4))
+        self.assertTrue(stale.approve())
+        self.assertEqual((stale.start_date, stale.end_date), (monday, monday + timedelta(days=4)))
+        self.assertEqual(LeaveLedgerEntry.objects.get(leave=self.leave).days, -5)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 25)
+
+    def test_reject_only_pending(self):
+        self.login(self.admin)
+        response = self.client.post(f'/api/leaves/{self.leave.pk}/reject_leave/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.approve().status_code, 409)
+        self.assertFalse(LeaveLedgerEntry.objects.filter(leave=self.leave).exists())
+
+    def test_status_is_read_only_through_update(self):
+        self.login(self.employee)
+        self.client.patch(f'/api/leaves/{self.leave.pk}/', {'status': 'approved'})
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.status, 'pending')
+
+    def test_ledger_is_append_only(self):
+        entry = LeaveLedgerEntry.objects.create(user=self.employee, kind='opening', days=30)
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+    def test_balance_and_role_are_admin_only(self):
+        self.login(self.employee)
+        response = self.client.patch(
+            f'/api/users/{self.employee.pk}/', {'leave_balance': 999, 'user_type': 'admin'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.leave_balance, self.employee.user_type), (30, 'employee'))
+        self.assertFalse(LeaveLedgerEntry.objects.filter(user=self.employee).exists())
+
+        self.login(self.admin)
+        response = self.client.patch(f'/api/users/{self.employee.pk}/', {'leave_balance': 32}, format='json')
+        self.assertEqual(response.status_code, 200)
+        entry = LeaveLedgerEntry.objects.get(user=self.employee)
+        self.assertEqual((entry.kind, entry.days, entry.created_by), ('adjustment', 2, self.admin))
+
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/users/', {
+            'username': 'newcomer', 'email': 'new@example.com', 'password': 'pass',
+            'user_type': 'admin', 'leave_balance': 500,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        newcomer = User.objects.get(username='newcomer')
+        self.assertEqual((newcomer.user_type, newcomer.leave_balance), ('employee', 30))
+
+    def test_recompute_leave_balances(self):
+        LeaveLedgerEntry.objects.create(user=self.employee, kind='opening', days=30)
+        self.leave.approve()
+        User.objects.filter(pk=self.employee.pk).update(leave_balance=100)
+        out = StringIO()
+        call_command('recompute_leave_balances', stdout=out)
+        self.assertIn('employee', out.getvalue())
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 100)
+        call_command('recompute_leave_balances', '--fix', stdout=out)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 30 - self.leave.days)
+
+
+class WorkHoursBulkTests(RhAppTestCase):
+    url = '/api/work-hours/bulk/'
+
+    def test_json_rows_are_inserted_in_batches(self):
+        self.login(self.admin)
+        rows = [
+            {'user': self.intern.pk, 'date': str(self.today - timedelta(days=i)), 'hours_worked': '8.00'}
+            for i in range(1, 31)
+        ]
+        # SAVEPOINT/RELEASE + par lot : utilisateurs, (user, date) existants, INSERT
+        with patch('Rh_app.bulk.BATCH_SIZE', 10), self.assertNumQueries(2 + 3 * 3):
+            response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 30)
+        self.assertEqual(WorkHours.objects.filter(user=self.intern).count(), 30)
+
+    def test_csv_upload(self):
+        self.login(self.employee)
+        upload = SimpleUploadedFile(
+            'hours.csv', b'date,hours_worked\n2026-01-05,7.5\n2026-01-06,8\n', content_type='text/csv'
+        )
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            WorkHours.objects.filter(user=self.employee, date__year=2026, date__month=1).count(), 2
+        )
+
+    def test_malformed_csv_is_rejected(self):
+        self.login(self.employee)
+        cases = [
+            (b'date,hours_worked\n2026-01-05,8\n2026-01-06,\xe9\n', 'Row 2: the file is not valid UTF-8.'),
+            (b'date,hours_worked,comment\n2026-01-05,8,x\n', 'Unknown columns: comment. Expected: user, date, hours_worked.'),
+            (b'date,hours_worked\n2026-01-05,8,x\n', 'Row 1: expected at most 2 columns.'),
+            (b'date,hours_worked\n2026-01-05,"' + b'8' * 200000 + b'"\n', 'Row 1: field larger than field limit (131072).'),
+        ]
+        for content, message in cases:
+            upload = SimpleUploadedFile('hours.csv', content, content_type='text/csv')
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {'file': [message]})
+        self.assertFalse(WorkHours.objects.filter(date__year=2026, date__month=1).exists())
+
+    def test_invalid_rows_roll_back_everything(self):
+        self.login(self.admin)
+        rows = [
+            {'user': self.employee.pk, 'date': '2026-01-05', 'hours_worked': '8'},
+            {'user': self.employee.pk, 'date': 'not-a-date', 'hours_worked': '8'},
+            {'user': 999999, 'date': '2026-01-07', 'hours_worked': '8'},
+            {'user': self.employee.pk, 'date': '2026-01-08', 'hours_worked': '1000'},
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 4, 3])
+        self.assertEqual(response.data['created'], 0)
+        self.assertFalse(WorkHours.objects.filter(date__year=2026, date__month=1).exists())
+
+    def test_employee_cannot_import_for_others(self):
+        self.login(self.employee)
+        rows = [{'user': self.intern.pk, 'date': '2026-01-05', 'hours_worked': '8'}]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['errors'], {'user': ['Permission denied']})
+
+    def test_existing_user_date_is_rejected_without_upsert(self):
+        self.login(self.admin)
+        rows = [
+            {'user': self.employee.pk, 'date': str(self.today), 'hours_worked': '6.00'},
+            {'user': self.intern.pk, 'date': '2026-01-05', 'hours_worked': '8.00'},
+            {'user': self.intern.pk, 'date': '2026-01-05', 'hours_worked': '7.00'},
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 3])
+
+    def test_single_create_rejects_duplicate_day(self):
+        self.login(self.employee)
+        response = self.client.post(
+            '/api/work-hours/', {'date': str(self.today), 'hours_worked': '4.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', response.data)
+        response = self.client.post(
+            '/api/work-hours/', {'date': '2026-01-05', 'hours_worked': '4.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user'], self.employee.pk)
+
+    def test_upsert_updates_existing_user_date(self):
+        self.login(self.admin)
+        rows = [
+            {'user': self.employee.pk, 'date': str(self.today), 'hours_worked': '6.00'},
+            {'user': self.employee.pk, 'date': '2026-01-05', 'hours_worked': '8.00'},
+        ]
+        response = self.client.post(f'{self.url}?upsert=true', rows, format='json')
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.work_hours.refresh_from_db()
+        self.assertEqual(self.work_hours.hours_worked, Decimal('6.00'))
+        self.assertEqual(WorkHours.objects.filter(user=self.employee, date=self.today).count(), 1)
+
+
+class CsvExportTests(RhAppTestCase):
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(StringIO(content)))
+
+    def test_work_hours_export_streams_in_one_query(self):
+        WorkHours.objects.bulk_create([
+            WorkHours(user=self.intern, date=self.today - timedelta(days=i), hours_worked=8)
+            for i in range(1, 101)
+        ])
+        self.login(self.admin)
+        with self.assertNumQueries(1):
+            rows = self.export('/api/work-hours/export/')
+        self.assertEqual(rows[0], ['id', 'user', 'username', 'date', 'hours_worked', 'created_at'])
+        self.assertEqual(len(rows), 102)
+        self.assertEqual(rows[1][2:5], ['employee', str(self.today), '7.50'])
+
+    def test_export_filters_and_scoping(self):
+        WorkHours.objects.create(user=self.intern, date=self.today - timedelta(days=40), hours_worked=8)
+        self.login(self.admin)
+        start = self.today - timedelta(days=7)
+        rows = self.export(f'/api/work-hours/export/?start={start}&user={self.intern.pk}')
+        self.assertEqual(len(rows), 1)
+        self.login(self.employee)
+        rows = self.export(f'/api/work-hours/export/?user={self.intern.pk}')
+        self.assertEqual(len(rows), 1)
+
+    def test_leave_export_uses_overlapping_period(self):
+        self.login(self.admin)
+        day = self.today + timedelta(days=1)
+        rows = self.export(f'/api/leaves/export/?start={day}&end={day}')
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.leave.pk)])
+        rows = self.export(f'/api/leaves/export/?start={self.today + timedelta(days=3)}')
+        self.assertEqual(len(rows), 1)
+
+    def test_mission_export_and_invalid_dates(self):
+        self.login(self.employee)
+        rows = self.export('/api/missions/export/')
+        self.assertEqual(rows[1][1], 'Audit')
+        response = self.client.get('/api/missions/export/?start=bad')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(RhAppTestCase):
+
+    def test_decision_is_queued_not_sent(self):
+        self.login(self.admin)
+        response = self.client.post(f'/api/job-applications/{self.application.pk}/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.recipients, email.status), (['ali@example.com'], 'pending'))
+
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ali@example.com'])
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('sent', 1))
+
+    def test_batch_uses_one_connection(self):
+        for i in range(5):
+            OutgoingEmail.objects.create(subject='s', body='b', from_email='rh@example.com', to=f'{i}@example.com')
+        with patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection:
+            call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(open_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_with_backoff(self):
+        email = OutgoingEmail.objects.create(subject='s', body='b', from_email='rh@example.com', to='x@example.com')
+        failing = patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('timeout')
+        )
+        with failing, self.assertLogs('Rh_app.outbox', 'WARNING'):
+            call_command('send_outbox', stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'timeout'))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        with failing, self.assertLogs('Rh_app.outbox', 'WARNING'):
+            call_command('send_outbox', stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+
+    def test_batch_is_claimed_before_sending(self):
+        due = OutgoingEmail.objects.create(subject='s', body='b', from_email='rh@example.com', to='a@example.com')
+        stale = OutgoingEmail.objects.create(
+            subject='s', body='b', from_email='rh@example.com', to='b@example.com', status='sending',
+            claimed_at=timezone.now() - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS + 60),
+        )
+        OutgoingEmail.objects.create(
+            subject='s', body='b', from_email='rh@example.com', to='c@example.com', status='sending',
+            claimed_at=timezone.now(),
+        )
+        statuses = []
+
+        def send_messages(messages):
+            # Pendant l'envoi, les lignes sont réservées hors transaction
+            statuses.append(set(OutgoingEmail.objects.filter(pk__in=[due.pk, stale.pk]).values_list('status', flat=True)))
+            return len(messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(send_pending(), 2)
+        self.assertEqual(statuses, [{'sending'}, {'sending'}])
+        emails = sorted((email.to, email.status, email.claimed_at is None) for email in OutgoingEmail.objects.all())
+        self.assertEqual(
+            emails, [('a@example.com', 'sent', True), ('b@example.com', 'sent', True), ('c@example.com', 'sending', False)]
+        )
+
+
+class BenchmarkIndexesCommandTests(TestCase):
+
+    def test_reports_plans_and_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_indexes', users=3, days=3, rows=2000, repeat=1, stdout=out)
+        self.assertIn('pending leaves queue', out.getvalue())
+        self.assertIn('sans index', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+class ClaimsAuthenticationTests(RhAppTestCase):
+
+    def obtain(self, user):
+        response = self.client.post('/api/token/', {'username': user.username, 'password': 'pass'})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def use(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_scoping_needs_no_user_lookup(self):
+        # Clés de la page (ETag) et page, sans lecture de l'utilisateur
+        self.use(self.obtain(self.admin)['access'])
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/leaves/')
+        self.assertEqual(len(response.data['results']), 1)
+        self.use(self.obtain(self.employee)['access'])
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/missions/')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_writes_and_actions_with_claims_user(self):
+        self.use(self.obtain(self.employee)['access'])
+        response = self.client.post(
+            '/api/leaves/', {'start_date': '2026-01-05', 'end_date': '2026-01-06', 'reason': 'x'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user'], self.employee.pk)
+        response = self.client.post(f'/api/missions/{self.mission.pk}/complete_mission/')
+        self.assertEqual(response.status_code, 200)
+        self.use(self.obtain(self.admin)['access'])
+        response = self.client.post(f'/api/leaves/{self.leave.pk}/approve_leave/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(LeaveLedgerEntry.objects.get(leave=self.leave).created_by, self.admin)
+
+    def test_me_loads_full_user(self):
+        self.use(self.obtain(self.employee)['access'])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['leave_balance'], 30)
+
+    def test_refresh_reflects_role_change_and_deactivation(self):
+        tokens = self.obtain(self.employee)
+        User.objects.filter(pk=self.employee.pk).update(user_type='admin')
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.use(response.data['access'])
+        response = self.client.get('/api/leaves/')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(self.client.get('/api/users/').data['results'].__len__(), 3)
+
+        User.objects.filter(pk=self.employee.pk).update(is_active=False)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_tokens_without_role_claims_fall_back_to_database(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        self.use(str(AccessToken.for_user(self.admin)))
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/leaves/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalGetTests(RhAppTestCase):
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_unchanged_list_answers_304_without_reading_the_page(self):
+        self.login(self.admin)
+        response = self.get('/api/leaves/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/leaves/', response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Clés de la page seulement : ni COUNT ni agrégat sur toute la liste
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 51', queries[0]['sql'])
+        self.assertNotIn('COUNT(', queries[0]['sql'].upper())
+
+    def test_etag_follows_the_page_rows(self):
+        self.login(self.admin)
+        Leave.objects.create(user=self.intern, start_date=self.today, end_date=self.today, reason='')
+        first = self.get('/api/leaves/?page_size=1')
+        older = self.get(first.data['next'])
+        # Une nouvelle ligne en tête de liste change la première page, pas la suivante
+        Leave.objects.create(user=self.admin, start_date=self.today, end_date=self.today, reason='')
+        self.assertEqual(self.get('/api/leaves/?page_size=1', first['ETag']).status_code, 200)
+        self.assertEqual(self.get(first.data['next'], older['ETag']).status_code, 304)
+
+    def test_changes_and_deletions_change_the_etag(self):
+        self.login(self.admin)
+        etag = self.get('/api/leaves/')['ETag']
+        self.assertTrue(self.leave.approve(approved_by=self.admin))
+        response = self.get('/api/leaves/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 'approved')
+
+        etag = self.get('/api/missions/')['ETag']
+        Mission.objects.create(
+            title='Ancienne', description='', assigned_to=self.employee, supervisor=self.admin,
+            deadline=self.today,
+        ).delete()
+        self.assertEqual(self.get('/api/missions/', etag).status_code, 304)
+        self.mission.delete()
+        self.assertEqual(self.get('/api/missions/', etag).status_code, 200)
+
+    def test_etag_is_per_user_and_per_url(self):
+        self.login(self.employee)
+        employee_etag = self.get('/api/work-hours/')['ETag']
+        self.login(self.admin)
+        self.assertEqual(self.get('/api/work-hours/', employee_etag).status_code, 200)
+        self.assertNotEqual(self.get('/api/work-hours/')['ETag'], employee_etag)
+        self.assertNotEqual(self.get('/api/work-hours/?page_size=1')['ETag'], self.get('/api/work-hours/')['ETag'])
+
+    def test_detail(self):
+        self.login(self.employee)
+        url = f'/api/work-hours/{self.work_hours.pk}/'
+        etag = self.get(url)['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(url, etag).status_code, 304)
+        self.client.patch(url, {'hours_worked': '8.00'})
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['hours_worked'], '8.00')
+
+
+class JobApplicationSearchTests(RhAppTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        fields = dict(
+            application_type='employee', first_name='Sami', last_name='Trabelsi', email='sami@example.com',
+            phone='20000001', education='', experience='', motivation='', cv_file='cvs/sami.pdf',
+        )
+        cls.developer = JobApplication.objects.create(**{
+            **fields, 'position': 'Développeur Python', 'experience': '5 ans de Django et PostgreSQL',
+        })
+        cls.motivated = JobApplication.objects.create(**{
+            **fields, 'position': 'Stagiaire', 'motivation': 'Je souhaite apprendre Python', 'user': cls.employee,
+        })
+
+    def search(self, query, **params):
+        return self.client.get('/api/job-applications/search/', {'q': query, **params})
+
+    def test_ranked_by_field_weight(self):
+        self.login(self.admin)
+        response = self.search('python')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.developer.pk, self.motivated.pk])
+        self.assertGreater(response.data['results'][0]['rank'], response.data['results'][1]['rank'])
+        self.assertNotIn('search_vector', response.data['results'][0])
+        # Accents et casse ignorés, tous les mots requis
+        self.assertEqual(len(self.search('DEVELOPPEUR django').data['results']), 1)
+        self.assertEqual(len(self.search('python comptable').data['results']), 0)
+        self.assertEqual(len(self.search('python', limit=1).data['results']), 1)
+
+    def test_scoped_to_visible_applications(self):
+        self.login(self.employee)
+        response = self.search('python')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.motivated.pk])
+
+    def test_index_follows_writes(self):
+        self.login(self.admin)
+        self.developer.position = 'Développeur Java'
+        self.developer.experience = 'Spring'
+        self.developer.save()
+        self.motivated.delete()
+        JobApplication.objects.bulk_create([JobApplication(
+            application_type='intern', position='Data', first_name='Ines', last_name='Gharbi',
+            email='ines@example.com', phone='20000002', education='Master Python', experience='',
+            motivation='', cv_file='cvs/ines.pdf',
+        )])
+        results = self.search('python').data['results']
+        self.assertEqual([row['first_name'] for row in results], ['Ines'])
+        self.assertEqual(len(self.search('java').data['results']), 1)
+
+    def test_invalid_queries(self):
+        self.login(self.admin)
+        self.assertEqual(self.search('').status_code, 400)
+        self.assertEqual(self.search('python', limit=0).status_code, 400)
+        response = self.search('"python OR (')
+        self.assertEqual(response.status_code, 200)
+
+
+class TemporaryMediaTestCase(RhAppTestCase):
+    """
+    MEDIA_ROOT dans un répertoire temporaire, avec un dossier cvs/
+    """
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        os.makedirs(os.path.join(media.name, 'cvs'))
+        self.media = media.name
+
+
+class CvPipelineTests(TemporaryMediaTestCase):
+
+    def write(self, name, content):
+        with open(os.path.join(self.media, 'cvs', name), 'wb') as f:
+            f.write(content)
+        return f'cvs/{name}'
+
+    def write_docx(self, name, paragraphs, title):
+        path = os.path.join(self.media, 'cvs', name)
+        namespace = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+        body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('word/document.xml', f'<w:document xmlns:w="{namespace}"><w:body>{body}</w:body></w:document>')
+            archive.writestr('docProps/core.xml', (
+                '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+                f'xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>{title}</dc:title></cp:coreProperties>'
+            ))
+        return f'cvs/{name}'
+
+    def apply(self, cv_file, position='Comptable'):
+        return JobApplication.objects.create(
+            application_type='employee', position=position, first_name='Sami', last_name='Trabelsi',
+            email='sami@example.com', phone='20000001', education='', experience='', motivation='',
+            cv_file=cv_file,
+        )
+
+    def test_upload_does_not_parse(self):
+        self.login(self.employee)
+        with patch('Rh_app.cvs.extract_cv') as extract:
+            response = self.client.post('/api/job-applications/', {
+                'application_type': 'employee', 'position': 'Comptable', 'first_name': 'Sami',
+                'last_name': 'Trabelsi', 'email': 'sami@example.com', 'phone': '20000001',
+                'education': 'Licence', 'experience': '2 ans', 'motivation': 'Motivé',
+                'cv_file': SimpleUploadedFile('cv.pdf', b'%PDF-1.4 Python'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['cv_status'], 'pending')
+        self.assertIsNone(response.data['cv'])
+        extract.assert_not_called()
+
+    def test_identical_files_are_parsed_once(self):
+        text = 'Ingénieur   logiciel\n\n\n\nKubernetes et Terraform'.encode()
+        first = self.apply(self.write('a.txt', text))
+        second = self.apply(self.write('b.txt', text))
+        docx = self.apply(self.write_docx('c.docx', ['Gestion de paie', 'Sage'], 'CV Sami'))
+        unsupported = self.apply(self.write('d.bin', b'\x00\x01'))
+
+        with patch('Rh_app.cvs.extract_cv', wraps=extract_cv) as extract, self.assertLogs('Rh_app.cvs', 'WARNING'):
+            call_command('process_cvs', workers=0, stdout=StringIO())
+        self.assertEqual(extract.call_count, 3)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.cv_status, 'parsed')
+        self.assertEqual(first.cv_document_id, second.cv_document_id)
+        self.assertEqual(first.cv_document.text, 'Ingénieur logiciel\n\nKubernetes et Terraform')
+        document = CvDocument.objects.get(applications=docx)
+        self.assertEqual((document.kind, document.text, document.metadata), ('docx', 'Gestion de paie\nSage', {'title': 'CV Sami'}))
+        self.assertEqual(JobApplication.objects.get(pk=unsupported.pk).cv_status, 'failed')
+        # Fichier absent (jeu de données commun)
+        self.assertEqual(JobApplication.objects.get(pk=self.application.pk).cv_status, 'failed')
+
+        # Un contenu déjà connu est rattaché sans nouvelle analyse
+        third = self.apply(self.write('e.txt', text))
+        with patch('Rh_app.cvs.extract_cv') as extract:
+            call_command('process_cvs', workers=0, stdout=StringIO())
+        extract.assert_not_called()
+        third.refresh_from_db()
+        self.assertEqual(third.cv_document_id, first.cv_document_id)
+
+        self.login(self.admin)
+        results = self.client.get('/api/job-applications/search/', {'q': 'terraform'}).data['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['cv']['excerpt'], first.cv_document.text)
+        with self.assertNumQueries(2):
+            self.client.get('/api/job-applications/')
+
+    def test_backfill_in_process_pool(self):
+        applications = [self.apply(self.write(f'{i}.txt', f'CV numéro {i}'.encode())) for i in range(4)]
+        with self.assertLogs('Rh_app.cvs', 'WARNING'):
+            call_command('process_cvs', workers=2, batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            set(JobApplication.objects.filter(pk__in=[a.pk for a in applications]).values_list('cv_status', flat=True)),
+            {'parsed'},
+        )
+        self.assertEqual(CvDocument.objects.filter(status='parsed').count(), 4)
+
+    def test_batch_is_claimed_before_parsing(self):
+        application = self.apply(self.write('a.txt', b'Comptable'))
+        uploaded = self.apply(self.write('b.txt', b'Juriste'))
+        stale = self.apply(self.write('c.txt', b'Auditeur'))
+        JobApplication.objects.filter(pk=stale.pk).update(
+            cv_status='processing', cv_claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(minutes=1)
+        )
+
+        def digest(path):
+            if not calls:
+                # Pendant l'analyse, les lignes sont réservées hors transaction
+                statuses = JobApplication.objects.filter(
+                    pk__in=[application.pk, uploaded.pk, stale.pk]
+                ).values_list('cv_status', flat=True)
+                self.assertEqual(set(statuses), {'processing'})
+                # Nouveau fichier téléversé pendant l'analyse
+                JobApplication.objects.filter(pk=uploaded.pk).update(
+                    cv_status='pending', cv_claimed_at=None, updated_at=timezone.now()
+                )
+                # Modification sans rapport avec le CV pendant l'analyse
+                JobApplication.objects.filter(pk=application.pk).update(phone='20000009', updated_at=timezone.now())
+            calls.append(path)
+            return file_digest(path)
+
+        calls = []
+
+        with patch('Rh_app.cvs.file_digest', side_effect=digest), self.assertLogs('Rh_app.cvs', 'WARNING'):
+            self.assertEqual(process_pending(), 4)
+        statuses = dict(JobApplication.objects.values_list('pk', 'cv_status'))
+        self.assertEqual((statuses[application.pk], statuses[stale.pk]), ('parsed', 'parsed'))
+        self.assertEqual(statuses[uploaded.pk], 'pending')
+        self.assertFalse(JobApplication.objects.filter(cv_claimed_at__isnull=False).exists())
+
+    def test_retry_failed(self):
+        application = self.apply(self.write('a.bin', b'binary'))
+        with self.assertLogs('Rh_app.cvs', 'WARNING'):
+            call_command('process_cvs', workers=0, stdout=StringIO())
+        os.rename(os.path.join(self.media, 'cvs', 'a.bin'), os.path.join(self.media, 'cvs', 'a.txt'))
+        JobApplication.objects.filter(pk=application.pk).update(cv_file='cvs/a.txt')
+        with self.assertLogs('Rh_app.cvs', 'WARNING'):
+            call_command('process_cvs', workers=0, retry_failed=True, stdout=StringIO())
+        application.refresh_from_db()
+        self.assertEqual(application.cv_status, 'parsed')
+        self.assertEqual(application.cv_document.text, 'binary')
+
+
+@override_settings(CV_UPLOAD_CHUNK_SIZE=1000, CV_UPLOAD_MAX_SIZE=10000)
+class CvUploadTests(TemporaryMediaTestCase):
+
+    CONTENT = b'%PDF-1.4\n' + bytes(range(256)) * 10
+
+    def start(self, filename='cv.pdf', size=None):
+        return self.client.post('/api/cv-uploads/', {'filename': filename, 'size': size or len(self.CONTENT)})
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.patch(
+            f'/api/cv-uploads/{upload_id}/', chunk, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def apply(self, **files):
+        return self.client.post('/api/job-applications/', {
+            'application_type': 'employee', 'position': 'Comptable', 'first_name': 'Sami',
+            'last_name': 'Trabelsi', 'email': 'sami@example.com', 'phone': '20000001',
+            'education': 'Licence', 'experience': '2 ans', 'motivation': 'Motivé', **files,
+        })
+
+    def upload(self):
+        upload_id = self.start().data['id']
+        for offset in range(0, len(self.CONTENT), 1000):
+            response = self.send(upload_id, offset, self.CONTENT[offset:offset + 1000])
+            self.assertEqual(response.status_code, 200, response.data)
+        return upload_id
+
+    def test_resumable_upload_and_application(self):
+        self.login(self.employee)
+        upload_id = self.start().data['id']
+        self.assertEqual(self.send(upload_id, 0, self.CONTENT[:1000])['Upload-Offset'], '1000')
+        # Morceau renvoyé après une coupure : l'offset courant est indiqué
+        response = self.send(upload_id, 0, self.CONTENT[:1000])
+        self.assertEqual((response.status_code, response.data['offset']), (409, 1000))
+        response = self.client.get(f'/api/cv-uploads/{upload_id}/')
+        self.assertEqual((response.data['offset'], response.data['completed']), (1000, False))
+        for offset in range(1000, len(self.CONTENT), 1000):
+            response = self.send(upload_id, offset, self.CONTENT[offset:offset + 1000])
+        self.assertTrue(response.data['completed'])
+
+        self.login(self.intern)
+        self.assertEqual(self.client.get(f'/api/cv-uploads/{upload_id}/').status_code, 404)
+        self.assertEqual(self.apply(cv_upload=upload_id).status_code, 400)
+
+        self.login(self.employee)
+        response = self.apply(cv_upload=upload_id)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(CvUpload.objects.exists())
+        application = JobApplication.objects.get(pk=response.data['id'])
+        with application.cv_file.open('rb') as f:
+            self.assertEqual(f.read(), self.CONTENT)
+        self.assertEqual(os.listdir(os.path.join(self.media, 'cvs', 'partial')), [])
+
+    def test_limits_are_enforced_early(self):
+        self.login(self.employee)
+        self.assertEqual(self.start(size=10001).status_code, 400)
+        self.assertEqual(self.start(filename='cv.exe').status_code, 400)
+        upload_id = self.start().data['id']
+        self.assertEqual(self.send(upload_id, 0, self.CONTENT[:1001]).status_code, 413)
+        response = self.send(upload_id, 0, b'MZ' + self.CONTENT[2:1000])
+        self.assertEqual((response.status_code, response.data['offset']), (415, 0))
+        # Multipart : mêmes règles
+        response = self.apply(cv_file=SimpleUploadedFile('cv.pdf', b'MZ not a pdf'))
+        self.assertEqual(response.status_code, 400)
+        response = self.apply(cv_file=SimpleUploadedFile('cv.pdf', self.CONTENT))
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_range_download(self):
+        self.login(self.employee)
+        application_id = self.apply(cv_upload=self.upload()).data['id']
+        url = f'/api/job-applications/{application_id}/cv/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-1199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-1199/{len(self.CONTENT)}')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT[100:1200])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT[-10:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(self.CONTENT)}-').status_code, 416)
+
+        with override_settings(CV_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{JobApplication.objects.get(pk=application_id).cv_file.name}')
+        self.assertEqual(response.content, b'')
+
+        self.login(self.intern)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class AsyncReadEndpointTests(RhAppTestCase):
+    """
+    Les variantes asynchrones renvoient exactement les mêmes réponses
+    """
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/token/', {'username': 'employee', 'password': 'pass'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def assertSameResponse(self, url):
+        sync = self.client.get(f'/api/{url}')
+        asynchronous = self.client.get(f'/api/async/{url}')
+        self.assertEqual(asynchronous.status_code, 200)
+        # Les liens de pagination restent sur la variante asynchrone
+        self.assertEqual(asynchronous.content.replace(b'/api/async/', b'/api/'), sync.content)
+        return sync, asynchronous
+
+    def test_lists_me_and_dashboard(self):
+        for url in ('users/me/', 'dashboard/', 'users/', 'leaves/', 'missions/', 'work-hours/',
+                    'internships/', 'job-applications/'):
+            with self.subTest(url=url):
+                self.assertSameResponse(url)
+
+    def test_cursor_pages_and_etag(self):
+        WorkHours.objects.bulk_create([
+            WorkHours(user=self.employee, date=self.today - timedelta(days=i), hours_worked=8) for i in range(1, 6)
+        ])
+        url = 'work-hours/?page_size=2'
+        sync, asynchronous = self.assertSameResponse(url)
+        response = self.client.get(f'/api/async/{url}', HTTP_IF_NONE_MATCH=asynchronous['ETag'])
+        self.assertEqual(response.status_code, 304)
+        next_page = self.client.get(asynchronous.json()['next'])
+        self.assertEqual(next_page.json()['results'], self.client.get(sync.json()['next']).json()['results'])
+
+    def test_requires_valid_token(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/async/leaves/').status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        self.assertEqual(self.client.get('/api/async/leaves/').status_code, 401)
+
+    def test_invalid_parameters_match_sync_errors(self):
+        for url, status_code in (('leaves/?status=bogus', 400), ('leaves/?ordering=reason', 400),
+                                 ('leaves/?fields=nope', 400), ('leaves/?cursor=zzz', 404)):
+            with self.subTest(url=url):
+                sync = self.client.get(f'/api/{url}')
+                asynchronous = self.client.get(f'/api/async/{url}')
+                self.assertEqual((sync.status_code, asynchronous.status_code), (status_code, status_code))
+                self.assertEqual(asynchronous.json(), sync.json())
+
+    def test_asgi_application_serves_only_async_paths(self):
+        from SystemeRH.asgi import application
+
+        async def request(path):
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                sent.append(message)
+
+            await application({'type': 'http', 'path': path, 'method': 'GET', 'headers': []}, receive, send)
+            return sent[0]['status']
+
+        self.assertEqual(async_to_sync(request)('/api/leaves/export/'), 404)
+
+
+class DatabasePoolTests(RhAppTestCase):
+
+    def test_admin_only(self):
+        self.login(self.employee)
+        self.assertEqual(self.client.get('/api/db-pool/').status_code, 403)
+        self.login(self.admin)
+        response = self.client.get('/api/db-pool/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['pid'], os.getpid())
+        self.assertEqual(response.json()['databases']['default']['mode'], 'per-request')
+
+    def test_pool_counters(self):
+        class FakePool:
+            def get_stats(self):
+                return {'pool_size': 6, 'pool_available': 2, 'requests_queued': 3, 'requests_errors': 1}
+
+        class FakeConnection:
+            vendor = 'postgresql'
+            _connection_pools = {'default': FakePool()}
+            settings_dict = {
+                'OPTIONS': {'pool': {'min_size': 2, 'max_size': 10}},
+                'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True,
+            }
+
+        with patch('Rh_app.dbpool.connections', {'default': FakeConnection()}):
+            state = pool_stats()['databases']['default']
+        self.assertEqual(state['mode'], 'pool')
+        self.assertEqual((state['in_use'], state['available'], state['max_size']), (4, 2, 10))
+        self.assertEqual((state['waits'], state['timeouts'], state['waiting']), (3, 1, 0))
+
+
+class BenchmarkEndpointsCommandTests(TestCase):
+
+    def test_generates_consistent_data_and_times_every_endpoint(self):
+        call_command(
+            'generate_data', users=60, work_hours=600, leaves=300, missions=100, internships=5,
+            applications=20, stdout=StringIO(),
+        )
+        self.assertEqual(WorkHours.objects.count(), 600)
+        self.assertTrue(Leave.objects.filter(status='pending').exists())
+        out = StringIO()
+        call_command('recompute_leave_balances', stdout=out)
+        self.assertIn('cohérents', out.getvalue())
+
+        leaves = Leave.objects.count()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command('benchmark_endpoints', repeat=2, warmup=0, output=output, stdout=StringIO())
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(report['meta']['uncovered'], [])
+        self.assertEqual(report['meta']['rows']['leave'], leaves)
+        for name, result in report['results'].items():
+            with self.subTest(endpoint=name):
+                self.assertLess(result['status'], 400)
+        self.assertGreater(report['results']['leaves.approve_leave (admin)']['queries'], 0)
+        # Les modifications des endpoints mesurés sont annulées
+        self.assertEqual(Leave.objects.count(), leaves)
+
+
+class RequestMetricsTests(RhAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        REGISTRY.reset()
+
+    def test_server_timing_header(self):
+        self.login(self.admin)
+        response = self.client.get('/api/leaves/')
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'serializer', 'app', 'total'})
+        self.assertIn('desc="2 queries"', timing['db'])
+
+    def test_prometheus_histograms(self):
+        self.login(self.admin)
+        self.client.get('/api/leaves/')
+        self.client.post(f'/api/leaves/{self.leave.pk}/approve_leave/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(
+            'rh_http_request_duration_seconds_count{view="LeaveViewSet.list",method="GET",status="2xx"} 1', body
+        )
+        self.assertIn('rh_http_request_db_queries_bucket{view="LeaveViewSet.list",method="GET",le="2"} 1', body)
+        self.assertIn('rh_http_request_db_queries_bucket{view="LeaveViewSet.list",method="GET",le="1"} 0', body)
+        self.assertIn('rh_http_request_duration_seconds_count{view="LeaveViewSet.approve_leave"', body)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_replaces_address_check(self):
+        # Derrière le reverse proxy, l'adresse est celle de nginx
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 200)
+
+    def test_merges_worker_snapshots(self):
+        REGISTRY.observe([('db_queries', ('LeaveViewSet.list', 'GET'), 3)])
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, '1.json'), 'w') as f:
+                json.dump(REGISTRY.snapshot(), f)
+            merged = merged_snapshots(directory)
+        self.assertEqual(merged['db_queries'][('LeaveViewSet.list', 'GET')][-1], 6)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_logs_slow_requests_with_queries(self):
+        self.login(self.admin)
+        with self.assertLogs('Rh_app.metrics', 'WARNING') as logs:
+            self.client.get('/api/leaves/')
+        self.assertIn('LeaveViewSet.list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class SparseFieldsetTests(RhAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+
+    def test_compact_lists(self):
+        application = self.client.get('/api/job-applications/').json()['results'][0]
+        self.assertNotIn('motivation', application)
+        self.assertNotIn('cv', application)
+        self.assertEqual(application['position'], 'Comptable')
+        detail = self.client.get(f'/api/job-applications/{self.application.pk}/').json()
+        self.assertEqual(detail['motivation'], 'Motivé')
+        self.assertNotIn('updated_at', self.client.get('/api/leaves/').json()['results'][0])
+
+    def test_fields_and_omit(self):
+        response = self.client.get('/api/job-applications/?fields=id,position,motivation')
+        self.assertEqual(response.json()['results'][0], {
+            'id': self.application.pk, 'position': 'Comptable', 'motivation': 'Motivé',
+        })
+        response = self.client.get(f'/api/missions/{self.mission.pk}/?fields=title,supervisor_name')
+        self.assertEqual(response.json(), {'title': 'Audit', 'supervisor_name': 'admin'})
+        mission = self.client.get('/api/missions/?omit=description,supervisor_name').json()['results'][0]
+        self.assertNotIn('description', mission)
+        self.assertEqual(mission['assigned_to_name'], 'employee')
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/leaves/?fields=id,salary')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': 'Unknown field(s): salary'})
+        self.assertEqual(self.client.get('/api/leaves/?omit=salary').status_code, 400)
+
+    def test_reads_only_needed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/job-applications/?fields=id,position')
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('motivation', sql)
+        self.assertIn('position', sql)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/missions/?omit=assigned_to_name,supervisor_name')
+        self.assertNotIn('JOIN', queries.captured_queries[-1]['sql'])
+
+
+
+class FastReadTests(RhAppTestCase):
+    """
+    Les listes lues par Rh_app.fastread sont identiques octet pour octet à
+    celles des serializers
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Leave.objects.create(
+            user=cls.admin, start_date=cls.today, end_date=cls.today,
+            reason='Déménagement "urgent"\u2028\\ \x01 ✓'
+        )
+        WorkHours.objects.create(user=cls.admin, date=cls.today, hours_worked=Decimal('8'))
+        JobApplication.objects.create(
+            application_type='intern', position='Stagiaire\tRH', first_name='Émilie', last_name='Ünal',
+            email='emilie@example.com', phone='21000000', education='Master', experience='Aucune',
+            motivation='Très motivée',
+        )
+
+    def assertSameAsSerializers(self, url, plain=True):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(getattr(response, 'plain_data', None), plain)
+        with override_settings(FAST_READ_ENABLED=False):
+            expected = self.client.get(url)
+        self.assertFalse(hasattr(expected, 'plain_data'))
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    def test_lists_are_identical(self):
+        for user in (self.admin, self.employee):
+            self.login(user)
+            for url in ('leaves/', 'missions/', 'work-hours/', 'internships/', 'job-applications/',
+                        'leaves/?fields=id,user_name,reason', 'missions/?omit=description'):
+                with self.subTest(user=user.username, url=url):
+                    self.assertSameAsSerializers(f'/api/{url}')
+        # leave_balance est un flottant : lecture rapide, mais encodage par json.dumps
+        self.assertSameAsSerializers('/api/users/', plain=False)
+
+    def test_cursor_pages(self):
+        self.login(self.admin)
+        WorkHours.objects.bulk_create([
+            WorkHours(user=self.employee, date=self.today - timedelta(days=i), hours_worked=Decimal('7.25'))
+            for i in range(1, 6)
+        ])
+        response = self.assertSameAsSerializers('/api/work-hours/?page_size=2')
+        following = self.assertSameAsSerializers(response.json()['next'])
+        self.assertEqual(len(following.json()['results']), 2)
+        self.assertEqual(following.json()['results'][0]['hours_worked'], '7.25')
+
+    def test_unsupported_fields_use_serializers(self):
+        self.login(self.admin)
+        # Résumé du CV : serializer imbriqué
+        response = self.client.get('/api/job-applications/?fields=id,cv')
+        self.assertFalse(hasattr(response, 'plain_data'))
+        self.assertIn('cv', response.json()['results'][0])
+
+    def test_render_plain(self):
+        data = {'results': [{'id': 1, 'text': 'é\u2028\u2029"\\\x00\x1f\x7f\n😀', 'ok': True, 'none': None}]}
+        self.assertEqual(render_plain(data), JSONRenderer().render(data))
+
+
+
+class ListFilterTests(RhAppTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Leave.objects.create(
+            user=cls.admin, start_date=cls.today + timedelta(days=30), end_date=cls.today + timedelta(days=31),
+            reason='Mariage', status='approved'
+        )
+        Mission.objects.create(
+            title='Inventaire', description='Stock', assigned_to=cls.intern, supervisor=cls.employee,
+            deadline=cls.today + timedelta(days=60), completed=True
+        )
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_filters_combine_with_role_scoping(self):
+        self.login(self.admin)
+        self.assertEqual(self.ids(f'/api/leaves/?user={self.employee.pk}'), [self.leave.pk])
+        self.assertEqual(self.ids('/api/leaves/?status=pending,rejected'), [self.leave.pk])
+        self.login(self.employee)
+        self.assertEqual(self.ids(f'/api/leaves/?user={self.admin.pk}'), [])
+        self.assertEqual(self.ids('/api/leaves/?status=approved'), [])
+
+    def test_date_ranges_and_flags(self):
+        self.login(self.admin)
+        later = (self.today + timedelta(days=20)).isoformat()
+        self.assertEqual(len(self.ids(f'/api/leaves/?start_date__gte={later}')), 1)
+        self.assertEqual(self.ids(f'/api/leaves/?end_date__lt={later}'), [self.leave.pk])
+        self.assertEqual(self.ids(f'/api/work-hours/?date={self.today.isoformat()}'), [self.work_hours.pk])
+        self.assertEqual(self.ids(f'/api/missions/?completed=false&deadline__lte={later}'), [self.mission.pk])
+        self.assertEqual(self.ids(f'/api/missions/?supervisor={self.admin.pk}'), [self.mission.pk])
+        self.assertEqual(self.ids('/api/job-applications/?application_type=employee'), [self.application.pk])
+        self.assertEqual(self.ids('/api/job-applications/?application_type=intern'), [])
+        self.assertEqual(len(self.ids('/api/users/?user_type=admin,intern')), 2)
+
+    def test_search(self):
+        self.login(self.admin)
+        self.assertEqual(self.ids('/api/missions/?search=audit'), [self.mission.pk])
+        self.assertEqual(self.ids('/api/job-applications/?search=ben salah'), [self.application.pk])
+        self.assertEqual(self.ids('/api/leaves/?search=employee vacances'), [self.leave.pk])
+
+    def test_ordering(self):
+        self.login(self.admin)
+        ids = self.ids('/api/leaves/?ordering=-start_date')
+        self.assertEqual(ids, list(Leave.objects.order_by('-start_date', '-id').values_list('id', flat=True)))
+        response = self.client.get('/api/leaves/?ordering=reason')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'ordering': 'Unknown field(s): reason'})
+
+    def test_invalid_values(self):
+        self.login(self.admin)
+        for url, param in (('/api/leaves/?status=archived', 'status'), ('/api/leaves/?user=me', 'user'),
+                           ('/api/work-hours/?date__gte=2024-02-30', 'date__gte'),
+                           ('/api/missions/?completed=yes', 'completed')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(param, response.json())
+
+
+class WorkHoursRollupTests(RhAppTestCase):
+    # Lundi 5 et mardi 6 janvier 2026, lundi 2 février 2026
+    monday = date(2026, 1, 5)
+
+    def totals(self, user):
+        return {
+            (rollup.period, rollup.start): (rollup.hours, rollup.days)
+            for rollup in WorkHoursRollup.objects.filter(user=user)
+        }
+
+    def test_rollups_follow_writes(self):
+        entry = WorkHours.objects.create(user=self.intern, date=self.monday, hours_worked=Decimal('7.50'))
+        WorkHours.objects.create(user=self.intern, date=self.monday + timedelta(days=1), hours_worked=Decimal('8.00'))
+        self.assertEqual(self.totals(self.intern), {
+            ('week', self.monday): (Decimal('15.50'), 2),
+            ('month', date(2026, 1, 1)): (Decimal('15.50'), 2),
+        })
+        entry.date = date(2026, 2, 2)
+        entry.hours_worked = Decimal('4.00')
+        entry.save()
+        self.assertEqual(self.totals(self.intern), {
+            ('week', self.monday): (Decimal('8.00'), 1),
+            ('month', date(2026, 1, 1)): (Decimal('8.00'), 1),
+            ('week', date(2026, 2, 2)): (Decimal('4.00'), 1),
+            ('month', date(2026, 2, 1)): (Decimal('4.00'), 1),
+        })
+        WorkHours.objects.filter(user=self.intern, date__month=1).delete()
+        WorkHours.objects.filter(pk=entry.pk).update(user=self.employee)
+        self.assertEqual(self.totals(self.intern), {})
+        self.assertEqual(self.totals(self.employee)[('week', date(2026, 2, 2))], (Decimal('4.00'), 1))
+
+    def test_bulk_upsert_and_user_deletion(self):
+        self.login(self.admin)
+        rows = [
+            {'user': self.intern.pk, 'date': str(self.monday + timedelta(days=i)), 'hours_worked': '8.00'}
+            for i in range(5)
+        ]
+        self.client.post('/api/work-hours/bulk/', rows, format='json')
+        rows[0]['hours_worked'] = '4.00'
+        response = self.client.post('/api/work-hours/bulk/?upsert=true', rows[:1], format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self.totals(self.intern)[('week', self.monday)], (Decimal('36.00'), 5))
+        self.intern.delete()
+        self.assertFalse(WorkHoursRollup.objects.exclude(user=self.employee).exists())
+
+    def test_rebuild_command(self):
+        WorkHours.objects.create(user=self.intern, date=self.monday, hours_worked=Decimal('7.50'))
+        out = StringIO()
+        call_command('rebuild_work_hours_rollups', stdout=out)
+        self.assertIn('cohérents', out.getvalue())
+        WorkHoursRollup.objects.filter(user=self.intern, period='week').update(hours=Decimal('1.00'))
+        WorkHoursRollup.objects.filter(user=self.intern, period='month').delete()
+        WorkHoursRollup.objects.create(user=self.admin, period='week', start=self.monday, hours=Decimal('2.00'), days=1)
+        expected = self.totals(self.employee)
+        call_command('rebuild_work_hours_rollups', stdout=out)
+        self.assertIn('3 total(aux) incohérent(s)', out.getvalue())
+        self.assertEqual(self.totals(self.intern)[('week', self.monday)], (Decimal('1.00'), 1))
+        call_command('rebuild_work_hours_rollups', '--fix', stdout=out)
+        self.assertEqual(self.totals(self.intern), {
+            ('week', self.monday): (Decimal('7.50'), 1),
+            ('month', date(2026, 1, 1)): (Decimal('7.50'), 1),
+        })
+        self.assertEqual(self.totals(self.admin), {})
+        self.assertEqual(self.totals(self.employee), expected)
+
+    def test_timesheet_endpoint(self):
+        WorkHours.objects.create(user=self.intern, date=self.monday, hours_worked=Decimal('7.50'))
+        self.login(self.admin)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/timesheets/?start__gte=2026-01-01&start__lte=2026-01-31')
+        self.assertEqual(response.json()['results'], [{
+            'user': self.intern.pk, 'user_name': 'intern', 'period': 'month', 'start': '2026-01-01',
+            'hours': '7.50', 'days': 1,
+        }])
+        response = self.client.get(f'/api/timesheets/?period=week&user={self.employee.pk}')
+        self.assertEqual([row['user'] for row in response.json()['results']], [self.employee.pk])
+        self.assertEqual(self.client.get('/api/timesheets/?period=year').status_code, 400)
+        self.login(self.employee)
+        response = self.client.get('/api/timesheets/?period=week')
+        self.assertEqual([row['user_name'] for row in response.json()['results']], ['employee'])
+
+
+class LeaveCalendarTests(RhAppTestCase):
+    url = '/api/leaves/calendar/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.leave.approve()
+        cls.admin_leave = Leave.objects.create(
+            user=cls.admin, start_date=cls.today + timedelta(days=10), end_date=cls.today + timedelta(days=12),
+            reason='Formation', status='approved'
+        )
+        cls.pending = Leave.objects.create(
+            user=cls.employee, start_date=cls.today + timedelta(days=5), end_date=cls.today + timedelta(days=20),
+            reason='Voyage'
+        )
+
+    def window(self, start, end, extra=''):
+        start, end = self.today + timedelta(days=start), self.today + timedelta(days=end)
+        response = self.client.get(f'{self.url}?start={start}&end={end}{extra}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_overlapping_leaves_by_user(self):
+        self.login(self.admin)
+        self.assertEqual(self.window(2, 10), [self.admin_leave.pk, self.leave.pk])
+        self.assertEqual(self.window(3, 9), [])
+        self.assertEqual(self.window(12, 40, f'&user={self.admin.pk}'), [self.admin_leave.pk])
+        self.assertEqual(self.window(3, 9, '&status=approved,pending'), [self.pending.pk])
+        self.login(self.employee)
+        self.assertEqual(self.window(-5, 30), [self.leave.pk])
+
+    def test_invalid_windows(self):
+        self.login(self.admin)
+        for query, param in (('start=2026-01-10', 'end'), ('start=2026-01-10&end=2026-01-09', 'end'),
+                             ('start=2026-01-01&end=2027-01-02', 'end'), ('start=soon&end=2026-01-09', 'start')):
+            with self.subTest(query=query):
+                response = self.client.get(f'{self.url}?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(param, response.json())
+
+    def test_overlapping_approved_leaves_are_rejected_by_the_database(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Leave.objects.create(
+                user=self.employee, start_date=self.today + timedelta(days=2), end_date=self.today + timedelta(days=3),
+                reason='Doublon', status='approved'
+            )
+        # Bornes incluses : un congé qui commence le lendemain est accepté
+        Leave.objects.create(
+            user=self.employee, start_date=self.today + timedelta(days=3), end_date=self.today + timedelta(days=3),
+            reason='Pont', status='approved'
+        )
+        overlapping = Leave.objects.create(
+            user=self.employee, start_date=self.today + timedelta(days=2), end_date=self.today + timedelta(days=6),
+            reason='Doublon'
+        )
+        self.login(self.admin)
+        response = self.client.post(f'/api/leaves/{overlapping.pk}/approve_leave/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data, {'error': 'Leave overlaps an approved leave'})
+        overlapping.refresh_from_db()
+        self.employee.refresh_from_db()
+        self.assertEqual((overlapping.status, self.employee.leave_balance), ('pending', 30 - self.leave.days))
+        self.assertFalse(LeaveLedgerEntry.objects.filter(leave=overlapping).exists())
+
+    def test_dates_are_validated_on_update(self):
+        self.login(self.employee)
+        url = f'/api/leaves/{self.pending.pk}/'
+        response = self.client.patch(url, {'end_date': str(self.today)}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_date', response.data)
+        response = self.client.patch(url, {'end_date': str(self.today + timedelta(days=6))}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_approved_leave_cannot_be_modified(self):
+        self.login(self.employee)
+        response = self.client.patch(
+            f'/api/leaves/{self.leave.pk}/', {'end_date': str(self.today + timedelta(days=30))}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.data)
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.end_date, self.today + timedelta(days=2))
+
+
+class BulkDecisionTests(RhAppTestCase):
+
+    def pending_leaves(self, user, count, offset=30):
+        return [
+            Leave.objects.create(
+                user=user, start_date=self.today + timedelta(days=offset + 10 * i),
+                end_date=self.today + timedelta(days=offset + 10 * i + 1), reason='Lot'
+            ).pk
+            for i in range(count)
+        ]
+
+    def test_bulk_approve_leaves(self):
+        self.login(self.admin)
+        rejected = Leave.objects.create(
+            user=self.intern, start_date=self.today, end_date=self.today, reason='Refusé', status='rejected'
+        )
+        overlapping = Leave.objects.create(
+            user=self.employee, start_date=self.today + timedelta(days=1), end_date=self.today + timedelta(days=4),
+            reason='Chevauchement'
+        )
+        batch = self.pending_leaves(self.employee, 3) + self.pending_leaves(self.intern, 2)
+        ids = [self.leave.pk, overlapping.pk, *batch, rejected.pk, 999999]
+        response = self.client.post('/api/leaves/bulk_approve/', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['processed'], response.data['error_count']), (6, 3))
+        self.assertEqual(response.data['results'][0], {'id': self.leave.pk, 'status': 'approved'})
+        self.assertEqual(response.data['results'][1], {'id': overlapping.pk, 'error': 'Leave overlaps an approved leave'})
+        self.assertEqual(response.data['results'][-2:], [
+            {'id': rejected.pk, 'error': 'Leave already processed'}, {'id': 999999, 'error': 'Not found'},
+        ])
+        self.employee.refresh_from_db()
+        self.intern.refresh_from_db()
+        debits = {
+            user_id: sum(Leave.objects.get(pk=pk).days for pk in ids)
+            for user_id, ids in ((self.employee.pk, [self.leave.pk, *batch[:3]]), (self.intern.pk, batch[3:]))
+        }
+        self.assertEqual(
+            (self.employee.leave_balance, self.intern.leave_balance),
+            (30 - debits[self.employee.pk], -debits[self.intern.pk]),
+        )
+        self.assertEqual(LeaveLedgerEntry.objects.filter(kind='leave', created_by=self.admin).count(), 6)
+        self.assertEqual(Leave.objects.get(pk=overlapping.pk).status, 'pending')
+
+    def test_bulk_query_count_is_independent_of_batch_size(self):
+        self.login(self.admin)
+        for count in (2, 40):
+            Leave.objects.filter(status='pending').delete()
+            # Après les congés approuvés du tour précédent
+            self.pending_leaves(self.employee, count // 2, offset=30 * count)
+            self.pending_leaves(self.intern, count // 2, offset=30 * count)
+            # Filtres, SAVEPOINT, lecture verrouillée, congés approuvés, UPDATE congés,
+            # jours fériés, UPDATE soldes, registre, RELEASE
+            with self.subTest(count=count), self.assertNumQueries(9):
+                response = self.client.post('/api/leaves/bulk_approve/?status=pending')
+            self.assertEqual(response.data['processed'], count)
+
+    def test_bulk_reject_and_permissions(self):
+        self.login(self.employee)
+        self.assertEqual(self.client.post('/api/leaves/bulk_reject/', {'ids': [self.leave.pk]}, format='json').status_code, 403)
+        self.login(self.admin)
+        self.assertEqual(self.client.post('/api/leaves/bulk_reject/').status_code, 400)
+        response = self.client.post('/api/leaves/bulk_reject/?user=' + str(self.employee.pk))
+        self.assertEqual(response.data['results'], [{'id': self.leave.pk, 'status': 'rejected'}])
+        response = self.client.post('/api/leaves/bulk_reject/', {'ids': [self.leave.pk]}, format='json')
+        self.assertEqual(response.data['results'], [{'id': self.leave.pk, 'error': 'Leave already processed'}])
+
+    def test_bulk_requires_ids_or_a_declared_filter(self):
+        self.login(self.admin)
+        for query in ('?format=json', '?page_size=10', '?search=', '?ordering=start_date'):
+            response = self.client.post('/api/leaves/bulk_approve/' + query)
+            self.assertEqual(response.status_code, 400, query)
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.status, 'pending')
+        response = self.client.post('/api/leaves/bulk_approve/?format=json&start_date__gte=2000-01-01')
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_application_decisions_queue_emails(self):
+        self.login(self.admin)
+        other = JobApplication.objects.create(
+            application_type='intern', position='Stagiaire RH', first_name='Sana', last_name='Trabelsi',
+            email='sana@example.com', phone='20000001', education='Licence', experience='Aucune',
+            motivation='Motivée', cv_file='cvs/sana.pdf'
+        )
+        ids = [self.application.pk, other.pk]
+        response = self.client.post('/api/job-applications/bulk_reject/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['processed'], 2)
+        self.assertEqual(sorted(OutgoingEmail.objects.values_list('to', flat=True)), ['ali@example.com', 'sana@example.com'])
+        response = self.client.post('/api/job-applications/bulk_reject/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+    def test_applicant_cannot_decide_own_application(self):
+        JobApplication.objects.filter(pk=self.application.pk).update(user=self.employee)
+        self.login(self.employee)
+        response = self.client.patch(
+            f'/api/job-applications/{self.application.pk}/',
+            {'status': 'approved', 'user': self.admin.pk, 'phone': '20000009'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.application.refresh_from_db()
+        self.assertEqual((self.application.status, self.application.user_id), ('pending', self.employee.pk))
+        self.assertEqual(self.application.phone, '20000009')
+
+    def test_bulk_internship_status_respects_supervisor(self):
+        other = Internship.objects.create(
+            intern=self.intern, supervisor=self.admin, start_date=self.today, end_date=self.today + timedelta(days=30)
+        )
+        self.login(self.employee)
+        response = self.client.post(
+            '/api/internships/bulk_change_status/', {'ids': [self.internship.pk, other.pk], 'status': 'active'},
+            format='json'
+        )
+        self.assertEqual(response.data['results'], [
+            {'id': self.internship.pk, 'status': 'active'}, {'id': other.pk, 'error': 'Not found'},
+        ])
+        self.login(self.intern)
+        response = self.client.post(
+            '/api/internships/bulk_change_status/', {'ids': [other.pk], 'status': 'terminated'}, format='json'
+        )
+        self.assertEqual(response.data['results'], [{'id': other.pk, 'error': 'Permission denied'}])
+        self.assertEqual(self.client.post(
+            '/api/internships/bulk_change_status/', {'ids': [other.pk], 'status': 'archived'}, format='json'
+        ).status_code, 400)
+
+
+class ArchiveTests(RhAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        archive_root = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_root.cleanup)
+        root = override_settings(ARCHIVE_ROOT=archive_root.name)
+        root.enable()
+        self.addCleanup(root.disable)
+        self.archive_root = archive_root.name
+        # Lignes au-delà de l'horizon de 730 jours
+        self.old = self.today - timedelta(days=800)
+        self.old_hours = WorkHours.objects.create(user=self.employee, date=self.old, hours_worked=Decimal('8.00'))
+        self.old_leave = Leave.objects.create(
+            user=self.employee, start_date=self.old, end_date=self.old + timedelta(days=1),
+            reason='Ancien congé', status='approved',
+        )
+        LeaveLedgerEntry.objects.create(user=self.employee, leave=self.old_leave, kind='leave', days=-2)
+        self.old_pending = Leave.objects.create(
+            user=self.intern, start_date=self.old, end_date=self.old, reason='Oubliée'
+        )
+        self.old_application = JobApplication.objects.create(
+            application_type='intern', position='Stage', first_name='Sami', last_name='Trabelsi',
+            email='sami@example.com', phone='20000001', education='Licence', experience='-',
+            motivation='-', cv_file='cvs/sami.pdf', status='rejected',
+        )
+        JobApplication.objects.filter(pk=self.old_application.pk).update(
+            created_at=timezone.now() - timedelta(days=800)
+        )
+
+    def test_command_moves_old_rows(self):
+        out = StringIO()
+        call_command('archive_records', dry_run=True, stdout=out)
+        self.assertIn('work-hours: 1 ligne(s) à archiver', out.getvalue())
+        self.assertFalse(ArchivedWorkHours.objects.exists())
+
+        call_command('archive_records', batch_size=1, stdout=StringIO())
+        self.assertEqual(list(WorkHours.objects.values_list('pk', flat=True)), [self.work_hours.pk])
+        self.assertCountEqual(Leave.objects.values_list('pk', flat=True), [self.leave.pk, self.old_pending.pk])
+        self.assertEqual(list(JobApplication.objects.values_list('pk', flat=True)), [self.application.pk])
+
+        month = self.old.replace(day=1)
+        archived = ArchivedLeave.objects.get(id=self.old_leave.pk)
+        self.assertEqual((archived.month, archived.user_id, archived.status), (month, self.employee.pk, 'approved'))
+        self.assertEqual(ArchivedWorkHours.objects.get(id=self.old_hours.pk).hours_worked, Decimal('8.00'))
+        self.assertEqual(ArchivedJobApplication.objects.get(id=self.old_application.pk).cv_file, 'cvs/sami.pdf')
+        # Le registre garde l'écriture, sans lien vers la demande archivée
+        self.assertTrue(LeaveLedgerEntry.objects.filter(user=self.employee, kind='leave', leave=None).exists())
+        # Les heures archivées quittent les totaux des feuilles de temps
+        self.assertFalse(WorkHoursRollup.objects.filter(user=self.employee, period='month', start=month).exists())
+
+        path = os.path.join(self.archive_root, 'leaves', f'{month:%Y-%m}.jsonl.gz')
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([(row['id'], row['reason']) for row in rows], [(self.old_leave.pk, 'Ancien congé')])
+
+        # Relancer ne déplace plus rien
+        out = StringIO()
+        call_command('archive_records', stdout=out)
+        self.assertIn('leaves: 0 ligne(s) archivée(s)', out.getvalue())
+
+    def test_archive_api_is_read_only_and_scoped(self):
+        call_command('archive_records', stdout=StringIO())
+        self.login(self.admin)
+        response = self.client.get('/api/archive/job-applications/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.old_application.pk])
+        response = self.client.get(f'/api/archive/leaves/{self.old_leave.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['month'], str(self.old.replace(day=1)))
+
+        self.login(self.intern)
+        self.assertEqual(self.client.get('/api/archive/leaves/').data['results'], [])
+        response = self.client.get(f'/api/archive/leaves/{self.old_leave.pk}/')
+        self.assertEqual(response.status_code, 404)
+        self.login(self.employee)
+        response = self.client.get(f'/api/archive/work-hours/?month__lte={self.old:%Y-%m-%d}')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.old_hours.pk])
+        response = self.client.post('/api/archive/leaves/', {}, format='json')
+        self.assertEqual(response.status_code, 405)
+
+
+class LeaveAccrualTests(RhAppTestCase):
+    # Vendredi 2 janvier 2026
+    friday = date(2026, 1, 2)
+
+    def test_business_day_count(self):
+        holidays = {date(2026, 1, 6), date(2026, 1, 10)}
+        calendar = BusinessCalendar(holidays)
+        # 8 jours de semaine du vendredi 2 au mardi 13, moins le mardi 6 (le samedi 10 ne compte pas)
+        self.assertEqual(calendar.count(self.friday, date(2026, 1, 13)), 7)
+        self.assertEqual(calendar.count(date(2026, 1, 3), date(2026, 1, 4)), 0)
+        self.assertEqual(calendar.count(self.friday, self.friday - timedelta(days=1)), 0)
+        for offset in range(7):
+            start = self.friday + timedelta(days=offset)
+            for length in range(30):
+                end = start + timedelta(days=length)
+                days = [start + timedelta(days=i) for i in range(length + 1)]
+                expected = sum(day.weekday() < 5 and day not in holidays for day in days)
+                self.assertEqual(calendar.count(start, end), expected)
+
+    def test_approval_debits_business_days(self):
+        Holiday.objects.create(date=self.friday + timedelta(days=3), name='Férié')
+        leave = Leave.objects.create(
+            user=self.employee, start_date=self.friday, end_date=self.friday + timedelta(days=3), reason='Pont'
+        )
+        self.assertEqual(leave.days, 1)
+        self.assertTrue(leave.approve())
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 29)
+
+    def test_accrue_month_is_idempotent_and_set_based(self):
+        month = self.today.replace(day=1)
+        User.objects.create_user(username='former', password='pass', is_active=False)
+        out = StringIO()
+        call_command('accrue_leave', stdout=out)
+        self.assertIn('2 utilisateur(s) crédité(s)', out.getvalue())
+        call_command('accrue_leave', stdout=out)
+        self.assertIn('0 utilisateur(s) crédité(s)', out.getvalue())
+        balances = dict(User.objects.values_list('username', 'leave_balance'))
+        self.assertEqual(
+            (balances['admin'], balances['employee'], balances['intern'], balances['former']), (32.5, 32.5, 0, 0)
+        )
+        entry = LeaveLedgerEntry.objects.get(user=self.employee, kind='accrual')
+        self.assertEqual((entry.days, entry.period), (2.5, month))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            LeaveLedgerEntry.objects.create(user=self.employee, kind='accrual', days=2.5, period=month)
+
+        # Même nombre de requêtes pour 3 ou 53 utilisateurs
+        User.objects.bulk_create([User(username=f'new{i}', user_type='employee') for i in range(50)])
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(accrue_month(next_month), 52)
+        self.assertLessEqual(len(queries), 4)
+        self.assertEqual(User.objects.get(username='new0').leave_balance, 2.5)
+
+    def test_restate_leave_debits(self):
+        # Débit en jours calendaires, comme avant le décompte en jours ouvrés
+        leave = Leave.objects.create(
+            user=self.employee, start_date=self.friday, end_date=self.friday + timedelta(days=3),
+            reason='Ancien', status='approved',
+        )
+        LeaveLedgerEntry.objects.create(user=self.employee, kind='opening', days=30)
+        LeaveLedgerEntry.objects.create(user=self.employee, leave=leave, kind='leave', days=-4)
+        User.objects.filter(pk=self.employee.pk).update(leave_balance=26)
+        out = StringIO()
+        call_command('restate_leave_debits', stdout=out)
+        self.assertIn(f'congé {leave.pk}', out.getvalue())
+        call_command('restate_leave_debits', '--fix', stdout=out)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.leave_balance, 28)
+        adjustment = LeaveLedgerEntry.objects.get(leave=leave, kind='adjustment')
+        self.assertEqual(adjustment.days, 2)
+        self.assertEqual(sum(LeaveLedgerEntry.objects.filter(user=self.employee).values_list('days', flat=True)), 28)
+        out = StringIO()
+        call_command('restate_leave_debits', stdout=out)
+        self.assertIn('Tous les débits correspondent', out.getvalue())
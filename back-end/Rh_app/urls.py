@@ -1,23 +1,43 @@
 # Rh_app/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
+# Sans variantes à suffixe (.json) : ?format=json suffit, et les actions
+# personnalisées n'acceptent pas d'argument `format`
 router = DefaultRouter()
+router.include_format_suffixes = False
 router.register(r'users', views.UserViewSet)
 router.register(r'leaves', views.LeaveViewSet)
 router.register(r'missions', views.MissionViewSet)
 router.register(r'work-hours', views.WorkHoursViewSet)
+router.register(r'timesheets', views.TimesheetViewSet)
 router.register(r'internships', views.InternshipViewSet)
 router.register(r'job-applications', views.JobApplicationViewSet)
+router.register(r'cv-uploads', views.CvUploadViewSet, basename='cv-upload')
+router.register(r'dashboard', views.DashboardViewSet, basename='dashboard')
+router.register(r'archive/work-hours', views.ArchivedWorkHoursViewSet)
+router.register(r'archive/leaves', views.ArchivedLeaveViewSet)
+router.register(r'archive/job-applications', views.ArchivedJobApplicationViewSet)
+router.register(r'db-pool', views.DatabasePoolViewSet, basename='db-pool')
 
 urlpatterns = [
     path('', include(router.urls)),
-    # Custom user management endpoints
-    path('users/request-access/', views.UserViewSet.as_view({'post': 'request_access'}), name='user-request-access'),
-    path('users/<int:pk>/approve/', views.UserViewSet.as_view({'post': 'approve_user'}), name='user-approve'),
-    path('users/<int:pk>/reject/', views.UserViewSet.as_view({'post': 'reject_user'}), name='user-reject'),
     path('users/me/', views.UserViewSet.as_view({'get': 'me'}), name='user-me'),
-    # Authentication endpoints
-    path('auth/signup/', views.signup_view, name='signup'),
+    # Variantes asynchrones des lectures (à servir sous ASGI)
+    path('async/users/me/', async_views.AsyncMeView.as_view(), name='async-user-me'),
+    path('async/dashboard/', async_views.AsyncDashboardView.as_view(), name='async-dashboard'),
+]
+
+ASYNC_LISTS = {
+    'users': views.UserViewSet,
+    'leaves': views.LeaveViewSet,
+    'missions': views.MissionViewSet,
+    'work-hours': views.WorkHoursViewSet,
+    'internships': views.InternshipViewSet,
+    'job-applications': views.JobApplicationViewSet,
+}
+urlpatterns += [
+    path(f'async/{prefix}/', async_views.AsyncListView.as_view(viewset_class=viewset_class), name=f'async-{prefix}-list')
+    for prefix, viewset_class in ASYNC_LISTS.items()
 ]
\ No newline at end of file
@@ -1,29 +1,60 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.response import Response
+from django.db.models import Q, F, Count, Sum
 from rest_framework.decorators import action, api_view
-from datetime import datetime
+from rest_framework.exceptions import ValidationError
+from datetime import datetime, timedelta
 import logging
 import json
-from django.core.mail import send_mail
-from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate
+import os
+from django.db import transaction
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
 
-from .models import User, Leave, Mission, WorkHours, Internship, JobApplication
+from .models import (
+    User, ArchivedJobApplication, ArchivedLeave, ArchivedWorkHours, CvUpload, Leave, LeaveOverlapError, Mission,
+    WorkHours, WorkHoursRollup, Internship, JobApplication,
+)
+from .authentication import full_user
+from .availability import Overlaps, calendar_window
+from .bulk import ingest_work_hours, read_csv_rows
+from .conditional import ConditionalGetMixin
+from .dbpool import pool_stats
+from .decisions import (
+    application_email, approve_leaves, bulk_response, bulk_targets, change_internship_statuses,
+    decide_applications, reject_leaves,
+)
+from .exports import CsvExportMixin
+from .fastread import FastListMixin
+from .fieldsets import SparseFieldsetMixin
+from .filters import LIST_FILTER_BACKENDS, FieldFilter
+from .files import UploadError, append_chunk, complete_upload, serve_file
+from .outbox import enqueue_email
+from .pagination import ArchivedCursorPagination, DateJoinedCursorPagination, PeriodStartCursorPagination
+from .search import search_job_applications
 from .serializers import (
-    UserSerializer, LeaveSerializer, MissionSerializer, 
-    WorkHoursSerializer, InternshipSerializer, JobApplicationSerializer
+    UserSerializer, LeaveSerializer, LeaveListSerializer, MissionSerializer,
+    WorkHoursSerializer, WorkHoursListSerializer, WorkHoursRollupSerializer, InternshipSerializer, InternshipListSerializer,
+    JobApplicationSerializer, JobApplicationListSerializer, JobApplicationSearchSerializer,
+    CvUploadSerializer, ArchivedWorkHoursSerializer, ArchivedLeaveSerializer, ArchivedJobApplicationSerializer,
 )
 
 # Configurer le logger
 logger = logging.getLogger(__name__)
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = DateJoinedCursorPagination
+    page_size = 100
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {'user_type': ('user_type', 'choice')}
+    search_fields = ('username', 'first_name', 'last_name', 'email')
+    ordering_fields = ('date_joined', 'username', 'last_name')
     
     def get_permissions(self):
         if self.action == 'create':
@@ -32,7 +63,7 @@ class UserViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(full_user(request.user))
         return Response(serializer.data)
         
     def create(self, request, *args, **kwargs):
@@ -53,9 +84,24 @@ class UserViewSet(viewsets.ModelViewSet):
             return User.objects.all()
         return User.objects.filter(id=user.id)
 
-class LeaveViewSet(viewsets.ModelViewSet):
+class LeaveViewSet(SparseFieldsetMixin, CsvExportMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Leave.objects.all()
     serializer_class = LeaveSerializer
+    list_serializer_class = LeaveListSerializer
+    page_size = 50
+    export_fields = (
+        ('id', 'id'), ('user', 'user_id'), ('username', 'user__username'),
+        ('start_date', 'start_date'), ('end_date', 'end_date'), ('reason', 'reason'),
+        ('status', 'status'), ('created_at', 'created_at'),
+    )
+    export_date_field = ('start_date', 'end_date')
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {
+        'status': ('status', 'choice'), 'user': ('user', 'id'),
+        'start_date': ('start_date', 'date'), 'end_date': ('end_date', 'date'),
+    }
+    search_fields = ('reason', 'user__username')
+    ordering_fields = ('created_at', 'start_date', 'end_date', 'status')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -63,12 +109,13 @@ class LeaveViewSet(viewsets.ModelViewSet):
         Limiter les résultats en fonction du type d'utilisateur
         """
         user = self.request.user
+        queryset = Leave.objects.select_related('user')
         if user.is_superuser or user.user_type == 'admin':
-            return Leave.objects.all()
-        return Leave.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user_id=user.id)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
     
     @action(detail=True, methods=['post'])
     def approve_leave(self, request, pk=None):
@@ -79,13 +126,12 @@ class LeaveViewSet(viewsets.ModelViewSet):
         if request.user.user_type != 'admin' and not request.user.is_superuser:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        leave.status = 'approved'
-        leave.save()
-        
-        # Mise à jour du solde de congés
-        days = (leave.end_date - leave.start_date).days + 1
-        leave.user.leave_balance -= days
-        leave.user.save()
+        try:
+            approved = leave.approve(approved_by=request.user)
+        except LeaveOverlapError:
+            return Response({'error': 'Leave overlaps an approved leave'}, status=status.HTTP_409_CONFLICT)
+        if not approved:
+            return Response({'error': 'Leave already processed'}, status=status.HTTP_409_CONFLICT)
         
         return Response({'status': 'leave approved'})
     
@@ -98,13 +144,80 @@ class LeaveViewSet(viewsets.ModelViewSet):
         if request.user.user_type != 'admin' and not request.user.is_superuser:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        leave.status = 'rejected'
-        leave.save()
+        if not leave.reject():
+            return Response({'error': 'Leave already processed'}, status=status.HTTP_409_CONFLICT)
         return Response({'status': 'leave rejected'})
 
-class MissionViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def bulk_approve(self, request):
+        """
+        Approuver des demandes en une requête : `{"ids": [...]}`, ou sans
+        corps les demandes qui correspondent aux filtres de la liste
+        (?status=pending&start_date__lte=...). Résultat ligne par ligne
+        (voir Rh_app.decisions).
+        """
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        ids, queryset = bulk_targets(self, request)
+        try:
+            results = approve_leaves(ids, queryset, approved_by=request.user)
+        except LeaveOverlapError:
+            # Approbation concurrente d'un congé qui chevauche : rien n'a été enregistré
+            return Response({'error': 'Leave overlaps an approved leave'}, status=status.HTTP_409_CONFLICT)
+        return Response(bulk_response(results))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_reject(self, request):
+        """
+        Rejeter des demandes en une requête (mêmes paramètres que bulk_approve)
+        """
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        ids, queryset = bulk_targets(self, request)
+        return Response(bulk_response(reject_leaves(ids, queryset)))
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Calendrier des absences : congés qui chevauchent la fenêtre
+        ?start=...&end=... (bornes incluses, 366 jours au plus), par employé
+        puis par date. Congés approuvés par défaut, `?status=` pour inclure
+        les demandes en attente ; `?user=3,4` limite aux membres d'une équipe.
+        """
+        start, end = calendar_window(request.query_params)
+        queryset = FieldFilter().filter_queryset(request, self.get_queryset(), self)
+        if 'status' not in request.query_params:
+            queryset = queryset.filter(status='approved')
+        absences = (
+            queryset.filter(Overlaps('start_date', 'end_date', start, end))
+            .order_by('user_id', 'start_date', 'id')
+            .values('id', 'user', 'start_date', 'end_date', 'status', user_name=F('user__username'))
+        )
+        return Response({'start': start, 'end': end, 'results': list(absences)})
+
+class MissionViewSet(SparseFieldsetMixin, CsvExportMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Mission.objects.all()
     serializer_class = MissionSerializer
+    # Pas de représentation compacte : le tableau des missions affiche la
+    # description (?omit=description pour s'en passer)
+    page_size = 50
+    export_fields = (
+        ('id', 'id'), ('title', 'title'), ('assigned_to', 'assigned_to_id'),
+        ('assigned_to_name', 'assigned_to__username'), ('supervisor', 'supervisor_id'),
+        ('supervisor_name', 'supervisor__username'), ('deadline', 'deadline'),
+        ('completed', 'completed'), ('created_at', 'created_at'),
+    )
+    export_date_field = 'deadline'
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {
+        'completed': ('completed', 'bool'), 'assigned_to': ('assigned_to', 'id'),
+        'supervisor': ('supervisor', 'id'), 'deadline': ('deadline', 'date'),
+    }
+    search_fields = ('title', 'description', 'assigned_to__username')
+    ordering_fields = ('created_at', 'deadline', 'title')
+    export_user_field = 'assigned_to'
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -112,9 +225,10 @@ class MissionViewSet(viewsets.ModelViewSet):
         Limiter les résultats en fonction du type d'utilisateur
         """
         user = self.request.user
+        queryset = Mission.objects.select_related('assigned_to', 'supervisor')
         if user.is_superuser or user.user_type == 'admin':
-            return Mission.objects.all()
-        return Mission.objects.filter(assigned_to=user) | Mission.objects.filter(supervisor=user)
+            return queryset
+        return queryset.filter(Q(assigned_to_id=user.id) | Q(supervisor_id=user.id))
     
     def perform_create(self, serializer):
         if self.request.user.user_type == 'intern':
@@ -127,16 +241,27 @@ class MissionViewSet(viewsets.ModelViewSet):
         Marquer une mission comme complétée
         """
         mission = self.get_object()
-        if request.user != mission.assigned_to and request.user != mission.supervisor:
+        if request.user.id not in (mission.assigned_to_id, mission.supervisor_id):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
         mission.completed = True
         mission.save()
         return Response({'status': 'mission completed'})
 
-class WorkHoursViewSet(viewsets.ModelViewSet):
+class WorkHoursViewSet(SparseFieldsetMixin, CsvExportMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = WorkHours.objects.all()
     serializer_class = WorkHoursSerializer
+    list_serializer_class = WorkHoursListSerializer
+    page_size = 200
+    export_fields = (
+        ('id', 'id'), ('user', 'user_id'), ('username', 'user__username'),
+        ('date', 'date'), ('hours_worked', 'hours_worked'), ('created_at', 'created_at'),
+    )
+    export_date_field = 'date'
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {'user': ('user', 'id'), 'date': ('date', 'date')}
+    search_fields = ('user__username',)
+    ordering_fields = ('created_at', 'date', 'hours_worked')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -144,21 +269,86 @@ class WorkHoursViewSet(viewsets.ModelViewSet):
         Limiter les résultats en fonction du type d'utilisateur
         """
         user = self.request.user
+        queryset = WorkHours.objects.select_related('user')
         if user.is_superuser or user.user_type == 'admin':
-            return WorkHours.objects.all()
-        return WorkHours.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user_id=user.id)
     
     def perform_create(self, serializer):
         if 'user' not in self.request.data:
-            serializer.save(user=self.request.user)
+            serializer.save(user_id=self.request.user.id)
         else:
             if self.request.user.user_type != 'admin' and not self.request.user.is_superuser:
                 return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
             serializer.save()
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Importer des heures de travail en masse : tableau JSON de lignes ou
+        fichier CSV envoyé dans le champ `file` (à privilégier pour les gros
+        volumes). `?upsert=true` met à jour les lignes (user, date) existantes.
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            rows = read_csv_rows(upload)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {'error': 'Expected a JSON array or a CSV file'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        upsert = request.query_params.get('upsert', '').lower() in ('1', 'true', 'yes')
+        result = ingest_work_hours(rows, request.user, upsert=upsert)
+        if result['error_count']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+class TimesheetViewSet(FastListMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Feuilles de temps : total des heures par employé et par semaine
+    (`?period=week`) ou par mois (`?period=month`, par défaut), lu dans
+    WorkHoursRollup uniquement. `?start__gte=` / `?start__lte=` bornent les
+    périodes, `?user=` filtre les employés. Le détail jour par jour est la
+    liste des heures de travail (/api/work-hours/?date__gte=...).
+    """
+    queryset = WorkHoursRollup.objects.all()
+    serializer_class = WorkHoursRollupSerializer
+    pagination_class = PeriodStartCursorPagination
+    page_size = 200
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {'user': ('user', 'id'), 'start': ('start', 'date')}
+    search_fields = ('user__username',)
+    ordering_fields = ('start', 'hours')
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Totaux de la période demandée, limités à l'utilisateur connecté sauf
+        pour les administrateurs
+        """
+        period = self.request.query_params.get('period', 'month')
+        if period not in dict(WorkHoursRollup.PERIOD_CHOICES):
+            raise ValidationError({'period': f'Invalid choice: {period!r}'})
+        user = self.request.user
+        queryset = WorkHoursRollup.objects.select_related('user').filter(period=period)
+        if user.is_superuser or user.user_type == 'admin':
+            return queryset
+        return queryset.filter(user_id=user.id)
 
-class InternshipViewSet(viewsets.ModelViewSet):
+class InternshipViewSet(SparseFieldsetMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Internship.objects.all()
     serializer_class = InternshipSerializer
+    list_serializer_class = InternshipListSerializer
+    page_size = 50
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {
+        'status': ('status', 'choice'), 'intern': ('intern', 'id'), 'supervisor': ('supervisor', 'id'),
+        'start_date': ('start_date', 'date'), 'end_date': ('end_date', 'date'),
+    }
+    search_fields = ('intern__username', 'supervisor__username')
+    ordering_fields = ('created_at', 'start_date', 'end_date', 'status')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -166,11 +356,12 @@ class InternshipViewSet(viewsets.ModelViewSet):
         Limiter les résultats en fonction du type d'utilisateur
         """
         user = self.request.user
+        queryset = Internship.objects.select_related('intern', 'supervisor')
         if user.is_superuser or user.user_type == 'admin':
-            return Internship.objects.all()
+            return queryset
         if user.user_type == 'intern':
-            return Internship.objects.filter(intern=user)
-        return Internship.objects.filter(supervisor=user)
+            return queryset.filter(intern_id=user.id)
+        return queryset.filter(supervisor_id=user.id)
     
     @action(detail=True, methods=['post'])
     def change_status(self, request, pk=None):
@@ -178,7 +369,7 @@ class InternshipViewSet(viewsets.ModelViewSet):
         Changer le statut d'un stage
         """
         internship = self.get_object()
-        if request.user != internship.supervisor and request.user.user_type != 'admin':
+        if request.user.id != internship.supervisor_id and request.user.user_type != 'admin':
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
         status_value = request.data.get('status')
@@ -187,43 +378,35 @@ class InternshipViewSet(viewsets.ModelViewSet):
             internship.save()
             return Response({'status': f'internship status changed to {status_value}'})
         return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
-
-def signup_view(request):
-    """
-    Vue pour l'inscription des utilisateurs
-    """
-    if request.method == 'POST':
-        username = request.POST.get('username')
-        email = request.POST.get('email')
-        password = request.POST.get('password')
-        first_name = request.POST.get('first_name', '')
-        last_name = request.POST.get('last_name', '')
-        
-        if User.objects.filter(username=username).exists():
-            return render(request, 'signup.html', {'error': 'Username already exists'})
-        
-        if User.objects.filter(email=email).exists():
-            return render(request, 'signup.html', {'error': 'Email already exists'})
-        
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name,
-            user_type='employee'  # Par défaut, les nouveaux utilisateurs sont des employés
-        )
-        
-        user = authenticate(username=username, password=password)
-        if user:
-            login(request, user)
-            return redirect('dashboard')
     
-    return render(request, 'signup.html')
+    @action(detail=False, methods=['post'])
+    def bulk_change_status(self, request):
+        """
+        Changer le statut de plusieurs stages : `{"status": ..., "ids": [...]}`,
+        ou sans `ids` les stages qui correspondent aux filtres de la liste.
+        Hors administrateurs, seuls les stages dont l'utilisateur est le
+        tuteur sont modifiés.
+        """
+        status_value = request.data.get('status')
+        if status_value not in dict(Internship.STATUS_CHOICES):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids, queryset = bulk_targets(self, request)
+        return Response(bulk_response(change_internship_statuses(ids, queryset, status_value, request.user)))
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(SparseFieldsetMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
+    list_serializer_class = JobApplicationListSerializer
+    page_size = 25
+    filter_backends = LIST_FILTER_BACKENDS
+    filter_fields = {
+        'status': ('status', 'choice'), 'application_type': ('application_type', 'choice'),
+        'cv_status': ('cv_status', 'choice'), 'user': ('user', 'id'),
+    }
+    # Recherche plein texte dans les CV et les motivations : action `search`
+    search_fields = ('first_name', 'last_name', 'email', 'position')
+    ordering_fields = ('created_at', 'last_name', 'position', 'status')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -231,16 +414,58 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         Limiter les résultats en fonction du type d'utilisateur
         """
         user = self.request.user
+        # Le vecteur de recherche et le texte complet du CV ne sont lus que par la base
+        queryset = JobApplication.objects.select_related('cv_document').defer(
+            'search_vector', 'cv_document__text'
+        )
         if user.is_superuser or user.user_type == 'admin':
-            return JobApplication.objects.all()
-        return JobApplication.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user_id=user.id)
     
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
-            serializer.save(user=self.request.user)
+            serializer.save(user_id=self.request.user.id)
         else:
             serializer.save()
     
+    def perform_update(self, serializer):
+        if 'cv_file' in serializer.validated_data or 'cv_upload' in serializer.validated_data:
+            # Nouveau fichier : analysé à son tour par process_cvs
+            serializer.save(cv_status='pending', cv_claimed_at=None, cv_document=None)
+        else:
+            serializer.save()
+    
+    @action(detail=True, methods=['get'])
+    def cv(self, request, pk=None):
+        """
+        Télécharger le CV (requêtes Range acceptées, ou envoi délégué à nginx)
+        """
+        application = self.get_object()
+        if not application.cv_file:
+            return Response({'error': 'No CV file'}, status=status.HTTP_404_NOT_FOUND)
+        filename = os.path.basename(application.cv_file.name)
+        try:
+            return serve_file(request, application.cv_file, filename)
+        except FileNotFoundError:
+            return Response({'error': 'CV file missing from storage'}, status=status.HTTP_404_NOT_FOUND)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Recherche plein texte (?q=) dans le poste, l'expérience, la formation
+        et la motivation, résultats classés par pertinence (?limit=, 100 au plus)
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'error': 'Missing search query'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = request.query_params.get('limit', str(self.page_size))
+        if not limit.isdigit() or not 0 < int(limit) <= 100:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = search_job_applications(self.get_queryset(), text)[:int(limit)]
+        serializer = JobApplicationSearchSerializer(results, many=True, context=self.get_serializer_context())
+        return Response({'results': serializer.data})
+    
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """
@@ -250,20 +475,12 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         if request.user.user_type != 'admin' and not request.user.is_superuser:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        application.status = 'approved'
-        application.save()
-        
-        # Envoyer un email au candidat (simulation)
-        try:
-            send_mail(
-                'Your application has been approved',
-                f'Congratulations! Your application for {application.position} has been approved.',
-                settings.DEFAULT_FROM_EMAIL,
-                [application.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            logger.error(f"Email sending failed: {str(e)}")
+        # Le statut et l'email en file d'attente sont enregistrés ensemble ;
+        # l'envoi se fait hors requête (commande send_outbox)
+        with transaction.atomic():
+            application.status = 'approved'
+            application.save(update_fields=['status', 'updated_at'])
+            enqueue_email(*application_email('approved', application.position, application.email))
         
         return Response({'status': 'application approved'})
     
@@ -276,19 +493,257 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         if request.user.user_type != 'admin' and not request.user.is_superuser:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        application.status = 'rejected'
-        application.save()
+        # Le statut et l'email en file d'attente sont enregistrés ensemble ;
+        # l'envoi se fait hors requête (commande send_outbox)
+        with transaction.atomic():
+            application.status = 'rejected'
+            application.save(update_fields=['status', 'updated_at'])
+            enqueue_email(*application_email('rejected', application.position, application.email))
         
-        # Envoyer un email au candidat (simulation)
-        try:
-            send_mail(
-                'Your application status',
-                f'Thank you for your interest in {application.position}. Unfortunately, we have decided to move forward with other candidates.',
-                settings.DEFAULT_FROM_EMAIL,
-                [application.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            logger.error(f"Email sending failed: {str(e)}")
+        return Response({'status': 'application rejected'})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_approve(self, request):
+        """
+        Approuver des candidatures en une requête : `{"ids": [...]}`, ou sans
+        corps celles qui correspondent aux filtres de la liste ; un email par
+        candidature approuvée est mis en file d'attente
+        """
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        return Response({'status': 'application rejected'})
\ No newline at end of file
+        ids, queryset = bulk_targets(self, request)
+        return Response(bulk_response(decide_applications(ids, queryset, 'approved')))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_reject(self, request):
+        """
+        Rejeter des candidatures en une requête (mêmes paramètres que bulk_approve)
+        """
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        ids, queryset = bulk_targets(self, request)
+        return Response(bulk_response(decide_applications(ids, queryset, 'rejected')))
+
+
+class CvUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Téléversement de CV par morceaux, avec reprise.
+
+    POST {filename, size} crée le téléversement. Chaque morceau est envoyé par
+    PATCH avec le corps brut (application/offset+octet-stream) et l'en-tête
+    Upload-Offset égal à l'offset courant ; GET donne l'offset à reprendre.
+    Le corps est écrit sur disque par blocs, sans passer par request.data.
+    Une fois complet, l'identifiant est passé en `cv_upload` à la création
+    de la candidature.
+    """
+    serializer_class = CvUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return CvUpload.objects.filter(user_id=self.request.user.id)
+
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.id)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if isinstance(response.data, dict) and 'offset' in response.data:
+            response['Upload-Offset'] = str(response.data['offset'])
+        return response
+
+    def partial_update(self, request, *args, **kwargs):
+        offset = request.headers.get('Upload-Offset', '')
+        length = request.headers.get('Content-Length', '')
+        if not offset.isdigit():
+            return Response({'error': 'Missing Upload-Offset header'}, status=status.HTTP_400_BAD_REQUEST)
+        if not length.isdigit():
+            return Response({'error': 'Missing Content-Length header'}, status=status.HTTP_411_LENGTH_REQUIRED)
+        length = int(length)
+        if length > settings.CV_UPLOAD_CHUNK_SIZE:
+            return Response(
+                {'error': f'Chunk too large; maximum is {settings.CV_UPLOAD_CHUNK_SIZE} bytes'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        with transaction.atomic():
+            # Deux morceaux concurrents du même téléversement s'exécutent l'un après l'autre
+            upload = self.get_queryset().select_for_update().filter(pk=self.kwargs['pk']).first()
+            if upload is None:
+                return Response({'error': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+            if upload.completed or int(offset) != upload.offset:
+                return Response(
+                    {'error': 'Offset mismatch', 'offset': upload.offset}, status=status.HTTP_409_CONFLICT
+                )
+            try:
+                upload.offset = append_chunk(upload, request.stream, length)
+            except UploadError as e:
+                return Response({'error': str(e), 'offset': upload.offset}, status=e.status)
+            if upload.offset == upload.size:
+                upload.file_name = complete_upload(upload)
+            upload.save(update_fields=['offset', 'file_name', 'updated_at'])
+        return Response(self.get_serializer(upload).data)
+
+    def perform_destroy(self, instance):
+        for name in (instance.partial_name, instance.file_name):
+            if name:
+                default_storage.delete(name)
+        instance.delete()
+
+
+class ArchiveViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Lecture des lignes archivées par la commande `archive_records` (voir
+    Rh_app.archive), rangées par mois : `?month__gte=` / `?month__lte=`
+    bornent les partitions lues. Une ligne se lit par son identifiant
+    d'origine (/api/archive/leaves/<id>/).
+    """
+    pagination_class = ArchivedCursorPagination
+    page_size = 200
+    lookup_field = 'id'
+    filter_backends = LIST_FILTER_BACKENDS
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Toutes les archives pour les administrateurs, sinon celles de l'utilisateur connecté"""
+        user = self.request.user
+        queryset = self.queryset.all()
+        if user.is_superuser or user.user_type == 'admin':
+            return queryset
+        return queryset.filter(user_id=user.id)
+
+class ArchivedWorkHoursViewSet(ArchiveViewSet):
+    queryset = ArchivedWorkHours.objects.select_related('user')
+    serializer_class = ArchivedWorkHoursSerializer
+    filter_fields = {'user': ('user', 'id'), 'month': ('month', 'date'), 'date': ('date', 'date')}
+    search_fields = ('user__username',)
+    ordering_fields = ('month', 'date')
+
+class ArchivedLeaveViewSet(ArchiveViewSet):
+    queryset = ArchivedLeave.objects.select_related('user')
+    serializer_class = ArchivedLeaveSerializer
+    filter_fields = {
+        'user': ('user', 'id'), 'month': ('month', 'date'), 'status': ('status', 'choice'),
+        'start_date': ('start_date', 'date'),
+    }
+    search_fields = ('user__username', 'reason')
+    ordering_fields = ('month', 'start_date')
+
+class ArchivedJobApplicationViewSet(ArchiveViewSet):
+    queryset = ArchivedJobApplication.objects.all()
+    serializer_class = ArchivedJobApplicationSerializer
+    filter_fields = {
+        'user': ('user', 'id'), 'month': ('month', 'date'), 'status': ('status', 'choice'),
+        'application_type': ('application_type', 'choice'),
+    }
+    search_fields = ('first_name', 'last_name', 'email', 'position')
+    ordering_fields = ('month', 'created_at')
+
+
+def count_aggregates(**conditions):
+    """
+    Agrégats comptant les lignes au total et pour chaque condition Q
+    (alias préfixés par `count_`, voir strip_count_prefix)
+    """
+    aggregates = {'count_total': Count('id')}
+    for name, condition in conditions.items():
+        aggregates[f'count_{name}'] = Count('id', filter=condition)
+    return aggregates
+
+
+def strip_count_prefix(result):
+    return {name[len('count_'):]: value for name, value in result.items()}
+
+
+def status_aggregates(choices):
+    return count_aggregates(**{value: Q(status=value) for value, _label in choices})
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """
+    Indicateurs du tableau de bord calculés par agrégation en base.
+
+    Chaque chiffre est calculé sur le queryset du viewset correspondant, de
+    sorte que les règles de visibilité par rôle sont exactement celles des
+    endpoints de liste.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def scoped_queryset(self, viewset_class):
+        return viewset_class(request=self.request, format_kwarg=None).get_queryset()
+
+    def summary_queries(self):
+        """
+        Requêtes du tableau de bord, sous forme de (nom, queryset, méthode,
+        arguments) : list() appelle la méthode, la variante asynchrone
+        (Rh_app.async_views) son équivalent `a...` (aaggregate, afirst, acount).
+        """
+        today = timezone.localdate()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        leaves = self.scoped_queryset(LeaveViewSet)
+        return [
+            ('leaves', leaves, 'aggregate', status_aggregates(Leave.STATUS_CHOICES)),
+            ('upcoming', (
+                leaves.filter(status='approved', start_date__gt=today)
+                .order_by('start_date', 'id')
+                .values('id', 'user', 'start_date', 'end_date', user_name=F('user__username'))
+            ), 'first', {}),
+            ('missions', self.scoped_queryset(MissionViewSet), 'aggregate', count_aggregates(
+                active=Q(completed=False),
+                completed=Q(completed=True),
+                overdue=Q(completed=False, deadline__lt=today),
+            )),
+            ('work_hours', self.scoped_queryset(WorkHoursViewSet).filter(
+                date__gte=min(week_start, month_start)
+            ), 'aggregate', {
+                'week': Sum('hours_worked', filter=Q(date__gte=week_start, date__lte=today)),
+                'month': Sum('hours_worked', filter=Q(date__gte=month_start, date__lte=today)),
+            }),
+            ('internships', self.scoped_queryset(InternshipViewSet), 'aggregate',
+             status_aggregates(Internship.STATUS_CHOICES)),
+            ('job_applications', self.scoped_queryset(JobApplicationViewSet), 'aggregate',
+             status_aggregates(JobApplication.STATUS_CHOICES)),
+            ('team_members', self.scoped_queryset(UserViewSet), 'count', {}),
+        ]
+
+    def summary(self, results, leave_balance):
+        leave_stats = strip_count_prefix(results['leaves'])
+        leave_stats['upcoming'] = results['upcoming']
+        internship_stats = strip_count_prefix(results['internships'])
+        application_stats = strip_count_prefix(results['job_applications'])
+        return {
+            'leave_balance': leave_balance,
+            'team_members': results['team_members'],
+            'pending_approvals': (
+                leave_stats['pending'] + internship_stats['pending'] + application_stats['pending']
+            ),
+            'leaves': leave_stats,
+            'missions': strip_count_prefix(results['missions']),
+            'work_hours': {key: f'{value or 0:.2f}' for key, value in results['work_hours'].items()},
+            'internships': internship_stats,
+            'job_applications': application_stats,
+        }
+
+    def list(self, request):
+        results = {
+            name: getattr(queryset, method)(**arguments)
+            for name, queryset, method, arguments in self.summary_queries()
+        }
+        return Response(self.summary(results, full_user(request.user).leave_balance))
+
+
+class DatabasePoolViewSet(viewsets.ViewSet):
+    """
+    Connexions à la base du worker qui répond : mode (pool, persistent,
+    per-request) et, pour un pool, connexions utilisées, attentes et
+    délais dépassés (voir Rh_app.dbpool)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(pool_stats())
@@ -3,6 +3,11 @@ ASGI config for SystemeRH project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Seules les variantes asynchrones (/api/async/) sont servies en ASGI (voir
+gunicorn.conf.py) : sous ASGI, Django lit les réponses en flux d'un itérateur
+synchrone d'un seul coup (export CSV, téléchargement des CV), le reste de
+l'API passe donc par WSGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +18,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SystemeRH.settings')
 
-application = get_asgi_application()
+ASYNC_PATH_PREFIX = '/api/async/'
+
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and not scope['path'].startswith(ASYNC_PATH_PREFIX):
+        await send({
+            'type': 'http.response.start', 'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"error": "Served by the WSGI application"}'})
+        return
+    await django_application(scope, receive, send)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En tête : la durée mesurée couvre les autres middlewares
+    'Rh_app.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,19 +79,55 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'SystemeRH.wsgi.application'
 
+# Modèle utilisateur de l'application (user_type, leave_balance), utilisé
+# aussi par l'authentification JWT. Bases créées avant ce réglage (comptes de
+# connexion dans auth_user) : la migration Rh_app 0016 reporte sous PostgreSQL
+# la clé de django_admin_log sur Rh_app_user ; sous SQLite, recréer cette
+# table (`migrate admin zero` puis `migrate admin`). Les comptes de auth_user
+# ne sont pas repris : les recréer avec `createsuperuser`.
+AUTH_USER_MODEL = 'Rh_app.User'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# Connexions (DB_CONN_MODE) :
+#   pool        pool psycopg dans chaque processus (défaut, nécessite psycopg[pool]) ;
+#               au plus WEB_CONCURRENCY x DB_POOL_MAX_SIZE connexions côté PostgreSQL
+#   persistent  une connexion par thread, gardée DB_CONN_MAX_AGE secondes (à éviter
+#               sous ASGI, où les threads ne sont pas réutilisés d'une requête à l'autre)
+#   external    derrière un pooler externe en mode transaction (PgBouncer) : une
+#               connexion par requête, ni curseurs côté serveur ni requêtes préparées
+# Dans tous les modes, une connexion réutilisée est vérifiée avant usage.
+DB_CONN_MODE = os.environ.get('DB_CONN_MODE', 'pool')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'rh',  # Database name
-        'USER': 'postgres',  # Database user
-        'PASSWORD': '12345',  # Database password
-        'HOST': 'localhost',  # Database host
-        'PORT': '5433',  # Database port
+        'NAME': os.environ.get('DB_NAME', 'rh'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '12345'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5433'),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
+if DB_CONN_MODE == 'pool':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        # Attente maximale d'une connexion libre avant erreur (secondes)
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 600)),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+    }
+elif DB_CONN_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+elif DB_CONN_MODE == 'external':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    raise ImproperlyConfigured(f"DB_CONN_MODE inconnu : {DB_CONN_MODE!r} (pool, persistent ou external)")
 
 
 # Password validation
@@ -131,8 +171,53 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# File d'attente des emails (Rh_app.outbox, commande send_outbox)
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF_SECONDS = 60
+OUTBOX_RETRY_MAX_DELAY_SECONDS = 3600
+# Durée (secondes) d'une réservation de lot ; au-delà, un worker arrêté en cours
+# d'envoi rend ses emails, qui peuvent alors partir deux fois
+OUTBOX_LEASE_SECONDS = 900
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
+
+# Téléversement des CV par morceaux (Rh_app.files)
+CV_UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+CV_UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Préfixe d'une location nginx `internal` pointant sur MEDIA_ROOT, par exemple
+#   location /protected-media/ { internal; alias /app/media/; }
+# Les CV sont alors envoyés par nginx (X-Accel-Redirect) ; None : servis par Django
+CV_ACCEL_REDIRECT_PREFIX = os.environ.get('CV_ACCEL_REDIRECT_PREFIX')
+
+# Acquisition mensuelle des congés (Rh_app.accrual, commande accrue_leave) : jours par mois selon le rôle
+LEAVE_ACCRUAL_MONTHLY_DAYS = float(os.environ.get('LEAVE_ACCRUAL_MONTHLY_DAYS', 2.5))
+LEAVE_ACCRUAL_DAYS_PER_MONTH = {
+    'admin': LEAVE_ACCRUAL_MONTHLY_DAYS,
+    'employee': LEAVE_ACCRUAL_MONTHLY_DAYS,
+    'intern': 0.0,
+}
+
+# Archivage (Rh_app.archive, commande archive_records)
+# Âge (jours) au-delà duquel heures, congés et candidatures traitées quittent les tables courantes
+ARCHIVE_HORIZON_DAYS = int(os.environ.get('ARCHIVE_HORIZON_DAYS', 730))
+# Copies JSON Lines compressées des archives, un fichier par mois
+ARCHIVE_ROOT = os.environ.get('ARCHIVE_ROOT', os.path.join(BASE_DIR, 'archive/'))
+
+# Mesures par requête (Rh_app.metrics) : en-tête Server-Timing et /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_SERVER_TIMING = True
+# Jeton exigé pour lire /metrics (`Authorization: Bearer <jeton>`), obligatoire
+# derrière un reverse proxy ; sans jeton, accès par adresse (METRICS_ALLOWED_IPS)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Adresses autorisées à lire /metrics quand METRICS_TOKEN n'est pas défini
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+# Au-delà de cette durée (ms), la requête est journalisée avec ses requêtes SQL ; None : jamais
+METRICS_SLOW_REQUEST_MS = int(os.environ['METRICS_SLOW_REQUEST_MS']) if os.environ.get('METRICS_SLOW_REQUEST_MS') else None
+# Répertoire partagé par les workers pour agréger leurs mesures ; None : mesures du seul worker qui répond
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_SECONDS = 5
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:5000',
     'http://127.0.0.1:5000',
@@ -143,17 +228,32 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
+CORS_EXPOSE_HEADERS = ['Upload-Offset', 'Content-Range', 'Content-Disposition', 'Server-Timing']
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Rôle lu dans les claims du jeton : pas de requête User par appel
+        'Rh_app.authentication.ClaimsJWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'Rh_app.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': (
+        # JSON identique à JSONRenderer, encodé par orjson pour les listes de Rh_app.fastread
+        'Rh_app.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 }
+# Listes lues avec values() au lieu des serializers (Rh_app.fastread)
+FAST_READ_ENABLED = os.environ.get('FAST_READ_ENABLED', '1') == '1'
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
+    'TOKEN_USER_CLASS': 'Rh_app.authentication.ClaimsUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'Rh_app.authentication.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'Rh_app.authentication.RoleTokenRefreshSerializer',
 }
\ No newline at end of file
@@ -18,11 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.shortcuts import redirect
-from rest_framework.routers import DefaultRouter
-from Rh_app.views import UserViewSet
-
-router = DefaultRouter()
-router.register(r'users', UserViewSet)
+from Rh_app.metrics import metrics_view
 
 
 def redirect_to_react(request):
@@ -31,7 +27,8 @@ def redirect_to_react(request):
 urlpatterns = [
     path('', redirect_to_react, name='home'),  # This will redirect the root URL
     path('admin/', admin.site.urls),
-    path('api/', include(router.urls)),
+    path('api/', include('Rh_app.urls')),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', metrics_view, name='metrics'),
 ]
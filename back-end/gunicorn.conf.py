@@ -0,0 +1,47 @@
+"""
+Configuration gunicorn de production.
+
+Par défaut l'application est servie en WSGI par des workers à threads
+(gthread) : les réponses en flux (export CSV, téléchargement des CV avec
+Range) sont envoyées par morceaux, sans charger le corps en mémoire.
+
+    gunicorn SystemeRH.wsgi:application
+
+Les variantes asynchrones /api/async/ sont servies par un second processus,
+en ASGI (workers uvicorn), vers lequel le reverse proxy envoie ce seul
+préfixe ; SystemeRH.asgi refuse tout autre chemin :
+
+    GUNICORN_ASGI=1 GUNICORN_BIND=0.0.0.0:8001 gunicorn
+
+    location = /metrics  { deny all; }
+    location /api/async/ { proxy_pass http://127.0.0.1:8001; }
+    location /           { proxy_pass http://127.0.0.1:8000; }
+
+Derrière nginx, toutes les requêtes arrivent de 127.0.0.1 : /metrics n'est
+pas publié, et Prometheus le lit directement sur le port de gunicorn avec
+METRICS_TOKEN (voir Rh_app.metrics).
+"""
+import multiprocessing
+import os
+
+ASGI = os.environ.get('GUNICORN_ASGI') == '1'
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+if ASGI:
+    wsgi_app = 'SystemeRH.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # Un worker asynchrone sert plusieurs requêtes à la fois : un par cœur suffit
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+else:
+    wsgi_app = 'SystemeRH.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count() + 1))
+    # Les requêtes attendent surtout la base : quelques threads par worker
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Les workers sont recyclés pour borner la croissance mémoire
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
@@ -35,17 +35,13 @@ const StatsCard: React.FC<StatsCardProps> = ({ title, value, description, icon,
 
 const DashboardStats: React.FC = () => {
   const { user } = useSelector((state: RootState) => state.auth);
-  const { leaves } = useSelector((state: RootState) => state.leave);
-  const { missions } = useSelector((state: RootState) => state.mission);
-  
-  const pendingLeaves = leaves.filter(leave => leave.status === 'pending');
-  const activeMissions = missions.filter(mission => !mission.completed);
+  const { summary } = useSelector((state: RootState) => state.dashboard);
 
   return (
     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-6">
       <StatsCard
         title="Leave Balance"
-        value={user?.leave_balance ?? 0}
+        value={summary?.leave_balance ?? user?.leave_balance ?? 0}
         description="Your available leave days"
         icon={<CalendarDays className="text-primary-600 h-6 w-6" />}
         color="bg-primary-100"
@@ -53,7 +49,7 @@ const DashboardStats: React.FC = () => {
       
       <StatsCard
         title="Pending Leaves"
-        value={pendingLeaves.length}
+        value={summary?.leaves.pending ?? 0}
         description="Awaiting approval"
         icon={<CalendarDays className="text-amber-600 h-6 w-6" />}
         color="bg-amber-100"
@@ -61,7 +57,7 @@ const DashboardStats: React.FC = () => {
       
       <StatsCard
         title="Active Missions"
-        value={activeMissions.length}
+        value={summary?.missions.active ?? 0}
         description="Tasks to complete"
         icon={<BriefcaseIcon className="text-indigo-600 h-6 w-6" />}
         color="bg-indigo-100"
@@ -69,7 +65,7 @@ const DashboardStats: React.FC = () => {
       
       <StatsCard
         title="Team Members"
-        value={user?.user_type === 'admin' ? '25' : '5'}
+        value={summary?.team_members ?? 0}
         description="In your department"
         icon={<User className="text-teal-600 h-6 w-6" />}
         color="bg-teal-100"
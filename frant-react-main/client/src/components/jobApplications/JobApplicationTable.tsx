@@ -32,6 +32,7 @@ import {
 } from '@/components/ui/pagination';
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from '@/components/ui/alert-dialog';
 import { JobApplication } from '../../types';
+import { downloadJobApplicationCv } from '../../lib/api';
 import { Eye, Check, X, Search, PlusCircle, Download } from 'lucide-react';
 import { format } from 'date-fns';
 import { useSelector } from 'react-redux';
@@ -207,7 +208,7 @@ const JobApplicationTable: React.FC<JobApplicationTableProps> = ({
                         <Button 
                           variant="ghost" 
                           size="icon"
-                          onClick={() => window.open(application.cv_file, '_blank')}
+                          onClick={() => downloadJobApplicationCv(application.id)}
                         >
                           <Download className="h-4 w-4 text-gray-500 hover:text-gray-700" />
                         </Button>
@@ -39,14 +39,12 @@ const LeaveStatCard: React.FC<LeaveStatCardProps> = ({ title, value, icon, color
 
 const LeaveStats: React.FC = () => {
   const { user } = useSelector((state: RootState) => state.auth);
-  const { leaves } = useSelector((state: RootState) => state.leave);
+  const { summary } = useSelector((state: RootState) => state.dashboard);
   
-  const pendingLeaves = leaves.filter(leave => leave.status === 'pending');
+  const pendingCount = summary?.leaves.pending ?? 0;
   
-  // Find the next upcoming approved leave
-  const upcomingLeave = leaves
-    .filter(leave => leave.status === 'approved' && new Date(leave.start_date) > new Date())
-    .sort((a, b) => new Date(a.start_date).getTime() - new Date(b.start_date).getTime())[0];
+  // Next upcoming approved leave, computed by the server
+  const upcomingLeave = summary?.leaves.upcoming ?? null;
   
   // Format for upcoming leave display
   const formatUpcomingLeave = () => {
@@ -101,7 +99,7 @@ const LeaveStats: React.FC = () => {
       {/* Pending Requests */}
       <LeaveStatCard
         title="Pending Requests"
-        value={pendingLeaves.length}
+        value={pendingCount}
         icon={<Clock className="text-amber-600 h-6 w-6" />}
         color="bg-amber-100"
         footer={
@@ -110,7 +108,7 @@ const LeaveStats: React.FC = () => {
               <span className="w-2 h-2 rounded-full bg-amber-500"></span>
               <span className="text-xs text-gray-600 ml-2">Awaiting approval</span>
             </div>
-            {pendingLeaves.length > 0 && (
+            {pendingCount > 0 && (
               <span className="text-xs text-primary-600 hover:underline cursor-pointer">
                 View all
               </span>
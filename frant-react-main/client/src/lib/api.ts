@@ -1,11 +1,15 @@
 import axios from 'axios';
 import { 
+  CursorPage,
+  CvUpload,
+  DashboardSummary,
   User, 
   Leave, 
   Mission, 
   WorkHours, 
   Internship, 
   JobApplication,
+  JobApplicationSearchResult,
   CreateLeaveRequest,
   CreateMissionRequest,
   CreateWorkHoursRequest,
@@ -19,10 +23,28 @@ import {
 
 const API_URL = '/api';
 
+// Pagination helpers
+export const getPage = async <T>(url: string, pageSize?: number): Promise<CursorPage<T>> => {
+  const params = pageSize ? { page_size: pageSize } : undefined;
+  const response = await axios.get<CursorPage<T>>(url, { params });
+  return response.data;
+};
+
+// Follows the `next` cursor links until the last page.
+export const getAllPages = async <T>(url: string, pageSize?: number): Promise<T[]> => {
+  const results: T[] = [];
+  let page = await getPage<T>(url, pageSize);
+  results.push(...page.results);
+  while (page.next) {
+    page = await getPage<T>(page.next);
+    results.push(...page.results);
+  }
+  return results;
+};
+
 // User API
 export const getUsers = async (): Promise<User[]> => {
-  const response = await axios.get<User[]>(`${API_URL}/users/`);
-  return response.data;
+  return getAllPages<User>(`${API_URL}/users/`);
 };
 
 export const getUserById = async (id: number): Promise<User> => {
@@ -32,8 +54,7 @@ export const getUserById = async (id: number): Promise<User> => {
 
 // Leave API
 export const getLeaves = async (): Promise<Leave[]> => {
-  const response = await axios.get<Leave[]>(`${API_URL}/leaves/`);
-  return response.data;
+  return getAllPages<Leave>(`${API_URL}/leaves/`);
 };
 
 export const getLeaveById = async (id: number): Promise<Leave> => {
@@ -63,8 +84,7 @@ export const rejectLeave = async (id: number): Promise<Leave> => {
 
 // Mission API
 export const getMissions = async (): Promise<Mission[]> => {
-  const response = await axios.get<Mission[]>(`${API_URL}/missions/`);
-  return response.data;
+  return getAllPages<Mission>(`${API_URL}/missions/`);
 };
 
 export const getMissionById = async (id: number): Promise<Mission> => {
@@ -89,8 +109,7 @@ export const completeMission = async (id: number): Promise<Mission> => {
 
 // Work Hours API
 export const getWorkHours = async (): Promise<WorkHours[]> => {
-  const response = await axios.get<WorkHours[]>(`${API_URL}/work-hours/`);
-  return response.data;
+  return getAllPages<WorkHours>(`${API_URL}/work-hours/`);
 };
 
 export const createWorkHours = async (workHoursData: CreateWorkHoursRequest): Promise<WorkHours> => {
@@ -98,10 +117,31 @@ export const createWorkHours = async (workHoursData: CreateWorkHoursRequest): Pr
   return response.data;
 };
 
+export interface BulkWorkHoursResult {
+  created: number;
+  updated: number;
+  error_count: number;
+  errors: { row: number; errors: Record<string, string[]> }[];
+}
+
+// Accepts a CSV file (user,date,hours_worked) or an array of rows.
+export const bulkImportWorkHours = async (
+  rows: CreateWorkHoursRequest[] | File,
+  upsert = false,
+): Promise<BulkWorkHoursResult> => {
+  const params = upsert ? { upsert: true } : undefined;
+  let data: CreateWorkHoursRequest[] | FormData = rows as CreateWorkHoursRequest[];
+  if (rows instanceof File) {
+    data = new FormData();
+    data.append('file', rows);
+  }
+  const response = await axios.post<BulkWorkHoursResult>(`${API_URL}/work-hours/bulk/`, data, { params });
+  return response.data;
+};
+
 // Internship API
 export const getInternships = async (): Promise<Internship[]> => {
-  const response = await axios.get<Internship[]>(`${API_URL}/internships/`);
-  return response.data;
+  return getAllPages<Internship>(`${API_URL}/internships/`);
 };
 
 export const getInternshipById = async (id: number): Promise<Internship> => {
@@ -126,8 +166,14 @@ export const changeInternshipStatus = async (id: number, status: string): Promis
 
 // Job Application API
 export const getJobApplications = async (): Promise<JobApplication[]> => {
-  const response = await axios.get<JobApplication[]>(`${API_URL}/job-applications/`);
-  return response.data;
+  return getAllPages<JobApplication>(`${API_URL}/job-applications/`);
+};
+
+export const searchJobApplications = async (query: string, limit = 25): Promise<JobApplicationSearchResult[]> => {
+  const response = await axios.get<{ results: JobApplicationSearchResult[] }>(
+    `${API_URL}/job-applications/search/`, { params: { q: query, limit } }
+  );
+  return response.data.results;
 };
 
 export const getJobApplicationById = async (id: number): Promise<JobApplication> => {
@@ -145,6 +191,49 @@ export const updateJobApplication = async (id: number, applicationData: UpdateJo
   return response.data;
 };
 
+// Chunked CV upload: each chunk is sent with the current offset, and after a
+// failed chunk the upload resumes from the offset the server has stored.
+const CV_CHUNK_SIZE = 1024 * 1024;
+const CV_CHUNK_RETRIES = 3;
+
+export const uploadCv = async (file: File): Promise<string> => {
+  const { data: upload } = await axios.post<CvUpload>(`${API_URL}/cv-uploads/`, {
+    filename: file.name,
+    size: file.size,
+  });
+  let offset = upload.offset;
+  let retries = 0;
+  while (offset < file.size) {
+    try {
+      const response = await axios.patch<CvUpload>(
+        `${API_URL}/cv-uploads/${upload.id}/`,
+        file.slice(offset, offset + CV_CHUNK_SIZE),
+        { headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(offset) } }
+      );
+      offset = response.data.offset;
+      retries = 0;
+    } catch (error) {
+      if (retries++ >= CV_CHUNK_RETRIES) {
+        throw error;
+      }
+      const response = await axios.get<CvUpload>(`${API_URL}/cv-uploads/${upload.id}/`);
+      offset = response.data.offset;
+    }
+  }
+  return upload.id;
+};
+
+export const downloadJobApplicationCv = async (id: number): Promise<void> => {
+  const response = await axios.get<Blob>(`${API_URL}/job-applications/${id}/cv/`, { responseType: 'blob' });
+  const disposition: string = response.headers['content-disposition'] ?? '';
+  const match = /filename\*=UTF-8''([^;]+)/.exec(disposition);
+  const link = document.createElement('a');
+  link.href = URL.createObjectURL(response.data);
+  link.download = match ? decodeURIComponent(match[1]) : `cv-${id}`;
+  link.click();
+  URL.revokeObjectURL(link.href);
+};
+
 export const approveJobApplication = async (id: number): Promise<JobApplication> => {
   const response = await axios.post<JobApplication>(`${API_URL}/job-applications/${id}/approve/`, {});
   return response.data;
@@ -154,3 +243,9 @@ export const rejectJobApplication = async (id: number): Promise<JobApplication>
   const response = await axios.post<JobApplication>(`${API_URL}/job-applications/${id}/reject/`, {});
   return response.data;
 };
+
+// Dashboard API
+export const getDashboard = async (): Promise<DashboardSummary> => {
+  const response = await axios.get<DashboardSummary>(`${API_URL}/dashboard/`);
+  return response.data;
+};
@@ -10,6 +10,7 @@ import {
 } from '@/components/ui/card';
 import { useSelector, useDispatch } from 'react-redux';
 import { RootState } from '../store';
+import { fetchDashboard } from '../store/dashboardSlice';
 import { fetchLeaves } from '../store/leaveSlice';
 import { fetchMissions } from '../store/missionSlice';
 import { fetchWorkHours } from '../store/workHoursSlice';
@@ -26,6 +27,7 @@ const DashboardPage: React.FC = () => {
   // Fetch data on component mount
   useEffect(() => {
     dispatch(fetchLeaves() as any);
+    dispatch(fetchDashboard() as any);
     dispatch(fetchMissions() as any);
     dispatch(fetchWorkHours() as any);
     
@@ -5,6 +5,7 @@ import LeaveTable from '../components/leave/LeaveTable';
 import LeaveRequestForm from '../components/leave/LeaveRequestForm';
 import { useSelector, useDispatch } from 'react-redux';
 import { RootState } from '../store';
+import { fetchDashboard } from '../store/dashboardSlice';
 import { 
   fetchLeaves, 
   createLeave, 
@@ -31,6 +32,7 @@ const LeavePage: React.FC = () => {
   
   useEffect(() => {
     dispatch(fetchLeaves() as any);
+    dispatch(fetchDashboard() as any);
   }, [dispatch]);
   
   const handleRequestLeave = () => {
@@ -40,6 +42,7 @@ const LeavePage: React.FC = () => {
   const handleCreateLeave = async (data: any) => {
     try {
       await dispatch(createLeave(data) as any);
+      dispatch(fetchDashboard() as any);
       setRequestModalOpen(false);
       toast({
         title: 'Success',
@@ -57,6 +60,7 @@ const LeavePage: React.FC = () => {
   const handleApproveLeave = async (id: number) => {
     try {
       await dispatch(approveLeave(id) as any);
+      dispatch(fetchDashboard() as any);
       toast({
         title: 'Success',
         description: 'Leave request approved',
@@ -73,6 +77,7 @@ const LeavePage: React.FC = () => {
   const handleRejectLeave = async (id: number) => {
     try {
       await dispatch(rejectLeave(id) as any);
+      dispatch(fetchDashboard() as any);
       toast({
         title: 'Success',
         description: 'Leave request rejected',
@@ -3,6 +3,7 @@ import React, { useState } from 'react';
 import JobApplicationForm from '../components/jobApplications/JobApplicationForm';
 import { useToast } from '@/hooks/use-toast';
 import axios from 'axios';
+import { uploadCv } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 
 const RecruitmentPage: React.FC = () => {
@@ -10,6 +11,12 @@ const RecruitmentPage: React.FC = () => {
   
   const handleSubmitApplication = async (formData: FormData) => {
     try {
+      // Le CV est envoyé par morceaux, puis la candidature référence le téléversement
+      const cvFile = formData.get('cv_file');
+      if (cvFile instanceof File) {
+        formData.delete('cv_file');
+        formData.append('cv_upload', await uploadCv(cvFile));
+      }
       await axios.post('/api/job-applications/', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
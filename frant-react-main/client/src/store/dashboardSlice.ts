@@ -0,0 +1,53 @@
+import { createSlice, createAsyncThunk, PayloadAction } from '@reduxjs/toolkit';
+import { DashboardSummary } from '../types';
+import * as api from '../lib/api';
+
+interface DashboardState {
+  summary: DashboardSummary | null;
+  loading: boolean;
+  error: string | null;
+}
+
+const initialState: DashboardState = {
+  summary: null,
+  loading: false,
+  error: null,
+};
+
+export const fetchDashboard = createAsyncThunk(
+  'dashboard/fetchDashboard',
+  async (_, { rejectWithValue }) => {
+    try {
+      const summary = await api.getDashboard();
+      return summary;
+    } catch (error) {
+      if (error instanceof Error) {
+        return rejectWithValue(error.message);
+      }
+      return rejectWithValue('An unknown error occurred');
+    }
+  }
+);
+
+const dashboardSlice = createSlice({
+  name: 'dashboard',
+  initialState,
+  reducers: {},
+  extraReducers: (builder) => {
+    builder
+      .addCase(fetchDashboard.pending, (state) => {
+        state.loading = true;
+        state.error = null;
+      })
+      .addCase(fetchDashboard.fulfilled, (state, action: PayloadAction<DashboardSummary>) => {
+        state.loading = false;
+        state.summary = action.payload;
+      })
+      .addCase(fetchDashboard.rejected, (state, action) => {
+        state.loading = false;
+        state.error = action.payload as string;
+      });
+  },
+});
+
+export default dashboardSlice.reducer;
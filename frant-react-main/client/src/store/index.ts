@@ -6,6 +6,7 @@ import missionReducer from './missionSlice';
 import workHoursReducer from './workHoursSlice';
 import internshipReducer from './internshipSlice';
 import jobApplicationReducer from './jobApplicationSlice';
+import dashboardReducer from './dashboardSlice';
 
 export const store = configureStore({
   reducer: {
@@ -16,6 +17,7 @@ export const store = configureStore({
     workHours: workHoursReducer,
     internship: internshipReducer,
     jobApplication: jobApplicationReducer,
+    dashboard: dashboardReducer,
   },
   middleware: (getDefaultMiddleware) =>
     getDefaultMiddleware({
@@ -1,3 +1,10 @@
+// Pagination Types
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 // User Types
 export interface User {
   id: number;
@@ -36,7 +43,6 @@ export interface UpdateLeaveRequest {
   start_date?: string;
   end_date?: string;
   reason?: string;
-  status?: 'pending' | 'approved' | 'rejected';
 }
 
 // Mission Types
@@ -131,6 +137,31 @@ export interface JobApplication {
   cv_file: string;
   status: 'pending' | 'approved' | 'rejected';
   created_at: string;
+  cv_status: 'pending' | 'parsed' | 'failed';
+  cv: CvDocumentSummary | null;
+}
+
+export interface CvDocumentSummary {
+  id: number;
+  kind: 'pdf' | 'docx' | 'text' | '';
+  status: 'parsed' | 'failed';
+  page_count: number | null;
+  metadata: Record<string, string>;
+  excerpt: string;
+  error: string;
+}
+
+export interface CvUpload {
+  id: string;
+  filename: string;
+  size: number;
+  offset: number;
+  completed: boolean;
+  created_at: string;
+}
+
+export interface JobApplicationSearchResult extends JobApplication {
+  rank: number;
 }
 
 export interface CreateJobApplicationRequest {
@@ -158,3 +189,36 @@ export interface UpdateJobApplicationRequest {
   motivation?: string;
   status?: 'pending' | 'approved' | 'rejected';
 }
+
+// Dashboard Types
+export interface StatusCounts {
+  total: number;
+  [status: string]: number;
+}
+
+export interface DashboardSummary {
+  leave_balance: number;
+  team_members: number;
+  pending_approvals: number;
+  leaves: StatusCounts & {
+    upcoming: {
+      id: number;
+      user: number;
+      user_name: string;
+      start_date: string;
+      end_date: string;
+    } | null;
+  };
+  missions: {
+    total: number;
+    active: number;
+    completed: number;
+    overdue: number;
+  };
+  work_hours: {
+    week: string;
+    month: string;
+  };
+  internships: StatusCounts;
+  job_applications: StatusCounts;
+}